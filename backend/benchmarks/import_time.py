@@ -0,0 +1,71 @@
+"""Import-time report and budget check for ``import main``.
+
+Runs ``python -X importtime -c "import main"`` in fresh interpreters, reports the
+slowest modules by cumulative time and fails when ``main`` exceeds the budget
+in import_budget.json or when a module listed as deferred is imported eagerly.
+
+    cd backend && python -m benchmarks.import_time --runs 5
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+BUDGET_PATH = Path(__file__).with_name("import_budget.json")
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Map each module name to its cumulative import time in microseconds."""
+    cumulative: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        cumulative[name] = int(cumulative_us)
+    return cumulative
+
+def run_once() -> dict[str, int]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+def eager_deferred_modules(modules, deferred) -> list[str]:
+    return sorted(name for name in deferred if any(m == name or m.startswith(f"{name}.") for m in modules))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    budget = json.loads(BUDGET_PATH.read_text())
+    runs = [run_once() for _ in range(max(args.runs, 1))]
+    main_ms = statistics.median(run["main"] for run in runs) / 1000
+
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[: args.top]
+    print(f"{'module':<45} cumulative ms")
+    for name, cumulative_us in slowest:
+        print(f"{name:<45} {cumulative_us / 1000:>10.2f}")
+
+    failures = []
+    print(f"\nimport main: median {main_ms:.2f} ms over {len(runs)} runs (budget {budget['budget_ms']} ms)")
+    if main_ms > budget["budget_ms"]:
+        failures.append(f"import main took {main_ms:.2f} ms, budget is {budget['budget_ms']} ms")
+    eager = eager_deferred_modules(runs[-1], budget["deferred_modules"])
+    if eager:
+        failures.append(f"deferred modules imported eagerly: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
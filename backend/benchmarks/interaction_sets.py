@@ -0,0 +1,86 @@
+"""Memory and time of ``InteractionSet`` against plain int lists for ``liked_by`` arrays.
+
+For each array size, parses a stored ``liked_by`` value (sorted, as the app
+writes them) both ways and reports
+the memory held by the result (tracemalloc), parse time, membership checks
+(what ``liked_by_me`` does), a like toggle, and a memoized re-parse.
+
+    cd backend && python -m benchmarks.interaction_sets --sizes 100,10000,1000000
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from services.post_rules import InteractionSet, interactions, normalize_id_list
+
+def timed(work, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        work()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+def held_kib(build) -> float:
+    """Memory still allocated once ``build`` returns, i.e. what the result keeps alive."""
+    tracemalloc.start()
+    value = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return current / 1024
+
+def list_toggle(ids: list[int], user_id: int) -> list[int]:
+    # What toggle_post_like did before InteractionSet.
+    if user_id in ids:
+        return [uid for uid in ids if uid != user_id]
+    return ids + [user_id]
+
+def measure(size: int, runs: int, lookups: int, seed: int = 861) -> dict:
+    rng = random.Random(seed)
+    raw = sorted(rng.sample(range(1, max(size * 10, 1_000_000)), size))
+    probes = [rng.choice(raw) if n % 2 else -n for n in range(lookups)]
+    # Rows arrive as JSON, so the list approach keeps the decoded int objects alive.
+    stored = json.dumps(raw)
+    as_list = normalize_id_list(raw)
+    as_set = InteractionSet.from_values(raw)
+    row = {"id": size, "updated_at": "2026-01-01T00:00:00Z", "liked_by": raw}
+    interactions(row, "liked_by")
+    return {
+        "size": size,
+        "list_kib": held_kib(lambda: normalize_id_list(json.loads(stored))),
+        "set_kib": held_kib(lambda: InteractionSet.from_values(json.loads(stored))),
+        "list_parse_ms": timed(lambda: normalize_id_list(raw), runs),
+        "set_parse_ms": timed(lambda: InteractionSet.from_values(raw), runs),
+        "memo_parse_ms": timed(lambda: interactions(row, "liked_by"), runs),
+        "list_lookup_ms": timed(lambda: [probe in as_list for probe in probes], runs),
+        "set_lookup_ms": timed(lambda: [probe in as_set for probe in probes], runs),
+        "list_toggle_ms": timed(lambda: list_toggle(as_list, probes[1]), runs),
+        "set_toggle_ms": timed(lambda: as_set.toggle(probes[1]), runs),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,10000,100000", help="comma-separated array lengths")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--lookups", type=int, default=100, help="membership checks per run")
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>9} {'':>6} {'KiB':>10} {'parse ms':>9} {'lookup ms':>10} {'toggle ms':>10}")
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        result = measure(size, max(args.runs, 1), args.lookups)
+        print(
+            f"{size:>9} {'list':>6} {result['list_kib']:>10.1f} {result['list_parse_ms']:>9.3f} "
+            f"{result['list_lookup_ms']:>10.3f} {result['list_toggle_ms']:>10.3f}"
+        )
+        print(
+            f"{'':>9} {'set':>6} {result['set_kib']:>10.1f} {result['set_parse_ms']:>9.3f} "
+            f"{result['set_lookup_ms']:>10.3f} {result['set_toggle_ms']:>10.3f}   memoized parse {result['memo_parse_ms']:.4f} ms"
+        )
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
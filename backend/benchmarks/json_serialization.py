@@ -0,0 +1,80 @@
+"""Serialization time and allocations for large feed responses, per JSON backend.
+
+Builds a synthetic ``/api/posts``-shaped feed and renders it through the Flask
+JSON provider with the stdlib and orjson backends, reporting the median time per
+response and the peak memory allocated while rendering (tracemalloc).
+
+    cd backend && python -m benchmarks.json_serialization --posts 2000 --runs 20
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from flask import Flask
+from services import json_provider
+
+def synthetic_feed(posts: int, likes_per_post: int = 40) -> list[dict]:
+    created = datetime(2026, 1, 1)
+    return [
+        {
+            "id": post_id,
+            "caption": f"Post {post_id} caption with some longer text about campus life " * 2,
+            "media_public_id": f"college_life/posts/{post_id:08d}",
+            "media_url": f"https://res.cloudinary.com/demo/image/upload/v1/college_life/posts/{post_id:08d}.jpg",
+            "media_type": "video" if post_id % 5 == 0 else "image",
+            "author_id": post_id % 97,
+            "author_email": f"student{post_id % 97}@school.edu",
+            "author_name": f"Student {post_id % 97}",
+            "likes": likes_per_post,
+            "views": likes_per_post * 3,
+            "liked_by_me": post_id % 2 == 0,
+            "liked_by": [f"student{n}@school.edu" for n in range(likes_per_post)],
+            "created_at": (created + timedelta(minutes=post_id)).isoformat() + "Z",
+        }
+        for post_id in range(posts)
+    ]
+
+def measure(backend: str, payload, runs: int) -> dict:
+    app = Flask(__name__)
+    provider = json_provider.FastJSONProvider(app)
+    provider.backend = backend
+    with app.app_context():
+        provider.response(payload)
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            body = provider.response(payload).get_data()
+            timings.append(time.perf_counter() - start)
+        tracemalloc.start()
+        provider.response(payload)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "backend": backend,
+        "median_ms": statistics.median(timings) * 1000,
+        "peak_alloc_kib": peak / 1024,
+        "bytes": len(body),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    payload = synthetic_feed(args.posts)
+    backends = ["json"] + (["orjson"] if json_provider.resolve_backend("orjson") == "orjson" else [])
+    results = [measure(backend, payload, max(args.runs, 1)) for backend in backends]
+
+    print(f"{args.posts} posts")
+    print(f"{'backend':<10} {'median ms':>10} {'peak KiB':>10} {'bytes':>10}")
+    for result in results:
+        print(f"{result['backend']:<10} {result['median_ms']:>10.2f} {result['peak_alloc_kib']:>10.0f} {result['bytes']:>10}")
+    if len(results) == 2:
+        print(f"\norjson speedup: {results[0]['median_ms'] / results[1]['median_ms']:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
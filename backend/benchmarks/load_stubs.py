@@ -0,0 +1,340 @@
+"""Local stand-ins for the app's upstreams, used by the load test harness.
+
+Each upstream runs on its own ``ThreadingHTTPServer`` on 127.0.0.1 with
+configurable latency, jitter and error injection. ``PostgrestStub`` implements
+the subset of the PostgREST API the app's Supabase calls use, on in-memory
+tables, so the app can be pointed at it with ``SUPABASE_URL``.
+"""
+from __future__ import annotations
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from services.local_db import like_regex
+
+@dataclass
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+
+    @classmethod
+    def parse(cls, raw: str | None) -> "Faults":
+        """``"latency_ms=80,jitter_ms=20,error_rate=0.02,error_status=500"``."""
+        values = {}
+        for item in (raw or "").split(","):
+            key, _, value = item.partition("=")
+            if key.strip() in cls.__dataclass_fields__ and value.strip():
+                values[key.strip()] = int(value) if key.strip() == "error_status" else float(value)
+        return cls(**values)
+
+class StubServer:
+    """HTTP server whose ``routes`` map ``(method, regex)`` to ``handler(request) -> (status, body, headers)``."""
+
+    name = "stub"
+
+    def __init__(self, faults: Faults | None = None, seed: int = 0):
+        self.faults = faults or Faults()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.requests = 0
+        self.routes: list[tuple[str, re.Pattern, object]] = []
+        self._server: ThreadingHTTPServer | None = None
+
+    def route(self, method: str, pattern: str, handler) -> None:
+        self.routes.append((method, re.compile(pattern), handler))
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _inject(self) -> int | None:
+        with self._rng_lock:
+            delay = self.faults.latency_ms + self._rng.uniform(-1, 1) * self.faults.jitter_ms
+            failed = self._rng.random() < self.faults.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return self.faults.error_status if failed else None
+
+    def start(self) -> "StubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *_args):
+                pass
+
+            def _dispatch(self):
+                stub.requests += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                parts = urlsplit(self.path)
+                status, payload, headers = 404, {"error": "no stub route"}, {}
+                injected = stub._inject()
+                if injected is not None:
+                    status, payload = injected, {"error": "injected failure"}
+                else:
+                    for method, pattern, handler in stub.routes:
+                        match = pattern.fullmatch(parts.path)
+                        if method == self.command and match:
+                            request = {
+                                "method": self.command,
+                                "path": parts.path,
+                                "match": match,
+                                "query": parse_qsl(parts.query, keep_blank_values=True),
+                                "headers": self.headers,
+                                "body": body,
+                            }
+                            status, payload, headers = handler(request)
+                            break
+                data = b"" if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(0 if self.command == "HEAD" else len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = do_HEAD = _dispatch
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=f"stub-{self.name}", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+def _ok(payload, headers=None):
+    return 200, payload, headers or {}
+
+class OpenWeatherStub(StubServer):
+    name = "openweather"
+
+    def __init__(self, faults=None, seed=0):
+        super().__init__(faults, seed)
+        self.route("GET", r"/data/2\.5/weather", self._weather)
+
+    def _weather(self, request):
+        city = dict(request["query"]).get("q", "State College")
+        return _ok(
+            {
+                "name": city,
+                "sys": {"country": "US"},
+                "weather": [{"description": "scattered clouds", "icon": "03d"}],
+                "main": {"temp": 61.2, "feels_like": 60.1, "humidity": 58},
+                "wind": {"speed": 6.9},
+            }
+        )
+
+class YelpStub(StubServer):
+    name = "yelp"
+
+    def __init__(self, faults=None, seed=0):
+        super().__init__(faults, seed)
+        self.route("GET", r"/v3/businesses/search", self._search)
+
+    def _search(self, request):
+        limit = int(dict(request["query"]).get("limit", 5))
+        return _ok(
+            {
+                "businesses": [
+                    {
+                        "name": f"Campus Diner {n}",
+                        "rating": 4.5,
+                        "review_count": 120 + n,
+                        "location": {"display_address": [f"{100 + n} College Ave", "State College, PA"]},
+                        "display_phone": "(814) 555-0100",
+                        "url": f"https://yelp.example/biz/{n}",
+                        "image_url": f"https://img.example/{n}.jpg",
+                    }
+                    for n in range(limit)
+                ]
+            }
+        )
+
+class ApiNinjasStub(StubServer):
+    name = "api_ninjas"
+
+    def __init__(self, faults=None, seed=0):
+        super().__init__(faults, seed)
+        self.route("GET", r"/v1/university", lambda request: _ok([{"name": dict(request["query"]).get("name"), "country": "US"}]))
+
+class SpotifyStub(StubServer):
+    name = "spotify"
+
+    def __init__(self, faults=None, seed=0):
+        super().__init__(faults, seed)
+        self.route("GET", r"/v1/me/player/currently-playing", self._current)
+
+    def _current(self, _request):
+        return _ok(
+            {
+                "progress_ms": 42000,
+                "item": {
+                    "name": "Stub Song",
+                    "artists": [{"name": "Stub Artist"}],
+                    "album": {"name": "Stub Album", "images": [{"url": "https://img.example/album.jpg"}]},
+                    "duration_ms": 180000,
+                    "external_urls": {"spotify": "https://open.spotify.example/track/1"},
+                },
+            }
+        )
+
+class CloudinaryStub(StubServer):
+    name = "cloudinary"
+
+    def __init__(self, faults=None, seed=0):
+        super().__init__(faults, seed)
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.route("POST", r"/v1_1/[^/]+/(image|video|auto|raw)/upload", self._upload)
+        self.route("POST", r"/v1_1/[^/]+/(image|video|raw)/destroy", lambda _request: _ok({"result": "ok"}))
+        self.route("DELETE", r"/v1_1/[^/]+/resources/(image|video)/upload", lambda _request: _ok({"deleted": {}}))
+
+    def _upload(self, request):
+        with self._lock:
+            self._counter += 1
+            number = self._counter
+        resource_type = "image" if request["match"].group(1) in {"image", "auto"} else request["match"].group(1)
+        public_id = f"college_life/load/{number}"
+        return _ok(
+            {
+                "public_id": public_id,
+                "secure_url": f"https://res.cloudinary.example/{public_id}.jpg",
+                "resource_type": resource_type,
+            }
+        )
+
+_FILTER = re.compile(r"^(eq|neq|gt|gte|lt|lte|in|ilike|like|cs|is)\.(.*)$", re.DOTALL)
+
+def _coerce(value: str):
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+def _matches(row: dict, column: str, op: str, raw: str) -> bool:
+    value = row.get(column)
+    if op == "is":
+        return value is None if raw == "null" else str(value).lower() == raw
+    if op == "in":
+        options = {_coerce(item.strip().strip('"')) for item in raw.strip("()").split(",") if item.strip()}
+        return _coerce(str(value)) in options
+    if op == "cs":
+        wanted = [_coerce(item.strip().strip('"')) for item in raw.strip("{}").split(",") if item.strip()]
+        return all(item in (value or []) for item in wanted)
+    if op in {"ilike", "like"}:
+        pattern = like_regex(raw)
+        if op == "like":
+            pattern = re.compile(pattern.pattern, re.DOTALL)
+        return pattern.match(str(value or "")) is not None
+    target = _coerce(raw)
+    if op == "eq":
+        return value == target or str(value) == raw
+    if op == "neq":
+        return not (value == target or str(value) == raw)
+    if value is None:
+        return False
+    try:
+        return {"gt": value > target, "gte": value >= target, "lt": value < target, "lte": value <= target}[op]
+    except TypeError:
+        return False
+
+class PostgrestStub(StubServer):
+    """In-memory tables behind the PostgREST endpoints supabase-py calls."""
+
+    name = "supabase"
+
+    def __init__(self, faults=None, seed=0):
+        super().__init__(faults, seed)
+        self.tables: dict[str, list[dict]] = {}
+        self._ids: dict[str, int] = {}
+        self._lock = threading.Lock()
+        for method in ("GET", "HEAD", "POST", "PATCH", "DELETE"):
+            self.route(method, r"/rest/v1/rpc/(\w+)", lambda _request: (404, {"message": "function not found"}, {}))
+            self.route(method, r"/rest/v1/(\w+)", self._table)
+
+    def seed_table(self, name: str, rows: list[dict]) -> None:
+        with self._lock:
+            self.tables[name] = rows
+            self._ids[name] = max((row.get("id") or 0 for row in rows), default=0) + 1
+
+    def _select(self, rows, request):
+        filters, columns, order, limit, offset = [], None, None, None, 0
+        for key, value in request["query"]:
+            if key == "select":
+                columns = None if value in ("", "*") else [column.strip() for column in value.split(",")]
+            elif key == "order":
+                order = value
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            else:
+                match = _FILTER.match(value)
+                if match:
+                    filters.append((key, match.group(1), match.group(2)))
+        matched = [row for row in rows if all(_matches(row, *item) for item in filters)]
+        if order:
+            for part in reversed(order.split(",")):
+                column, _, direction = part.partition(".")
+                matched.sort(key=lambda row: (row.get(column) is None, row.get(column) or 0), reverse=direction.startswith("desc"))
+        total = len(matched)
+        matched = matched[offset:]
+        if limit is not None:
+            matched = matched[:limit]
+        return matched, columns, total
+
+    def _table(self, request):
+        table = request["match"].group(1)
+        prefer = request["headers"].get("Prefer") or ""
+        with self._lock:
+            rows = self.tables.setdefault(table, [])
+            if request["method"] == "POST":
+                payload = json.loads(request["body"] or b"[]")
+                inserted = []
+                for item in payload if isinstance(payload, list) else [payload]:
+                    row = dict(item)
+                    if row.get("id") is None:
+                        row["id"] = self._ids.get(table, 1)
+                        self._ids[table] = row["id"] + 1
+                    row.setdefault("created_at", datetime.utcnow().isoformat() + "Z")
+                    rows.append(row)
+                    inserted.append(dict(row))
+                return 201, inserted, {}
+            matched, columns, total = self._select(rows, request)
+            if request["method"] == "PATCH":
+                changes = json.loads(request["body"] or b"{}")
+                for row in matched:
+                    row.update(changes)
+            elif request["method"] == "DELETE":
+                doomed = {id(row) for row in matched}
+                self.tables[table] = [row for row in rows if id(row) not in doomed]
+            result = [dict(row) if columns is None else {column: row.get(column) for column in columns} for row in matched]
+        headers = {"Content-Range": f"0-{max(len(result) - 1, 0)}/{total}"} if "count=" in prefer else {}
+        return 200, result, headers
+
+UPSTREAMS = {
+    "supabase": PostgrestStub,
+    "openweather": OpenWeatherStub,
+    "yelp": YelpStub,
+    "api_ninjas": ApiNinjasStub,
+    "spotify": SpotifyStub,
+    "cloudinary": CloudinaryStub,
+}
@@ -0,0 +1,282 @@
+"""Self-contained load test: stub upstreams, the app under gunicorn, scripted journeys.
+
+Starts a stub server per upstream (Supabase/PostgREST, OpenWeather, Yelp,
+api-ninjas, Spotify, Cloudinary) with optional latency and error injection,
+launches the app with gunicorn.conf.py pointed at them through environment
+variables, then runs concurrent virtual users through a scripted journey and
+reports throughput and latency percentiles per route.
+
+    cd backend && python -m benchmarks.load_test --users 20 --duration 30 \\
+        --fault yelp:latency_ms=250,jitter_ms=50 --fault openweather:error_rate=0.05
+
+Sessions are signed locally with the app's secret key, the same cookie the
+Google OAuth callback would set; the OAuth redirect itself is not exercised.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from benchmarks.load_stubs import UPSTREAMS, Faults
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SECRET_KEY = "load-test-secret"
+CITIES = ["State College", "Pittsburgh", "Philadelphia", "Erie", "Harrisburg", "Altoona", "Scranton", "Reading"]
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    method: str
+    path: str
+    probability: float = 1.0
+
+# One pass of a signed-in student: open the app, read the feed, interact, check widgets, sometimes post.
+JOURNEY = [
+    Step("session", "GET", "/users/me"),
+    Step("feed", "GET", "/api/posts"),
+    Step("view", "POST", "/api/posts/{post_id}/view"),
+    Step("like", "POST", "/api/posts/{post_id}/like", 0.5),
+    Step("weather", "GET", "/api/weather?city={city}", 0.5),
+    Step("yelp", "GET", "/api/yelp?location={city}", 0.2),
+    Step("music", "GET", "/spotify/current", 0.2),
+    Step("upload", "POST", "/api/media/upload", 0.1),
+]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def seed_database(stub, users: int, posts: int, likes_per_post: int, seed: int = 861) -> None:
+    rng = random.Random(seed)
+    created = datetime(2026, 1, 1)
+    stub.seed_table(
+        "users",
+        [
+            {"id": n, "email": f"student{n}@school.edu", "name": f"Student {n}", "role": "user", "created_at": created.isoformat() + "Z"}
+            for n in range(1, users + 1)
+        ],
+    )
+    rows = []
+    for post_id in range(1, posts + 1):
+        author = rng.randint(1, users)
+        likes = rng.sample(range(1, users + 1), min(likes_per_post, users))
+        rows.append(
+            {
+                "id": post_id,
+                "caption": f"Post {post_id}",
+                "media_public_id": f"college_life/{author}/{post_id}",
+                "media_url": f"https://res.cloudinary.example/{post_id}.jpg",
+                "media_type": "image",
+                "author_id": author,
+                "author_email": f"student{author}@school.edu",
+                "author_name": f"Student {author}",
+                "liked_by": likes,
+                "viewed_by": list(likes),
+                "created_at": (created + timedelta(minutes=post_id)).isoformat() + "Z",
+            }
+        )
+    stub.seed_table("posts", rows)
+    stub.seed_table("media_assets", [])
+
+def app_environment(stubs: dict, bind: str, workers: int, metrics_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            "GUNICORN_BIND": bind,
+            "GUNICORN_WORKERS": str(workers),
+            "PROMETHEUS_MULTIPROC_DIR": metrics_dir,
+            "FLASK_SECRET_KEY": SECRET_KEY,
+            "LOG_LEVEL": "WARNING",
+            "RATELIMIT_ENABLED": "false",
+            "RATELIMIT_STORAGE_URI": "memory://",
+            "SUPABASE_URL": stubs["supabase"].url,
+            "SUPABASE_SERVICE_ROLE_KEY": "stub-service-role-key",
+            "CLOUDINARY_CLOUD_NAME": "stub",
+            "CLOUDINARY_API_KEY": "stub",
+            "CLOUDINARY_API_SECRET": "stub",
+            "CLOUDINARY_UPLOAD_PREFIX": stubs["cloudinary"].url,
+            "OPENWEATHER_BASE_URL": stubs["openweather"].url,
+            "WEATHER_API": "stub",
+            "YELP_BASE_URL": stubs["yelp"].url,
+            "YELP_API_KEY": "stub",
+            "API_NINJAS_BASE_URL": stubs["api_ninjas"].url,
+            "UNI_API_KEY": "stub",
+            "SPOTIFY_API_BASE_URL": f"{stubs['spotify'].url}/v1",
+        }
+    )
+    return env
+
+def session_cookie(user_id: int) -> str:
+    """The signed ``college_session`` cookie the OAuth callback would have set."""
+    from flask import Flask
+    from flask.sessions import SecureCookieSessionInterface
+
+    app = Flask("load_test")
+    app.secret_key = SECRET_KEY
+    serializer = SecureCookieSessionInterface().get_signing_serializer(app)
+    return serializer.dumps(
+        {
+            "user": f"student{user_id}@school.edu",
+            "user_name": f"Student {user_id}",
+            "user_id": user_id,
+            "user_role": "user",
+            "spotify_token": {"access_token": "stub", "expires_at": time.time() + 86400},
+        }
+    )
+
+def wait_until_ready(base_url: str, process, timeout: float = 30.0) -> None:
+    import requests
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("app exited during startup")
+        try:
+            if requests.get(f"{base_url}/health/live", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("app did not become ready")
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, step: str, seconds: float, status: str) -> None:
+        with self._lock:
+            self.latencies[step].append(seconds)
+            self.statuses[step][status] += 1
+
+def virtual_user(base_url: str, user_id: int, posts: int, deadline: float, recorder: Recorder, seed: int) -> None:
+    import requests
+
+    rng = random.Random(seed)
+    http = requests.Session()
+    http.cookies.set("college_session", session_cookie(user_id), domain="127.0.0.1", path="/")
+    while time.time() < deadline:
+        for step in JOURNEY:
+            if rng.random() >= step.probability or time.time() >= deadline:
+                continue
+            url = base_url + step.path.format(post_id=rng.randint(1, posts), city=rng.choice(CITIES))
+            files = {"file": (f"load-{rng.random()}.jpg", os.urandom(2048), "image/jpeg")} if step.name == "upload" else None
+            start = time.perf_counter()
+            try:
+                response = http.request(step.method, url, files=files, timeout=30)
+                status = str(response.status_code)
+            except requests.RequestException as exc:
+                status = type(exc).__name__
+            recorder.record(step.name, time.perf_counter() - start, status)
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    report = {}
+    for step in [step.name for step in JOURNEY if step.name in recorder.latencies]:
+        timings = recorder.latencies[step]
+        statuses = dict(recorder.statuses[step])
+        errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 500)
+        report[step] = {
+            "requests": len(timings),
+            "throughput_rps": round(len(timings) / elapsed, 1),
+            "p50_ms": round(percentile(timings, 50) * 1000, 2),
+            "p90_ms": round(percentile(timings, 90) * 1000, 2),
+            "p99_ms": round(percentile(timings, 99) * 1000, 2),
+            "max_ms": round(max(timings) * 1000, 2),
+            "mean_ms": round(statistics.fmean(timings) * 1000, 2),
+            "error_rate": round(errors / len(timings), 4),
+            "statuses": statuses,
+        }
+    return report
+
+def parse_faults(values: list[str]) -> dict[str, Faults]:
+    faults = {}
+    for value in values or []:
+        name, _, spec = value.partition(":")
+        if name not in UPSTREAMS:
+            raise SystemExit(f"unknown upstream {name!r}; expected one of {', '.join(sorted(UPSTREAMS))}")
+        faults[name] = Faults.parse(spec)
+    return faults
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--seed-users", type=int, default=500)
+    parser.add_argument("--seed-posts", type=int, default=200)
+    parser.add_argument("--likes-per-post", type=int, default=20)
+    parser.add_argument("--fault", action="append", help="upstream:latency_ms=..,jitter_ms=..,error_rate=..,error_status=..")
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    parser.add_argument("--app-log", type=Path, help="write the app's stdout/stderr here (discarded by default)")
+    args = parser.parse_args(argv)
+
+    faults = parse_faults(args.fault)
+    stubs = {name: cls(faults.get(name), seed=index).start() for index, (name, cls) in enumerate(UPSTREAMS.items())}
+    seed_database(stubs["supabase"], args.seed_users, args.seed_posts, args.likes_per_post)
+
+    bind = f"127.0.0.1:{free_port()}"
+    base_url = f"http://{bind}"
+    app_log = open(args.app_log, "wb") if args.app_log else subprocess.DEVNULL
+    with tempfile.TemporaryDirectory(prefix="college_life_load_") as metrics_dir:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "main:app"],
+            cwd=BACKEND_DIR,
+            env=app_environment(stubs, bind, args.workers, metrics_dir),
+            stdout=app_log,
+            stderr=app_log,
+        )
+        try:
+            wait_until_ready(base_url, process)
+            recorder = Recorder()
+            started = time.time()
+            deadline = started + args.duration
+            with ThreadPoolExecutor(max_workers=args.users) as pool:
+                for n in range(args.users):
+                    pool.submit(virtual_user, base_url, n % args.seed_users + 1, args.seed_posts, deadline, recorder, n)
+            elapsed = time.time() - started
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            for stub in stubs.values():
+                stub.stop()
+            if args.app_log:
+                app_log.close()
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in {"json", "app_log"}},
+        "upstream_requests": {name: stub.requests for name, stub in stubs.items()},
+        "routes": summarize(recorder, elapsed),
+    }
+    total = sum(route["requests"] for route in report["routes"].values())
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s) from {args.users} users, {args.workers} workers")
+    print(f"{'route':<10} {'reqs':>7} {'req/s':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for name, route in report["routes"].items():
+        print(
+            f"{name:<10} {route['requests']:>7} {route['throughput_rps']:>8.1f} {route['p50_ms']:>9.2f} {route['p90_ms']:>9.2f} "
+            f"{route['p99_ms']:>9.2f} {route['max_ms']:>9.2f} {route['error_rate']:>7.1%}"
+        )
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
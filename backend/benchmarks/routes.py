@@ -0,0 +1,260 @@
+"""Route-level benchmarks on the local data backend.
+
+Seeds a synthetic dataset (posts with ``liked_by``/``viewed_by`` arrays, users)
+into ``services.local_db`` (or the tests' FakeSupabase with ``--backend fake``),
+drives the Flask test client through the database-backed routes and reports
+p50/p99 latency, throughput and peak traced memory per route. Results can be
+saved as a JSON baseline and later runs compared against it.
+
+    cd backend && python -m benchmarks.routes --preset small --save benchmarks/baselines/routes-small.json
+    cd backend && python -m benchmarks.routes --preset small --compare benchmarks/baselines/routes-small.json
+
+Upstream proxy routes (weather, Yelp, Spotify, media) are covered by the load
+test harness instead. Numbers are only comparable on the same machine.
+"""
+from __future__ import annotations
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+PRESETS = {
+    "small": {"posts": 1_000, "users": 1_000, "likes_per_post": 10},
+    "medium": {"posts": 10_000, "users": 10_000, "likes_per_post": 50},
+    "large": {"posts": 100_000, "users": 100_000, "likes_per_post": 200},
+    "xl": {"posts": 1_000_000, "users": 100_000, "likes_per_post": 20},
+}
+
+@dataclass(frozen=True)
+class Dataset:
+    posts: int
+    users: int
+    likes_per_post: int
+    seed: int = 861
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: str
+    role: str = "user"
+    body: dict | None = None
+
+SCENARIOS = [
+    Scenario("health_live", "GET", "/health/live"),
+    Scenario("users_me", "GET", "/users/me"),
+    Scenario("feed", "GET", "/api/posts"),
+    Scenario("like_toggle", "POST", "/api/posts/{post_id}/like"),
+    Scenario("view", "POST", "/api/posts/{post_id}/view"),
+    Scenario("create_post", "POST", "/api/posts", body={"caption": "bench", "media_public_id": "bench/1", "media_url": "https://cdn/bench.jpg"}),
+    Scenario("update_caption", "PUT", "/api/posts/{own_post_id}", body={"caption": "edited"}),
+    Scenario("get_user", "GET", "/users/{user_id}", role="admin"),
+    Scenario("users_page", "GET", "/users?limit=50", role="admin"),
+    Scenario("users_search", "GET", "/users?name=student%2042&include_total=1", role="admin"),
+    Scenario("metrics", "GET", "/metrics"),
+]
+
+BACKENDS = ("local", "fake")
+
+def generate(dataset: Dataset) -> tuple[list[dict], list[dict]]:
+    rng = random.Random(dataset.seed)
+    created = datetime(2026, 1, 1)
+    users = []
+    for user_id in range(1, dataset.users + 1):
+        users.append(
+            {
+                "id": user_id,
+                "email": f"student{user_id}@school.edu",
+                "name": f"Student {user_id}",
+                "role": "admin" if user_id == 1 else "user",
+                "created_at": (created + timedelta(seconds=user_id)).isoformat() + "Z",
+            }
+        )
+    posts = []
+    population = range(1, dataset.users + 1)
+    for post_id in range(1, dataset.posts + 1):
+        author_id = rng.randint(1, dataset.users)
+        likes = rng.sample(population, min(dataset.likes_per_post, dataset.users))
+        posts.append(
+            {
+                "id": post_id,
+                "caption": f"Post {post_id}",
+                "media_public_id": f"college_life/{author_id}/{post_id}",
+                "media_url": f"https://cdn/{post_id}.jpg",
+                "media_type": "image",
+                "author_id": author_id,
+                "author_email": f"student{author_id}@school.edu",
+                "author_name": f"Student {author_id}",
+                "liked_by": likes,
+                "viewed_by": likes + rng.sample(population, min(dataset.likes_per_post, dataset.users)),
+                "created_at": (created + timedelta(minutes=post_id)).isoformat() + "Z",
+                "updated_at": (created + timedelta(minutes=post_id)).isoformat() + "Z",
+            }
+        )
+    return users, posts
+
+def seed(backend: str, users: list[dict], posts: list[dict]):
+    """A client holding the rows, loaded in bulk rather than inserted query by query."""
+    if backend == "fake":
+        from tests.conftest import FakeSupabase
+
+        fake = FakeSupabase()
+        fake.store.update(users=users, posts=posts, _id_counter={"users": len(users) + 1, "posts": len(posts) + 1})
+        return fake
+    from services.local_db import LocalDatabase
+
+    db = LocalDatabase()
+    db.load("users", users)
+    db.load("posts", posts)
+    return db
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+def _login(client, user: dict) -> None:
+    with client.session_transaction() as sess:
+        sess["user"] = user["email"]
+        sess["user_name"] = user["name"]
+        sess["user_role"] = user["role"]
+        sess["user_id"] = user["id"]
+
+def _request(client, scenario: Scenario, context: dict):
+    return client.open(scenario.path.format(**context), method=scenario.method, json=scenario.body)
+
+def run_scenario(main, client, scenario: Scenario, context: dict, iterations: int, max_seconds: float) -> dict:
+    _request(client, scenario, context)
+    timings: list[float] = []
+    statuses: set[int] = set()
+    deadline = time.perf_counter() + max_seconds
+    while len(timings) < iterations and (len(timings) < 5 or time.perf_counter() < deadline):
+        main.cache.clear()
+        start = time.perf_counter()
+        response = _request(client, scenario, context)
+        timings.append(time.perf_counter() - start)
+        statuses.add(response.status_code)
+
+    main.cache.clear()
+    tracemalloc.start()
+    _request(client, scenario, context)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations": len(timings),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "throughput_rps": round(len(timings) / sum(timings), 1),
+        "peak_kib": round(peak / 1024, 1),
+        "statuses": sorted(statuses),
+    }
+
+def run(dataset: Dataset, iterations: int, max_seconds: float, only: set[str] | None = None, backend: str = "local") -> dict:
+    import main
+
+    users, posts = generate(dataset)
+    client_db = seed(backend, users, posts)
+    original_ensure, original_level = main.ensure_supabase, main.logger.level
+    main.ensure_supabase = lambda: client_db
+    main.limiter.enabled = False
+    main.logger.setLevel(logging.ERROR)
+    client = main.app.test_client()
+    admin, member = users[0], users[posts[0]["author_id"] - 1]
+    context = {"post_id": posts[len(posts) // 2]["id"], "own_post_id": posts[0]["id"], "user_id": member["id"]}
+    results = {}
+    try:
+        for scenario in SCENARIOS:
+            if only and scenario.name not in only:
+                continue
+            _login(client, admin if scenario.role == "admin" else member)
+            results[scenario.name] = run_scenario(main, client, scenario, context, iterations, max_seconds)
+    finally:
+        main.ensure_supabase = original_ensure
+        main.limiter.enabled = True
+        main.logger.setLevel(original_level)
+    return {
+        "backend": backend,
+        "dataset": asdict(dataset),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "recorded_at": datetime.utcnow().isoformat() + "Z",
+        "results": results,
+    }
+
+def compare(report: dict, baseline: dict, max_regression: float, min_delta_ms: float = 0.5) -> list[str]:
+    """Routes whose p50 grew by more than ``max_regression`` (0.2 = 20%) and
+    ``min_delta_ms`` over the baseline; the absolute floor keeps sub-millisecond
+    routes from failing on scheduler noise."""
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["p50_ms"]:
+            continue
+        change = current["p50_ms"] / previous["p50_ms"] - 1
+        print(f"{name:<16} p50 {previous['p50_ms']:>9.3f} -> {current['p50_ms']:>9.3f} ms ({change:+.0%})")
+        if change > max_regression and current["p50_ms"] - previous["p50_ms"] > min_delta_ms:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--backend", choices=BACKENDS, default="local", help="local_db, or the tests' FakeSupabase")
+    parser.add_argument("--posts", type=int)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--likes-per-post", type=int)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time cap per route (at least 5 samples are taken)")
+    parser.add_argument("--routes", help="comma-separated scenario names")
+    parser.add_argument("--save", type=Path, help="write the report as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    # Shared CI runners are noisy; tighten this on dedicated hardware.
+    parser.add_argument("--max-regression", type=float, default=0.5)
+    parser.add_argument("--min-delta-ms", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    sizes = dict(PRESETS[args.preset])
+    for key in ("posts", "users", "likes_per_post"):
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+    only = {name.strip() for name in args.routes.split(",")} if args.routes else None
+
+    report = run(Dataset(**sizes), max(args.iterations, 1), args.max_seconds, only, args.backend)
+    report["preset"] = args.preset
+
+    print(f"{sizes['posts']} posts, {sizes['users']} users, {sizes['likes_per_post']} likes/post on {args.backend}")
+    print(f"{'route':<16} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9} {'peak KiB':>9}  status")
+    for name, result in report["results"].items():
+        print(
+            f"{name:<16} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['throughput_rps']:>9.1f} "
+            f"{result['peak_kib']:>9.1f}  {','.join(map(str, result['statuses']))}"
+        )
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nbaseline written to {args.save}")
+    if args.compare:
+        print()
+        regressions = compare(report, json.loads(args.compare.read_text()), args.max_regression, args.min_delta_ms)
+        if regressions:
+            print(f"\nFAIL: p50 regressed more than {args.max_regression:.0%} on {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+"""Cold-start benchmark for the backend.
+
+Each run starts a fresh interpreter and measures importing ``main``, building a
+second app with ``create_app()`` and serving the first ``/health/live`` request.
+
+    cd backend && python -m benchmarks.startup --runs 10
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+app = main.create_app()
+t2 = time.perf_counter()
+app.test_client().get("/health/live")
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+}))
+"""
+
+def run_once() -> dict[str, float]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    sample = json.loads(completed.stdout.strip().splitlines()[-1])
+    sample["process_ms"] = (time.perf_counter() - started) * 1000
+    return sample
+
+def summarize(samples: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    return {
+        key: {
+            "median": round(statistics.median(s[key] for s in samples), 2),
+            "min": round(min(s[key] for s in samples), 2),
+            "max": round(max(s[key] for s in samples), 2),
+        }
+        for key in samples[0]
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="write the summary to this file")
+    args = parser.parse_args(argv)
+
+    summary = summarize([run_once() for _ in range(max(args.runs, 1))])
+    for key, stats in summary.items():
+        print(f"{key:<18} median {stats['median']:>9.2f} ms   min {stats['min']:>9.2f}   max {stats['max']:>9.2f}")
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(summary, indent=2) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import os
+
+# Must be set, and exist, before prometheus_client is imported anywhere in the
+# master: with preload_app the app (and its metrics) load before on_starting runs.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/college_life_metrics")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+# Per-process in-memory counters would multiply every limit by the worker count.
+os.environ.setdefault("RATELIMIT_STORAGE_URI", "sqlite:///tmp/college_life_ratelimit.db")
+# Live feed events reach streams held open by other workers.
+os.environ.setdefault("LIVE_FEED_BUS_URI", "sqlite:///tmp/college_life_live.db")
+
+from services.metrics import compact_worker_files, prepare_multiprocess_dir  # noqa: E402
+
+WORKER_CLASSES = {"sync", "gthread", "gevent"}
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def _default_workers(worker_class, cpus):
+    # Sync workers block on I/O, so they need the classic 2n+1; thread and
+    # greenlet workers multiplex I/O inside each process and need fewer.
+    if worker_class == "sync":
+        return cpus * 2 + 1
+    return cpus + 1
+
+def _live_feed_streams(worker_class, threads, requested):
+    """SSE streams one worker may hold open.
+
+    A gthread stream pins a thread until it closes, so at most half the
+    threads stream and the rest keep serving requests. A sync worker has no
+    thread to spare. gevent streams only cost a greenlet.
+    """
+    if worker_class == "sync":
+        return 0
+    if worker_class == "gthread":
+        limit = threads // 2
+        return limit if requested is None else min(requested, limit)
+    return 100 if requested is None else requested
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread").strip().lower()
+if worker_class not in WORKER_CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be one of {sorted(WORKER_CLASSES)}, got {worker_class!r}")
+if worker_class == "gevent":
+    try:
+        import gevent  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("GUNICORN_WORKER_CLASS=gevent requires the gevent package") from exc
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = max(1, min(_env_int("GUNICORN_WORKERS", _default_workers(worker_class, _cpu_count())), _env_int("GUNICORN_MAX_WORKERS", 16)))
+threads = _env_int("GUNICORN_THREADS", 4) if worker_class == "gthread" else 1
+worker_connections = _env_int("GUNICORN_WORKER_CONNECTIONS", 1000)
+# Read by the app when it loads, after this file.
+os.environ["LIVE_FEED_MAX_STREAMS"] = str(_live_feed_streams(worker_class, threads, _env_int("LIVE_FEED_MAX_STREAMS", None)))
+
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+
+# Heartbeat files on tmpfs so a slow container disk cannot trip the worker timeout.
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+# Requests are already logged as structured http_request events.
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+def on_starting(server):
+    prepare_multiprocess_dir(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+def child_exit(server, worker):
+    compact_worker_files(worker.pid)
@@ -1,46 +1,52 @@
 import os
-import json
+import hashlib
 import logging
 import time
 import uuid
 from datetime import datetime
 from functools import wraps
 from urllib.parse import urlparse
-import cloudinary
-import cloudinary.api
-import cloudinary.uploader
-import requests
-from authlib.integrations.base_client.errors import MismatchingStateError
-from authlib.integrations.flask_client import OAuth
 from dotenv import load_dotenv
-from flask import Flask, jsonify, redirect, request, session, g, Response
+from flask import Blueprint, Flask, jsonify, redirect, request, session, g, Response, current_app
 from flask_caching import Cache
 from flask_cors import CORS
 from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
-from supabase import Client, create_client
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST
 from werkzeug.exceptions import HTTPException
+from services import compression, feed, http_client, json_provider, media, oauth_clients, repositories, supabase_client
+from services.health import HealthMonitor
+from services.instrumentation import request_breakdown, track
+from services.log_pipeline import (
+    AsyncQueueHandler,
+    EventSampler,
+    JsonEventFormatter,
+    parse_path_list,
+    parse_sample_rates,
+)
+from services.media_assets import MEDIA_ASSETS_TABLE, acquire_asset, discard_asset, find_asset, hash_stream, record_asset, release_asset
+from services.metrics import MetricsExporter
 from services.post_rules import (
     can_user_modify_post,
+    interactions,
     normalize_caption,
-    normalize_id_list,
+    observe_post_write,
     validate_create_payload,
 )
+from services.process_local import ProcessLocal
+from services.profiler import ProfilerControl
+from services.rate_limit import rate_limit_key
+from services.tracing import outbound_headers, span, start_trace
 
 load_dotenv()
 
-app = Flask(__name__)
-cache = Cache(app, config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": 300})
-app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-key")
-app.config["SESSION_COOKIE_NAME"] = "college_session"
-app.config["SESSION_COOKIE_HTTPONLY"] = True
-app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
-app.config["SESSION_COOKIE_SECURE"] = False
-
 API_KEY = os.getenv("UNI_API_KEY")
 WEATHER_API_KEY = os.getenv("WEATHER_API")
 YELP_API_KEY = os.getenv("YELP_API_KEY")
+# Upstream base URLs are overridable so load tests can point at local stubs.
+API_NINJAS_BASE_URL = os.getenv("API_NINJAS_BASE_URL", "https://api.api-ninjas.com").rstrip("/")
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org").rstrip("/")
+YELP_BASE_URL = os.getenv("YELP_BASE_URL", "https://api.yelp.com").rstrip("/")
+SPOTIFY_API_BASE_URL = os.getenv("SPOTIFY_API_BASE_URL", "https://api.spotify.com/v1").rstrip("/")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173").rstrip("/")
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000").rstrip("/")
 ADMIN_EMAILS = {
@@ -51,56 +57,22 @@ ADMIN_EMAILS = {
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-supabase: Client | None = None
-if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
-    cleaned_url = SUPABASE_URL.strip().strip('"').strip("'")
-    supabase = create_client(cleaned_url, SUPABASE_SERVICE_ROLE_KEY.strip())
-elif os.getenv("DATABASE_URL") and SUPABASE_SERVICE_ROLE_KEY:
+def _resolve_supabase_url():
+    if SUPABASE_URL:
+        return SUPABASE_URL.strip().strip('"').strip("'")
     db_url = os.getenv("DATABASE_URL", "").strip().strip('"').strip("'")
-    parsed = urlparse(db_url)
-    host = parsed.hostname or ""
+    host = urlparse(db_url).hostname or ""
     if host.startswith("db.") and host.endswith(".supabase.co"):
         project_ref = host[3:].split(".supabase.co")[0]
-        candidate = f"https://{project_ref}.supabase.co"
-        supabase = create_client(candidate, SUPABASE_SERVICE_ROLE_KEY.strip())
-
-CORS(
-    app,
-    origins=[
-        "http://localhost:3000",
-        "http://localhost:5173",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:5173",
-    ],
-    supports_credentials=True,
-)
-
-oauth = OAuth(app)
-oauth.register(
-    name="google",
-    client_id=os.getenv("GOOGLE_CLIENT_ID"),
-    client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
-    server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
-    client_kwargs={"scope": "openid email profile"},
-)
-
-spotify = oauth.register(
-    name="spotify",
-    client_id=os.getenv("SPOTIFY_CLIENT_ID"),
-    client_secret=os.getenv("SPOTIFY_CLIENT_SECRET"),
-    access_token_url="https://accounts.spotify.com/api/token",
-    authorize_url="https://accounts.spotify.com/authorize",
-    api_base_url="https://api.spotify.com/v1",
-    client_kwargs={
-        "scope": "user-read-playback-state user-read-currently-playing streaming user-modify-playback-state"
-    },
-)
+        return f"https://{project_ref}.supabase.co"
+    return None
 
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-)
+SUPABASE_CONFIGURED = bool(SUPABASE_SERVICE_ROLE_KEY and _resolve_supabase_url())
+# "supabase", or a local backend for offline development: memory:// or sqlite:///path/to.db
+DATA_BACKEND = os.getenv("DATA_BACKEND", "supabase").strip()
+# Unset keeps Flask's signed-cookie sessions; memory://, sqlite:///path or redis://host:port stores them server-side.
+SESSION_STORE = os.getenv("SESSION_STORE", "").strip()
+DATABASE_CONFIGURED = DATA_BACKEND != "supabase" or SUPABASE_CONFIGURED
 
 CLOUDINARY_CONFIGURED = all(
     [
@@ -110,18 +82,68 @@ CLOUDINARY_CONFIGURED = all(
     ]
 )
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["200 per day", "50 per hour"])
-limiter.init_app(app)
+CORS_ORIGINS = [
+    "http://localhost:3000",
+    "http://localhost:5173",
+    "http://127.0.0.1:3000",
+    "http://127.0.0.1:5173",
+]
+
+cache = Cache(config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": 300})
+# Newest rendered /api/posts feed in this process, keyed by feed version.
+FEED_CACHE = feed.FeedCache()
+LIVE_FEED_BUS_URI = os.getenv("LIVE_FEED_BUS_URI", "memory://").strip()
+
+def _create_live_feed():
+    # Deferred like the SDK clients: sqlite3 and the stream machinery load on first use.
+    from services import live_feed
+
+    return live_feed.LiveFeed(live_feed.open_bus(LIVE_FEED_BUS_URI))
+
+LIVE_FEED = ProcessLocal(_create_live_feed)
+# Importing services.rate_limit registers the sqlite:// storage scheme.
+limiter = Limiter(
+    key_func=rate_limit_key,
+    default_limits=["200 per day", "50 per hour"],
+    storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"),
+    strategy=os.getenv("RATELIMIT_STRATEGY", "sliding-window-counter"),
+    enabled=os.getenv("RATELIMIT_ENABLED", "true").strip().lower() not in {"0", "false", "no", "off"},
+)
+api = Blueprint("college_life", __name__)
+
+def _create_supabase():
+    if DATA_BACKEND != "supabase":
+        return supabase_client.create_local(DATA_BACKEND)
+    if not SUPABASE_CONFIGURED:
+        return None
+    return supabase_client.create(_resolve_supabase_url(), SUPABASE_SERVICE_ROLE_KEY.strip())
+
+SUPABASE_CLIENT = ProcessLocal(_create_supabase)
+OAUTH_CLIENTS = ProcessLocal(lambda: oauth_clients.build_oauth(current_app._get_current_object()))
+
+def oauth_client(name):  # pragma: no cover
+    return OAUTH_CLIENTS.get().create_client(name)
 
 logger = logging.getLogger("college_life")
 if not logger.handlers:
     handler = logging.StreamHandler()
-    formatter = logging.Formatter("%(message)s")
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    handler.setFormatter(JsonEventFormatter(dumps=json_provider.dumps))
+    logger.addHandler(
+        AsyncQueueHandler(
+            handler,
+            maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+            on_drop=lambda: LOG_RECORDS_DROPPED.inc(),
+        )
+    )
 logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 logger.propagate = False
 
+TRACE_SLOW_REQUEST_MS = float(os.getenv("TRACE_SLOW_REQUEST_MS", "1000"))
+PROFILER = ProfilerControl(os.getenv("PROFILE_OUTPUT_DIR", "/tmp/college_life_profiles"))
+
+LOG_SAMPLER = EventSampler(parse_sample_rates(os.getenv("LOG_SAMPLE_RATES")))
+LOG_SKIP_PATHS = parse_path_list(os.getenv("LOG_SKIP_PATHS", "/metrics,/health,/health/live,/health/ready"))
+
 REQUEST_COUNT = Counter(
     "http_requests_total",
     "Total HTTP requests by method, path, and status code",
@@ -134,6 +156,26 @@ REQUEST_LATENCY = Histogram(
     buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
 )
 POSTS_CREATED_TOTAL = Counter("posts_created_total", "Number of posts created")
+METRICS_EXPORTER = MetricsExporter(ttl_seconds=float(os.getenv("METRICS_CACHE_SECONDS", "1")))
+LOG_RECORDS_DROPPED = Counter("log_records_dropped_total", "Log records dropped because the log queue was full")
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Rate limit checks by path and decision",
+    ["path", "decision"],
+)
+DATABASE_DEPENDENCIES = {"supabase", "local_db"}
+DB_ROUND_TRIPS = Histogram(
+    "db_round_trips_per_request",
+    "Database queries made while serving one request, by path",
+    ["path"],
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50),
+)
+SESSION_LOOKUP_LATENCY = Histogram(
+    "session_store_lookup_seconds",
+    "Time to load a server-side session from its store",
+    ["store"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
 
 def _normalize_origin(origin):  # pragma: no cover
     if not origin:
@@ -193,26 +235,32 @@ def _clear_spotify_state():  # pragma: no cover
         session.pop(key, None)
 
 def _event(event, level="info", **data):  # pragma: no cover
-    payload = {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "level": level.upper(),
-        "event": event,
-        **data,
-    }
-    message = json.dumps(payload, default=str)
-    getattr(logger, level if hasattr(logger, level) else "info")(message)
+    levelno = logging.getLevelName(level.upper())
+    if not isinstance(levelno, int):
+        levelno = logging.INFO
+    if not logger.isEnabledFor(levelno):
+        return
+    if levelno < logging.WARNING and not LOG_SAMPLER.should_log(event):
+        return
+    logger.log(levelno, {"event": event, **data})
+
+def _session_store_failed(operation, error):
+    _event("session_store_failed", level="warning", operation=operation, error=str(error))
 
 def _request_path():  # pragma: no cover
     if request.url_rule and request.url_rule.rule:
         return request.url_rule.rule
     return request.path
 
-@app.before_request
+@api.before_app_request
 def _before_request():  # pragma: no cover
     g.request_start = time.perf_counter()
     g.request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+    start_trace(f"{request.method} {_request_path()}", request.headers.get("traceparent"))
+    g.profiler = PROFILER.maybe_start((request.path, _request_path()), g.request_id)
+    _resume_user_cleanups()
 
-@app.after_request
+@api.after_app_request
 def _after_request(response):  # pragma: no cover
     elapsed = max(time.perf_counter() - getattr(g, "request_start", time.perf_counter()), 0)
     path = _request_path()
@@ -222,19 +270,65 @@ def _after_request(response):  # pragma: no cover
     REQUEST_COUNT.labels(method=method, path=path, status=status).inc()
     REQUEST_LATENCY.labels(method=method, path=path).observe(elapsed)
     response.headers["X-Request-ID"] = getattr(g, "request_id", "")
+    timings = g.get("dependency_timings") or {}
+    DB_ROUND_TRIPS.labels(path=path).observe(sum(timings[name]["calls"] for name in DATABASE_DEPENDENCIES & timings.keys()))
+    current_limit = limiter.current_limit
+    if current_limit is not None:
+        decision = "limited" if current_limit.breached else "allowed"
+        RATE_LIMIT_DECISIONS.labels(path=path, decision=decision).inc()
+
+    trace = g.get("trace")
+    if trace is not None:
+        trace.finish()
+        response.headers["X-Trace-ID"] = trace.trace_id
+        if elapsed * 1000 >= TRACE_SLOW_REQUEST_MS:
+            _event(
+                "slow_request",
+                level="warning",
+                request_id=getattr(g, "request_id", None),
+                method=method,
+                path=path,
+                status_code=response.status_code,
+                duration_ms=round(elapsed * 1000, 2),
+                trace=trace.to_dict(),
+            )
+
+    if request.path in LOG_SKIP_PATHS:
+        return response
 
     _event(
         "http_request",
-        level="info",
+        level="error" if response.status_code >= 500 else "info",
         request_id=getattr(g, "request_id", None),
+        trace_id=trace.trace_id if trace is not None else None,
         method=method,
         path=path,
         status_code=response.status_code,
         duration_ms=round(elapsed * 1000, 2),
+        dependencies=request_breakdown(),
     )
     return response
 
-@app.errorhandler(Exception)
+# Registered after _after_request so it runs first and the logged duration includes it.
+@api.after_app_request
+def _compress_response(response):
+    return compression.apply(response, request.accept_encodings)
+
+@api.teardown_app_request
+def _teardown_request(_error):  # pragma: no cover
+    sampler = g.pop("profiler", None)
+    if sampler is None:
+        return
+    output_path = sampler.stop()
+    _event(
+        "profile_written",
+        request_id=getattr(g, "request_id", None),
+        path=_request_path(),
+        output_path=output_path,
+        samples=sum(sampler.stacks.values()),
+    )
+
+@api.app_errorhandler(Exception)
 def _handle_unexpected_error(error):  # pragma: no cover
     if isinstance(error, HTTPException):
         return error
@@ -250,9 +344,47 @@ def _handle_unexpected_error(error):  # pragma: no cover
     return jsonify({"error": "Internal server error", "request_id": request_id}), 500
 
 def ensure_supabase():
-    if supabase is None:
+    client = SUPABASE_CLIENT.get()
+    if client is None:
         raise RuntimeError("Supabase is not configured. Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY.")
-    return supabase
+    return client
+
+def data_access() -> repositories.Repositories:
+    """This request's repositories; rows loaded once are reused for the rest of the request."""
+    repos = g.get("repositories")
+    if repos is None:
+        repos = g.repositories = repositories.Repositories(ensure_supabase())
+    return repos
+
+def _check_database():
+    # Fetch a single id without count="exact" so the check stays cheap as users grows.
+    ensure_supabase().table("users").select("id").limit(1).execute()
+
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "10"))
+HEALTH_MONITOR = HealthMonitor(
+    _check_database,
+    interval_seconds=HEALTH_CHECK_INTERVAL_SECONDS,
+    stale_after_seconds=float(os.getenv("HEALTH_STALE_SECONDS", str(HEALTH_CHECK_INTERVAL_SECONDS * 3))),
+)
+
+USERS_COUNT_CACHE_SECONDS = int(os.getenv("USERS_COUNT_CACHE_SECONDS", "60"))
+USERS_COUNT_VERSION_KEY = "users_count_version"
+
+def _count_users(client, query):
+    """Exact count for the admin listing, cached per filter until users change."""
+    version = cache.get(USERS_COUNT_VERSION_KEY) or 0
+    key = f"users_count:{version}:{query.filter_key()}"
+    total = cache.get(key)
+    if total is None:
+        from services.user_listing import apply_filters
+
+        result = apply_filters(client.table("users").select("id", count="exact", head=True), query).execute()
+        total = result.count or 0
+        cache.set(key, total, timeout=USERS_COUNT_CACHE_SECONDS)
+    return total
+
+def _invalidate_user_counts():
+    cache.set(USERS_COUNT_VERSION_KEY, time.time_ns(), timeout=0)
 
 def normalize_user(row):
     user_id = row.get("id")
@@ -267,15 +399,11 @@ def normalize_user(row):
         "created_at": row.get("created_at"),
     }
 
-def _ids_as_ints(values):
-    return normalize_id_list(values)
-
-def serialize_post(row, current_user_id=None):
-    liked_by = _ids_as_ints(row.get("liked_by") or [])
-    viewed_by = _ids_as_ints(row.get("viewed_by") or [])
-    current = int(current_user_id) if current_user_id is not None else None
-
-    return {
+def _shared_post(row):
+    """The post fields every user sees, plus the parsed ``liked_by``/``viewed_by`` sets."""
+    liked_by = interactions(row, "liked_by")
+    viewed_by = interactions(row, "viewed_by")
+    post = {
         "id": row["id"],
         "caption": row.get("caption", ""),
         "created_at": row.get("created_at"),
@@ -291,9 +419,77 @@ def serialize_post(row, current_user_id=None):
         },
         "likes": len(liked_by),
         "views": len(viewed_by),
-        "liked_by_me": current in liked_by if current is not None else False,
-        "viewed_by_me": current in viewed_by if current is not None else False,
     }
+    return post, liked_by, viewed_by
+
+def serialize_post(row, current_user_id=None):
+    post, liked_by, viewed_by = _shared_post(row)
+    current = int(current_user_id) if current_user_id is not None else None
+    post["liked_by_me"] = current in liked_by if current is not None else False
+    post["viewed_by_me"] = current in viewed_by if current is not None else False
+    return post
+
+def _etag(*parts):
+    """Strong ETag naming one representation, e.g. a feed version for one user."""
+    return hashlib.blake2b(json_provider.dumps(parts).encode(), digest_size=12).hexdigest()
+
+def _conditional(etag, render):
+    """A bodiless 304 when the client holds ``etag`` (in any encoding), otherwise ``render()``, both tagged."""
+    held = next((tag for tag in compression.etag_variants(etag) if request.if_none_match.contains(tag)), None)
+    if held is not None:
+        response = current_app.response_class(status=304)
+        response.set_etag(held)
+    else:
+        response = render()
+        response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def _publish(event_type, data):
+    """Push a live feed event; a failure never fails the write that caused it."""
+    try:
+        LIVE_FEED.get().publish(event_type, data)
+    except Exception as e:
+        _event("live_feed_publish_failed", level="warning", event_type=event_type, error=str(e))
+
+def _publish_counts(row):
+    try:
+        LIVE_FEED.get().count(row["id"], len(interactions(row, "liked_by")), len(interactions(row, "viewed_by")))
+    except Exception as e:
+        _event("live_feed_publish_failed", level="warning", event_type="counters", error=str(e))
+
+def _encode_post(post):
+    return current_app.json.dumps(post).encode()
+
+def _media_owner():
+    owner = request.user.get("id") or request.user.get("email") or "anonymous"
+    return str(owner).replace("/", "_")
+
+def _owns_media(public_id):
+    """True when ``public_id`` is in the signed-in user's upload folder."""
+    return str(public_id).startswith(f"college_life/{_media_owner()}/")
+
+def _release_media(client, public_id, media_type):
+    if not public_id:
+        return
+    try:
+        should_destroy = release_asset(client, public_id)
+    except Exception as e:
+        # Other posts may still use the file; a leaked file beats a broken post.
+        _event("media_release_failed", level="warning", public_id=public_id, error=str(e))
+        return
+    if not should_destroy:
+        return
+    try:
+        with track("cloudinary", "destroy"):
+            media.destroy(
+                public_id,
+                invalidate=True,
+                resource_type=media_type,
+                extra_headers=outbound_headers(),
+            )
+    except Exception:
+        pass
 
 def get_spotify_headers():  # pragma: no cover
     token = session.get("spotify_token")
@@ -302,10 +498,12 @@ def get_spotify_headers():  # pragma: no cover
 
     expires_at = token.get("expires_at")
     if expires_at and datetime.utcnow().timestamp() > expires_at:
-        new_token = spotify.refresh_token(
-            token_url=spotify.access_token_url,
-            refresh_token=token["refresh_token"],
-        )
+        spotify = oauth_client("spotify")
+        with track("spotify_oauth", "refresh_token"):
+            new_token = spotify.refresh_token(
+                token_url=spotify.access_token_url,
+                refresh_token=token["refresh_token"],
+            )
         new_token["expires_at"] = datetime.utcnow().timestamp() + new_token["expires_in"]
         session["spotify_token"] = new_token
         token = new_token
@@ -323,30 +521,25 @@ def requireAuth(f):
             )
 
         try:
-            client = ensure_supabase()
+            users = data_access().users
             normalized_email = str(user_email).strip().lower()
-            result = client.table("users").select("*").eq("email", normalized_email).limit(1).execute()
-            user_rows = result.data or []
+            with span("auth.lookup"):
+                user_row = users.get_by_email(normalized_email)
 
-            if not user_rows:
+            if user_row is None:
                 insert_role = "admin" if normalized_email in ADMIN_EMAILS else "user"
-                inserted = (
-                    client.table("users")
-                    .insert(
-                        {
-                            "email": normalized_email,
-                            "name": session.get("user_name"),
-                            "role": insert_role,
-                        }
-                    )
-                    .execute()
+                user_row = users.insert(
+                    {
+                        "email": normalized_email,
+                        "name": session.get("user_name"),
+                        "role": insert_role,
+                    }
                 )
-                user_rows = inserted.data or []
 
-            if not user_rows:
+            if user_row is None:
                 return jsonify({"error": "User not found"}), 401
 
-            request.user = normalize_user(user_rows[0])
+            request.user = normalize_user(user_row)
             session["user_id"] = request.user.get("id")
             session["user_role"] = request.user.get("role", "user")
             if not request.user.get("email"):
@@ -375,36 +568,70 @@ def requireAdmin(f):
 
     return decorated
 
-@app.get("/health")
+@api.get("/health")
+@limiter.exempt
 def health_check():  # pragma: no cover
-    if supabase is None:
+    if not DATABASE_CONFIGURED:
         return jsonify({"status": "UP", "db": "NOT_CONFIGURED"}), 200
+    db = HEALTH_MONITOR.status()
+    if db["up"]:
+        return jsonify({"status": "UP", "db": "UP", "db_check": db}), 200
+    return jsonify({"status": "DEGRADED", "db": "DOWN", "db_check": db}), 500
 
-    try:
-        ensure_supabase().table("users").select("id", count="exact").limit(1).execute()
-        return jsonify({"status": "UP", "db": "UP"}), 200
-    except Exception as e:
-        return jsonify({"status": "DEGRADED", "db": "DOWN"}), 500
-
-@app.get("/health/live")
+@api.get("/health/live")
+@limiter.exempt
 def health_live():  # pragma: no cover
     return jsonify({"status": "UP"}), 200
 
-@app.get("/health/ready")
+@api.get("/health/ready")
+@limiter.exempt
 def health_ready():  # pragma: no cover
-    if supabase is None:
+    if not DATABASE_CONFIGURED:
         return jsonify({"status": "UP", "db": "NOT_CONFIGURED"}), 200
-    try:
-        ensure_supabase().table("users").select("id", count="exact").limit(1).execute()
-        return jsonify({"status": "UP", "db": "UP"}), 200
-    except Exception:
-        return jsonify({"status": "DOWN", "db": "DOWN"}), 503
+    db = HEALTH_MONITOR.status()
+    if db["up"]:
+        return jsonify({"status": "UP", "db": "UP", "db_check": db}), 200
+    return jsonify({"status": "DOWN", "db": "DOWN", "db_check": db}), 503
 
-@app.get("/metrics")
+@api.get("/metrics")
+@limiter.exempt
 def metrics():  # pragma: no cover
-    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+    return Response(METRICS_EXPORTER.render(), mimetype=CONTENT_TYPE_LATEST)
+
+@api.get("/admin/profile")
+@requireAuth
+@requireAdmin
+def get_profile_window():  # pragma: no cover
+    return jsonify({"armed": PROFILER.status(), "output_dir": PROFILER.output_dir})
 
-@app.route("/auth/login")
+@api.post("/admin/profile")
+@requireAuth
+@requireAdmin
+def arm_profile_window():  # pragma: no cover
+    data = request.get_json(silent=True) or {}
+    path = data.get("path")
+    if not path or not str(path).startswith("/"):
+        return jsonify({"error": "path is required and must start with /"}), 400
+    try:
+        window = PROFILER.arm(
+            str(path),
+            requests=data.get("requests"),
+            seconds=data.get("seconds"),
+            interval_ms=data.get("interval_ms", 5),
+        )
+    except (TypeError, ValueError, OverflowError):
+        return jsonify({"error": "requests, seconds and interval_ms must be finite numbers"}), 400
+    _event("profile_armed", request_id=getattr(g, "request_id", None), **window)
+    return jsonify({"armed": window, "output_dir": PROFILER.output_dir}), 201
+
+@api.delete("/admin/profile")
+@requireAuth
+@requireAdmin
+def disarm_profile_window():  # pragma: no cover
+    PROFILER.disarm()
+    return jsonify({"armed": None})
+
+@api.route("/auth/login")
 def login():  # pragma: no cover
     frontend_origin = request.args.get("frontend_origin")
     next_path = _safe_next_path(request.args.get("next"))
@@ -422,33 +649,36 @@ def login():  # pragma: no cover
         session["oauth_next"] = next_path
 
     redirect_uri = f"{_backend_origin()}/auth/callback"
-    return oauth.google.authorize_redirect(
+    return oauth_client("google").authorize_redirect(
         redirect_uri,
         prompt="select_account",
     )
 
-@app.get("/auth/reset-session")
+@api.get("/auth/reset-session")
 def reset_session():  # pragma: no cover
     session.clear()
     return jsonify({"message": "Session reset"})
 
-@app.get("/auth/logout")
+@api.get("/auth/logout")
 def logout():  # pragma: no cover
     frontend_origin = request.args.get("frontend_origin")
     target_origin = resolve_frontend_origin(frontend_origin)
     session.clear()
     return redirect(f"{target_origin}/")
 
-@app.route("/auth/callback")
+@api.route("/auth/callback")
 def auth_callback():  # pragma: no cover
+    MismatchingStateError = oauth_clients.mismatching_state_error()
     try:
-        oauth.google.authorize_access_token()
+        with track("google_oauth", "authorize_access_token"):
+            oauth_client("google").authorize_access_token()
     except MismatchingStateError:
         target_origin = resolve_frontend_origin()
         session.clear()
         return redirect(f"{target_origin}/?error=oauth_state_mismatch")
 
-    user_info = oauth.google.userinfo()
+    with track("google_oauth", "userinfo"):
+        user_info = oauth_client("google").userinfo()
     normalized_email = user_info["email"].strip().lower()
     is_admin_email = normalized_email in ADMIN_EMAILS
 
@@ -498,50 +728,53 @@ def auth_callback():  # pragma: no cover
         return redirect(f"{_backend_origin()}{next_path}")
     return redirect(f"{resolve_frontend_origin()}/?just_logged_in=1")
 
-@app.get("/api/hello")
+@api.get("/api/hello")
 @requireAuth
 def hello():  # pragma: no cover
     return jsonify({"message": f"Hello, {request.user['email']}!"})
 
-@app.get("/api/server-time")
+@api.get("/api/server-time")
 @requireAuth
 @cache.cached(timeout=300, query_string=True)
+@compression.precompressed
 def server_time():  # pragma: no cover
     return jsonify({"serverTime": datetime.utcnow().isoformat() + "Z"})
 
 
-@app.route("/api/university")
+@api.route("/api/university")
 @cache.cached(timeout=600, query_string=True)
+@compression.precompressed
 def get_university():  # pragma: no cover
     name = request.args.get("name")
-    url = "https://api.api-ninjas.com/v1/university"
+    url = f"{API_NINJAS_BASE_URL}/v1/university"
     headers = {"X-API-Key": API_KEY}
     params = {"name": name}
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=5)
+        response = http_client.get("api_ninjas", url, operation="university", headers=headers, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         if not isinstance(data, list):
             return jsonify({"error": "Unexpected API format"}), 500
         return jsonify(data)
-    except requests.RequestException as e:
+    except http_client.RequestException as e:
         return jsonify({"error": "API request failed", "details": str(e)}), 502
 
-@app.route("/api/weather")
+@api.route("/api/weather")
 @requireAuth
 @limiter.limit("10 per minute")
 @cache.cached(timeout=300, query_string=True)
+@compression.precompressed
 def get_weather():  # pragma: no cover
     city = request.args.get("city")
     if not city:
         return jsonify({"error": "City is required"}), 400
 
-    url = "http://api.openweathermap.org/data/2.5/weather"
+    url = f"{OPENWEATHER_BASE_URL}/data/2.5/weather"
     params = {"q": city, "appid": WEATHER_API_KEY, "units": "imperial"}
 
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = http_client.get("openweather", url, operation="weather", params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         weather_info = {
@@ -555,12 +788,12 @@ def get_weather():  # pragma: no cover
             "icon": f"http://openweathermap.org/img/wn/{data['weather'][0]['icon']}@2x.png",
         }
         return jsonify(weather_info)
-    except requests.RequestException as e:
+    except http_client.RequestException as e:
         return jsonify({"error": "Weather API request failed", "details": str(e)}), 502
     except (KeyError, IndexError):
         return jsonify({"error": "Unexpected response format from weather API"}), 500
 
-@app.route("/auth/spotify")
+@api.route("/auth/spotify")
 def spotify_login():  # pragma: no cover
     frontend_origin = request.args.get("frontend_origin")
     if frontend_origin:
@@ -573,7 +806,7 @@ def spotify_login():  # pragma: no cover
     redirect_uri = os.getenv("SPOTIFY_REDIRECT_URI") or f"{_backend_origin()}/api/spotify/callback"
     _clear_spotify_state()
     try:
-        return spotify.authorize_redirect(redirect_uri)
+        return oauth_client("spotify").authorize_redirect(redirect_uri)
     except Exception as e:
         _event(
             "spotify_authorize_redirect_failed",
@@ -583,10 +816,12 @@ def spotify_login():  # pragma: no cover
         )
         return redirect(f"{resolve_frontend_origin()}/music?error=spotify_authorize_failed")
 
-@app.route("/api/spotify/callback")
+@api.route("/api/spotify/callback")
 def spotify_callback():  # pragma: no cover
+    MismatchingStateError = oauth_clients.mismatching_state_error()
     try:
-        token = spotify.authorize_access_token()
+        with track("spotify_oauth", "authorize_access_token"):
+            token = oauth_client("spotify").authorize_access_token()
     except MismatchingStateError:
         _clear_spotify_state()
         return redirect(f"{resolve_frontend_origin()}/music?error=spotify_state_mismatch")
@@ -606,15 +841,21 @@ def spotify_callback():  # pragma: no cover
     return redirect(f"{resolve_frontend_origin()}/music?spotify_connected=1")
 
 
-@app.get("/spotify/current")
+@api.get("/spotify/current")
 @limiter.limit("15 per minute")
 @cache.cached(timeout=300, query_string=True)
+@compression.precompressed
 def spotify_current_track():  # pragma: no cover
     headers = get_spotify_headers()
     if not headers:
         return jsonify({"error": "Spotify not authenticated"}), 401
 
-    response = requests.get("https://api.spotify.com/v1/me/player/currently-playing", headers=headers)
+    response = http_client.get(
+        "spotify",
+        f"{SPOTIFY_API_BASE_URL}/me/player/currently-playing",
+        operation="currently_playing",
+        headers=headers,
+    )
     if response.status_code == 204:
         return jsonify({"message": "No track currently playing"}), 200
     if response.status_code == 403:
@@ -635,7 +876,7 @@ def spotify_current_track():  # pragma: no cover
         }
     )
 
-@app.get("/api/spotify/token")
+@api.get("/api/spotify/token")
 def get_spotify_token():  # pragma: no cover
     headers = get_spotify_headers()
     if not headers:
@@ -643,10 +884,11 @@ def get_spotify_token():  # pragma: no cover
     token = session.get("spotify_token")
     return jsonify({"access_token": token["access_token"]})
 
-@app.route("/api/yelp")
+@api.route("/api/yelp")
 @requireAuth
 @limiter.limit("5 per minute")
 @cache.cached(timeout=300, query_string=True)
+@compression.precompressed
 def get_yelp_restaurants():  # pragma: no cover
     location = request.args.get("location")
     term = request.args.get("term", "restaurant")
@@ -655,12 +897,12 @@ def get_yelp_restaurants():  # pragma: no cover
     if not location:
         return jsonify({"error": "location parameter is required"}), 400
 
-    url = "https://api.yelp.com/v3/businesses/search"
+    url = f"{YELP_BASE_URL}/v3/businesses/search"
     headers = {"Authorization": f"Bearer {YELP_API_KEY}"}
     params = {"term": term, "location": location, "limit": limit}
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=5)
+        response = http_client.get("yelp", url, operation="business_search", headers=headers, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
         businesses = []
@@ -678,10 +920,10 @@ def get_yelp_restaurants():  # pragma: no cover
             )
 
         return jsonify({"businesses": businesses})
-    except requests.RequestException as e:
+    except http_client.RequestException as e:
         return jsonify({"error": "Yelp API request failed", "details": str(e)}), 502
 
-@app.post("/api/media/upload")
+@api.post("/api/media/upload")
 @requireAuth
 def upload_media():  # pragma: no cover
     if "file" not in request.files:
@@ -695,15 +937,42 @@ def upload_media():  # pragma: no cover
     if not CLOUDINARY_CONFIGURED:
         return jsonify({"error": "Upload failed", "details": "Cloudinary environment variables are missing."}), 500
 
-    owner = request.user.get("id") or request.user.get("email") or "anonymous"
-    owner = str(owner).replace("/", "_")
+    owner = _media_owner()
 
+    content_hash = None
     try:
-        result = cloudinary.uploader.upload(
-            file,
-            resource_type=resource_type,
-            folder=f"college_life/{owner}/",
-        )
+        content_hash = hash_stream(file.stream)
+        existing = find_asset(ensure_supabase(), owner, content_hash)
+        if existing:
+            _event(
+                "media_upload_deduplicated",
+                request_id=getattr(g, "request_id", None),
+                public_id=existing["public_id"],
+            )
+            return jsonify(
+                {
+                    "public_id": existing["public_id"],
+                    "url": existing["url"],
+                    "type": existing["resource_type"],
+                    "deduplicated": True,
+                }
+            )
+    except Exception:
+        pass
+
+    try:
+        with track("cloudinary", "upload"):
+            result = media.upload(
+                file,
+                resource_type=resource_type,
+                folder=f"college_life/{owner}/",
+                extra_headers=outbound_headers(),
+            )
+        if content_hash:
+            try:
+                record_asset(ensure_supabase(), owner, content_hash, result)
+            except Exception:
+                pass
         return jsonify(
             {
                 "public_id": result["public_id"],
@@ -714,14 +983,15 @@ def upload_media():  # pragma: no cover
     except Exception as e:
         return jsonify({"error": "Upload failed", "details": f"{type(e).__name__}: {str(e)}"}), 500
 
-@app.get("/api/media")
+@api.get("/api/media")
 @requireAuth
 @cache.cached(timeout=300, query_string=True)
+@compression.precompressed
 def list_media():  # pragma: no cover
-    owner = request.user.get("id") or request.user.get("email") or "anonymous"
-    owner = str(owner).replace("/", "_")
+    owner = _media_owner()
     try:
-        result = cloudinary.api.resources(type="upload", prefix=f"college_life/{owner}/")
+        with track("cloudinary", "resources"):
+            result = media.resources(type="upload", prefix=f"college_life/{owner}/")
         files = [
             {"public_id": f["public_id"], "url": f["secure_url"], "type": f["resource_type"]}
             for f in result.get("resources", [])
@@ -730,26 +1000,31 @@ def list_media():  # pragma: no cover
     except Exception as e:
         return jsonify({"error": "Failed to list media", "details": str(e)}), 500
 
-@app.put("/api/media/<public_id>")
+@api.put("/api/media/<public_id>")
 @requireAuth
 def edit_media(public_id):  # pragma: no cover
     data = request.get_json()
     try:
-        result = cloudinary.api.update(public_id, folder=data.get("folder"))
+        with track("cloudinary", "update"):
+            result = media.update(public_id, folder=data.get("folder"))
         return jsonify({"updated": result})
     except Exception as e:
         return jsonify({"error": "Update failed", "details": str(e)}), 500
 
-@app.delete("/api/media/<public_id>")
+@api.delete("/api/media/<public_id>")
 @requireAuth
 def delete_media(public_id):  # pragma: no cover
     try:
-        cloudinary.uploader.destroy(public_id, invalidate=True)
+        # Drop the dedup index row first, so later uploads of the same bytes upload afresh.
+        if not discard_asset(ensure_supabase(), public_id):
+            return jsonify({"error": "Media is still used by a post"}), 409
+        with track("cloudinary", "destroy"):
+            media.destroy(public_id, invalidate=True, extra_headers=outbound_headers())
         return jsonify({"deleted": public_id})
     except Exception as e:
         return jsonify({"error": "Delete failed", "details": str(e)}), 500
 
-@app.post("/api/posts")
+@api.post("/api/posts")
 @requireAuth
 def create_post():
     data = request.get_json(silent=True) or {}
@@ -761,6 +1036,8 @@ def create_post():
     validation = validate_create_payload(media_public_id, media_url)
     if not validation.ok:
         return jsonify({"error": validation.error}), 400
+    if not _owns_media(media_public_id):
+        return jsonify({"error": "media_public_id must be one of your uploads"}), 403
 
     try:
         client = ensure_supabase()
@@ -780,122 +1057,141 @@ def create_post():
         if not rows:
             return jsonify({"error": "Failed to create post"}), 500
         POSTS_CREATED_TOTAL.inc()
+        try:
+            acquire_asset(client, media_public_id)
+        except Exception:
+            pass
         _event(
             "post_created",
             request_id=getattr(g, "request_id", None),
             post_id=rows[0].get("id"),
             author_id=request.user.get("id"),
         )
+        _publish("post-created", _shared_post(rows[0])[0])
         return jsonify(serialize_post(rows[0], request.user["id"])), 201
     except Exception as e:
         return jsonify({"error": "Failed to create post", "details": str(e)}), 500
 
-@app.get("/api/posts")
+@api.get("/api/posts")
 @requireAuth
 def list_posts():
     try:
-        client = ensure_supabase()
-        result = client.table("posts").select("*").order("created_at", desc=True).execute()
-        rows = result.data or []
-        post_list = [serialize_post(row, request.user["id"]) for row in rows]
-        return jsonify({"posts": post_list})
+        posts = data_access().posts
+
+        def render():
+            rows = posts.newest_first()
+            with span("serialize", posts=len(rows)):
+                return feed.build_snapshot(version, rows, _shared_post, _encode_post)
+
+        user_id = request.user["id"]
+        user_id = int(user_id) if user_id is not None else None
+
+        def respond():
+            body = FEED_CACHE.get(version, render).render(user_id)
+            return current_app.response_class(body, mimetype="application/json")
+
+        version = posts.feed_version()
+        if version is None:
+            return respond()
+        return _conditional(_etag("feed", version, user_id), respond)
     except Exception as e:
         return jsonify({"error": "Failed to list posts", "details": str(e)}), 500
 
-@app.post("/api/posts/<int:post_id>/like")
+@api.get("/api/posts/stream")
+@requireAuth
+def stream_posts():
+    hub = LIVE_FEED.get()
+    subscription = hub.subscribe()
+    if subscription is None:
+        # Full, or disabled because this worker has no thread to spare for a stream.
+        return jsonify({"error": "Live feed streams are unavailable on this worker"}), 503
+    return Response(
+        # EventSource sends Last-Event-ID only when it reconnects.
+        hub.stream(subscription, reconnected="Last-Event-ID" in request.headers),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api.post("/api/posts/<int:post_id>/like")
 @requireAuth
 def toggle_post_like(post_id):
     try:
-        client = ensure_supabase()
-        result = client.table("posts").select("*").eq("id", post_id).limit(1).execute()
-        rows = result.data or []
-        if not rows:
+        posts = data_access().posts
+        row = posts.get(post_id)
+        if row is None:
             return jsonify({"error": "Post not found"}), 404
 
-        row = rows[0]
         user_id = int(request.user["id"])
-        liked_by = _ids_as_ints(row.get("liked_by") or [])
+        liked_by, _ = interactions(row, "liked_by").toggle(user_id)
 
-        if user_id in liked_by:
-            liked_by = [uid for uid in liked_by if uid != user_id]
-        else:
-            liked_by.append(user_id)
-
-        updated = client.table("posts").update({"liked_by": liked_by}).eq("id", post_id).execute()
-        updated_rows = updated.data or []
-        if not updated_rows:
+        updated = posts.update(post_id, {"liked_by": liked_by.to_list()})
+        observe_post_write(row, updated)
+        if updated is None:
             return jsonify({"error": "Failed to update like"}), 500
 
         cache.clear()
-        return jsonify(serialize_post(updated_rows[0], user_id))
+        _publish_counts(updated)
+        return jsonify(serialize_post(updated, user_id))
     except Exception as e:
         return jsonify({"error": "Failed to toggle like", "details": str(e)}), 500
 
-@app.post("/api/posts/<int:post_id>/view")
+@api.post("/api/posts/<int:post_id>/view")
 @requireAuth
 def register_post_view(post_id):
     try:
-        client = ensure_supabase()
-        result = client.table("posts").select("*").eq("id", post_id).limit(1).execute()
-        rows = result.data or []
-        if not rows:
+        posts = data_access().posts
+        row = posts.get(post_id)
+        if row is None:
             return jsonify({"error": "Post not found"}), 404
 
-        row = rows[0]
         user_id = int(request.user["id"])
-        viewed_by = _ids_as_ints(row.get("viewed_by") or [])
-
-        if user_id not in viewed_by:
-            viewed_by.append(user_id)
-
-        updated = client.table("posts").update({"viewed_by": viewed_by}).eq("id", post_id).execute()
-        updated_rows = updated.data or []
-        if not updated_rows:
+        viewed_by = interactions(row, "viewed_by")
+        # Repeat views change nothing, so they skip the write.
+        if user_id in viewed_by:
+            return jsonify(serialize_post(row, user_id))
+
+        updated = posts.update(post_id, {"viewed_by": viewed_by.add(user_id).to_list()})
+        observe_post_write(row, updated)
+        if updated is None:
             return jsonify({"error": "Failed to update view"}), 500
 
         cache.clear()
-        return jsonify(serialize_post(updated_rows[0], user_id))
+        _publish_counts(updated)
+        return jsonify(serialize_post(updated, user_id))
     except Exception as e:
         return jsonify({"error": "Failed to register view", "details": str(e)}), 500
 
-@app.put("/api/posts/<int:post_id>")
+@api.put("/api/posts/<int:post_id>")
 @requireAuth
 def update_post(post_id):
     data = request.get_json(silent=True) or {}
 
     try:
-        client = ensure_supabase()
-        result = client.table("posts").select("*").eq("id", post_id).limit(1).execute()
-        rows = result.data or []
-        if not rows:
-            return jsonify({"error": "Post not found"}), 404
-
-        row = rows[0]
-        row_author_id = str(row.get("author_id"))
-        current_user_id = str(request.user.get("id"))
+        posts = data_access().posts
         is_admin = request.user.get("role") == "admin"
-
-        if not can_user_modify_post(current_user_id, row_author_id, request.user.get("role")):
-            return jsonify({"error": "Forbidden"}), 403
-
         payload = {}
         if "caption" in data:
             payload["caption"] = normalize_caption(data.get("caption"))
-
-        if "media_public_id" in data and "media_url" in data:
+        replacing_media = "media_public_id" in data and "media_url" in data
+
+        # Caption edits go straight to a conditional UPDATE; only media swaps
+        # need the current row (for the old asset) before writing.
+        row = None
+        if replacing_media or not payload:
+            row = posts.get(post_id)
+            if row is None:
+                return jsonify({"error": "Post not found"}), 404
+            if not can_user_modify_post(request.user.get("id"), row.get("author_id"), request.user.get("role")):
+                return jsonify({"error": "Forbidden"}), 403
+
+        if replacing_media:
             new_public_id = data.get("media_public_id")
             new_media_url = data.get("media_url")
             new_media_type = data.get("media_type", row.get("media_type") or "image")
             if not new_public_id or not new_media_url:
                 return jsonify({"error": "media_public_id and media_url are required when replacing media"}), 400
-
-            old_public_id = row.get("media_public_id")
-            old_media_type = row.get("media_type") or "image"
-            if old_public_id and old_public_id != new_public_id:
-                try:
-                    cloudinary.uploader.destroy(old_public_id, invalidate=True, resource_type=old_media_type)
-                except Exception:
-                    pass
+            if new_public_id != row.get("media_public_id") and not _owns_media(new_public_id):
+                return jsonify({"error": "media_public_id must be one of your uploads"}), 403
 
             payload["media_public_id"] = new_public_id
             payload["media_url"] = new_media_url
@@ -904,95 +1200,117 @@ def update_post(post_id):
         if not payload:
             return jsonify(serialize_post(row, request.user["id"]))
 
-        updated = client.table("posts").update(payload).eq("id", post_id).execute()
-        updated_rows = updated.data or []
-        if not updated_rows:
+        owner_only = {} if row is not None or is_admin else {"author_id": request.user.get("id")}
+        updated = posts.update(post_id, payload, **owner_only)
+        if updated is None:
+            if row is None:
+                row = posts.get(post_id)
+                if row is None:
+                    return jsonify({"error": "Post not found"}), 404
+                if not can_user_modify_post(request.user.get("id"), row.get("author_id"), request.user.get("role")):
+                    return jsonify({"error": "Forbidden"}), 403
             return jsonify({"error": "Failed to update post"}), 500
 
+        old_public_id = row.get("media_public_id") if replacing_media else None
+        if old_public_id and old_public_id != updated.get("media_public_id"):
+            # Only once the post points at the new file is the old one let go.
+            try:
+                acquire_asset(posts.client, updated.get("media_public_id"))
+            except Exception:
+                pass
+            _release_media(posts.client, old_public_id, row.get("media_type") or "image")
+
         cache.clear()
-        return jsonify(serialize_post(updated_rows[0], request.user["id"]))
+        _publish("post-updated", _shared_post(updated)[0])
+        return jsonify(serialize_post(updated, request.user["id"]))
     except Exception as e:
         return jsonify({"error": "Failed to update post", "details": str(e)}), 500
 
-@app.delete("/api/posts/<int:post_id>")
+@api.delete("/api/posts/<int:post_id>")
 @requireAuth
 def delete_post(post_id):
     try:
-        client = ensure_supabase()
-        result = client.table("posts").select("*").eq("id", post_id).limit(1).execute()
-        rows = result.data or []
-        if not rows:
-            return jsonify({"error": "Post not found"}), 404
-
-        row = rows[0]
-        row_author_id = str(row.get("author_id"))
-        current_user_id = str(request.user.get("id"))
+        posts = data_access().posts
         is_admin = request.user.get("role") == "admin"
-
-        if not can_user_modify_post(current_user_id, row_author_id, request.user.get("role")):
-            return jsonify({"error": "Forbidden"}), 403
-
-        public_id = row.get("media_public_id")
-        media_type = row.get("media_type") or "image"
-        if public_id:
-            try:
-                cloudinary.uploader.destroy(public_id, invalidate=True, resource_type=media_type)
-            except Exception:
-                pass
-
-        client.table("posts").delete().eq("id", post_id).execute()
+        # Delete in one round trip; the row only needs reading when nothing matched.
+        owner_only = {} if is_admin else {"author_id": request.user.get("id")}
+        row = posts.delete(post_id, **owner_only)
+        if row is None:
+            existing = posts.get(post_id)
+            if existing is None:
+                return jsonify({"error": "Post not found"}), 404
+            if not can_user_modify_post(request.user.get("id"), existing.get("author_id"), request.user.get("role")):
+                return jsonify({"error": "Forbidden"}), 403
+            return jsonify({"error": "Failed to delete post"}), 500
+
+        _release_media(posts.client, row.get("media_public_id"), row.get("media_type") or "image")
         cache.clear()
+        _publish("post-deleted", {"id": post_id})
         return jsonify({"deleted": post_id})
     except Exception as e:
         return jsonify({"error": "Failed to delete post", "details": str(e)}), 500
 
-@app.get("/users")
+@api.get("/users")
 @requireAuth
 def list_users():
+    # Only admins list other users, so nobody else gets their parameters checked.
+    if request.user["role"] != "admin":
+        return jsonify([request.user])
+    from services.user_listing import apply_filters, parse_user_list_query, project_user
+
+    parsed = parse_user_list_query(request.args)
+    if not parsed.ok:
+        return jsonify({"error": parsed.error}), 400
+    query = parsed.query
     try:
         client = ensure_supabase()
-        if request.user["role"] == "admin":
-            result = client.table("users").select("*").order("id", desc=False).execute()
-            rows = result.data or []
-            return jsonify([normalize_user(row) for row in rows])
-        return jsonify([request.user])
+
+        builder = apply_filters(client.table("users").select(",".join(query.fields)), query)
+        if query.cursor is not None:
+            builder = builder.gt("id", query.cursor)
+        # One extra row tells us whether another page exists without counting.
+        rows = builder.order("id", desc=False).limit(query.limit + 1).execute().data or []
+        with span("serialize", users=min(len(rows), query.limit)):
+            response = jsonify([project_user(row, query.fields) for row in rows[: query.limit]])
+        if len(rows) > query.limit:
+            response.headers["X-Next-Cursor"] = str(rows[query.limit - 1]["id"])
+        if query.include_total:
+            response.headers["X-Total-Count"] = str(_count_users(client, query))
+        return response
     except Exception as e:
         return jsonify({"error": "Failed to list users", "details": str(e)}), 500
 
-@app.get("/users/me")
+@api.get("/users/me")
 @requireAuth
 def get_current_user():
-    return jsonify(request.user)
+    return _conditional(_etag("user", request.user), lambda: jsonify(request.user))
 
-@app.get("/users/<int:user_id>")
+@api.get("/users/<int:user_id>")
 @requireAuth
 def get_user(user_id):
     try:
-        client = ensure_supabase()
-        result = client.table("users").select("*").eq("id", user_id).limit(1).execute()
-        rows = result.data or []
-        if not rows:
+        row = data_access().users.get(user_id)
+        if row is None:
             return jsonify({"error": "not found"}), 404
 
-        user = normalize_user(rows[0])
+        user = normalize_user(row)
         if request.user["role"] != "admin" and user["email"] != request.user["email"]:
             return jsonify({"error": "Forbidden"}), 403
 
-        return jsonify(user)
+        return _conditional(_etag("user", user), lambda: jsonify(user))
     except Exception as e:
         return jsonify({"error": "Failed to get user", "details": str(e)}), 500
 
-@app.put("/users/<int:user_id>")
+@api.put("/users/<int:user_id>")
 @requireAuth
 def update_user(user_id):
     try:
-        client = ensure_supabase()
-        result = client.table("users").select("*").eq("id", user_id).limit(1).execute()
-        rows = result.data or []
-        if not rows:
+        users = data_access().users
+        row = users.get(user_id)
+        if row is None:
             return jsonify({"error": "not found"}), 404
 
-        user = normalize_user(rows[0])
+        user = normalize_user(row)
         if request.user["role"] != "admin" and user["email"] != request.user["email"]:
             return jsonify({"error": "Forbidden"}), 403
 
@@ -1002,70 +1320,186 @@ def update_user(user_id):
         if "name" in data:
             payload["name"] = data["name"]
         if "email" in data and request.user["role"] == "admin":
-            payload["email"] = data["email"]
+            payload["email"] = str(data["email"] or "").strip().lower()
         if "role" in data and request.user["role"] == "admin":
             payload["role"] = data["role"]
 
         if not payload:
             return jsonify(user)
 
-        updated = client.table("users").update(payload).eq("id", user_id).execute()
-        updated_rows = updated.data or []
-        if not updated_rows:
+        updated = users.update(user_id, payload)
+        if updated is None:
             return jsonify({"error": "Update failed"}), 500
 
-        return jsonify(normalize_user(updated_rows[0]))
+        _invalidate_user_counts()
+        return jsonify(normalize_user(updated))
     except Exception as e:
         return jsonify({"error": "Failed to update user", "details": str(e)}), 500
 
-@app.delete("/users/<int:user_id>")
+@api.delete("/users/<int:user_id>")
 @requireAuth
 def delete_user(user_id):
     try:
-        client = ensure_supabase()
-        result = client.table("users").select("*").eq("id", user_id).limit(1).execute()
-        rows = result.data or []
-        if not rows:
+        users = data_access().users
+        row = users.get(user_id)
+        if row is None:
             return jsonify({"error": "not found"}), 404
 
-        user = normalize_user(rows[0])
+        user = normalize_user(row)
         if request.user["role"] != "admin" and user["email"] != request.user["email"]:
             return jsonify({"error": "Forbidden"}), 403
 
-        client.table("users").delete().eq("id", user_id).execute()
-        return jsonify({"deleted": user_id})
+        users.delete(user_id)
+        _invalidate_user_counts()
+        job = _start_user_cleanup(user_id)
+        return jsonify({"deleted": user_id, "cleanup_job": job.to_dict()})
     except Exception as e:
         return jsonify({"error": "Failed to delete user", "details": str(e)}), 500
 
-@app.post("/users")
+@api.post("/users")
 @requireAuth
 @requireAdmin
 def create_user():
     data = request.get_json(silent=True) or {}
     name = data.get("name")
-    email = data.get("email")
+    # Stored lowercased like every other write path, so exact-match lookups find it.
+    email = str(data.get("email") or "").strip().lower()
     role = data.get("role", "user")
 
     if not name or not email:
         return jsonify({"error": "name and email required"}), 400
 
     try:
-        client = ensure_supabase()
-        existing = client.table("users").select("id").eq("email", email).limit(1).execute()
-        if existing.data:
+        users = data_access().users
+        if users.get_by_email(email) is not None:
             return jsonify({"error": "Email already exists"}), 400
 
-        inserted = (
-            client.table("users")
-            .insert({"name": name, "email": email, "role": role})
-            .execute()
-        )
-        rows = inserted.data or []
-        if not rows:
+        inserted = users.insert({"name": name, "email": email, "role": role})
+        if inserted is None:
             return jsonify({"error": "Failed to create user"}), 500
-        return jsonify(normalize_user(rows[0])), 201
+        _invalidate_user_counts()
+        return jsonify(normalize_user(inserted)), 201
     except Exception as e:
         return jsonify({"error": "Failed to create user", "details": str(e)}), 500
 
+def _create_cleanup_runner():
+    from services import user_cleanup
+
+    return user_cleanup.CleanupRunner(store=user_cleanup.JobStore(lambda: ensure_supabase()))
+
+CLEANUP_RUNNER = ProcessLocal(_create_cleanup_runner)
+
+def _user_cleanup_callbacks(app):
+    def on_progress(job):
+        CLEANUP_RUNNER.get().checkpoint(job)
+        _event("user_cleanup_progress", **job.to_dict())
+
+    def work(job):
+        from services import user_cleanup
+
+        with app.app_context():
+            user_cleanup.cleanup_user(ensure_supabase(), media, job, MEDIA_ASSETS_TABLE, on_progress)
+            cache.clear()
+            # Posts, likes and views changed in bulk; clients refetch the feed.
+            _publish("resync", {})
+
+    def on_done(job):
+        _event("user_cleanup_finished", level="error" if job.status == "failed" else "info", **job.to_dict())
+
+    return work, on_done
+
+def _start_user_cleanup(user_id):
+    """Queue removal of the user's posts, media and interactions after the row is gone."""
+    return CLEANUP_RUNNER.get().submit(user_id, *_user_cleanup_callbacks(current_app._get_current_object()))
+
+def _resume_user_cleanups():
+    """Pick up cleanup jobs a recycled or killed worker left unfinished; checked once a minute per worker."""
+    runner = CLEANUP_RUNNER.get()
+    if runner.resume_due():
+        runner.schedule_resume(*_user_cleanup_callbacks(current_app._get_current_object()))
+
+@api.get("/admin/cleanup-jobs/<job_id>")
+@requireAuth
+@requireAdmin
+def get_cleanup_job(job_id):
+    job = CLEANUP_RUNNER.get().get(job_id)
+    if job is None:
+        return jsonify({"error": "not found"}), 404
+    return jsonify(job.to_dict())
+
+def _bulk_plan(require_name):  # pragma: no cover
+    from services import user_bulk
+
+    upload = request.files.get("file")
+    if upload is not None:
+        content_type = "text/csv" if (upload.filename or "").lower().endswith(".csv") else upload.mimetype
+        return user_bulk.plan_rows(user_bulk.parse_rows(upload.read(), content_type), require_name)
+    return user_bulk.plan_rows(user_bulk.parse_rows(request.get_data(), request.content_type), require_name)
+
+def _bulk_response(plan):
+    return jsonify({"summary": plan.summary(), "results": plan.sorted_results()})
+
+@api.post("/users/bulk")
+@requireAuth
+@requireAdmin
+def bulk_create_users():
+    from services import user_bulk
+
+    try:
+        plan = _bulk_plan(require_name=True)
+    except user_bulk.BulkPayloadError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        user_bulk.import_users(ensure_supabase(), plan)
+    except Exception as e:
+        return jsonify({"error": "Failed to import users", "details": str(e)}), 500
+    _invalidate_user_counts()
+    return _bulk_response(plan)
+
+@api.post("/users/bulk/roles")
+@requireAuth
+@requireAdmin
+def bulk_update_roles():
+    from services import user_bulk
+
+    try:
+        plan = _bulk_plan(require_name=False)
+    except user_bulk.BulkPayloadError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        user_bulk.update_roles(ensure_supabase(), plan)
+    except Exception as e:
+        return jsonify({"error": "Failed to update roles", "details": str(e)}), 500
+    _invalidate_user_counts()
+    return _bulk_response(plan)
+
+def create_app(config=None):
+    """Build the Flask app. Supabase, Cloudinary and OAuth clients are created
+    lazily, once per process, on first use rather than here."""
+    app = Flask(__name__)
+    app.json = json_provider.FastJSONProvider(app)
+    app.secret_key = os.getenv("FLASK_SECRET_KEY", "dev-secret-key")
+    app.config["SESSION_COOKIE_NAME"] = "college_session"
+    app.config["SESSION_COOKIE_HTTPONLY"] = True
+    app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
+    app.config["SESSION_COOKIE_SECURE"] = False
+    if config:
+        app.config.update(config)
+    if SESSION_STORE:
+        from services import session_store
+
+        store = session_store.open_store(SESSION_STORE)
+        app.session_interface = session_store.ServerSideSessionInterface(
+            store, SESSION_LOOKUP_LATENCY.labels(store=store.name).observe, _session_store_failed
+        )
+
+    cache.init_app(app)
+    CORS(app, origins=CORS_ORIGINS, supports_credentials=True, expose_headers=["X-Next-Cursor", "X-Total-Count"])
+    limiter.init_app(app)
+    app.register_blueprint(api)
+    return app
+
+app = create_app()
+
 if __name__ == "__main__":  # pragma: no cover
     app.run(port=8000, debug=True)
@@ -0,0 +1,83 @@
+-- Optional Supabase objects used by the backend. Every statement can be re-run.
+-- Each section is independent; without it the backend falls back as noted in README.md.
+
+-- Background user cleanup jobs, shared by every worker.
+create table if not exists cleanup_jobs (
+  job_id text primary key,
+  user_id bigint not null,
+  status text not null,
+  posts_deleted integer not null default 0,
+  media_deleted integer not null default 0,
+  media_failed integer not null default 0,
+  media_failures jsonb not null default '[]',
+  interaction_rows_updated integer not null default 0,
+  batches integer not null default 0,
+  error text,
+  created_at double precision not null,
+  finished_at double precision,
+  heartbeat_at double precision
+);
+create index if not exists cleanup_jobs_status_heartbeat on cleanup_jobs (status, heartbeat_at);
+
+-- Strips a deleted user's likes and views in one statement.
+create or replace function remove_user_interactions(target_user_id bigint) returns integer
+language sql as $$
+  with updated as (
+    update posts
+       set liked_by = array_remove(liked_by, target_user_id),
+           viewed_by = array_remove(viewed_by, target_user_id)
+     where liked_by @> array[target_user_id] or viewed_by @> array[target_user_id]
+    returning 1
+  )
+  select count(*)::integer from updated;
+$$;
+
+-- Post version column; the backend memoizes parsed likes/views per version.
+alter table posts add column if not exists updated_at timestamptz not null default now();
+create or replace function touch_updated_at() returns trigger
+language plpgsql as $$
+begin
+  new.updated_at := clock_timestamp();
+  return new;
+end;
+$$;
+create or replace trigger posts_touch_updated_at before update on posts
+  for each row execute function touch_updated_at();
+
+-- Feed version counter; the rendered feed and its ETag are reused until it changes.
+-- Views alone do not bump it, since open pages get view counts from the live feed.
+create table if not exists feed_version (
+  id smallint primary key default 1 check (id = 1),
+  version bigint not null default 0
+);
+insert into feed_version (id) values (1) on conflict do nothing;
+create or replace function bump_feed_version() returns trigger
+language plpgsql as $$
+begin
+  update feed_version set version = version + 1 where id = 1;
+  return null;
+end;
+$$;
+create or replace trigger posts_bump_feed_version after insert or delete on posts
+  for each row execute function bump_feed_version();
+create or replace trigger posts_bump_feed_version_on_update after update on posts
+  for each row
+  when ((to_jsonb(old) - 'viewed_by' - 'updated_at') is distinct from (to_jsonb(new) - 'viewed_by' - 'updated_at'))
+  execute function bump_feed_version();
+
+-- Media deduplication index.
+create table if not exists media_assets (
+  id bigint generated always as identity primary key,
+  owner text not null,
+  content_hash text not null,
+  public_id text not null,
+  url text not null,
+  resource_type text not null,
+  ref_count integer not null default 0 check (ref_count >= 0),
+  created_at timestamptz not null default now()
+);
+create unique index if not exists media_assets_owner_hash on media_assets (owner, content_hash);
+create index if not exists media_assets_public_id on media_assets (public_id);
+
+-- One-off migration: lowercase emails stored before every write path did.
+update users set email = lower(trim(email)) where email <> lower(trim(email));
@@ -0,0 +1,94 @@
+"""gzip/brotli response compression negotiated through ``Accept-Encoding``.
+
+Responses under ``COMPRESS_MIN_BYTES`` go out as-is. Views behind
+``cache.cached`` are wrapped in ``precompressed`` so the stored response
+already carries every encoding: a cache hit picks one instead of compressing
+again. brotli is used when the ``brotli`` package is installed.
+"""
+from __future__ import annotations
+import gzip
+import os
+from functools import wraps
+from importlib.util import find_spec
+from flask import current_app
+from services.process_local import ProcessLocal
+
+def _load_brotli():
+    # Deferred: the extension is only loaded once a response is brotli-encoded.
+    import brotli
+
+    return brotli
+
+# Checking for the package costs a path lookup, not an import.
+HAS_BROTLI = find_spec("brotli") is not None
+_BROTLI = ProcessLocal(_load_brotli)
+
+MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/css", "application/javascript")
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings in order of preference when the client rates them equally."""
+    return ("br", "gzip") if HAS_BROTLI else ("gzip",)
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _BROTLI.get().compress(data, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies.
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def negotiate(accept_encodings) -> str | None:
+    """The best encoding a werkzeug ``Accept`` allows, or None for identity."""
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def eligible(response) -> bool:
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return False
+    if "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_TYPES:
+        return False
+    return response.content_length is not None and response.content_length >= MIN_BYTES
+
+def etag_variants(etag: str) -> list[str]:
+    """``etag`` as sent with each encoding; compressed bodies get a suffixed strong ETag."""
+    return [etag] + [f"{etag}-{encoding}" for encoding in available_encodings()]
+
+def precompress(response):
+    """Store every encoding of ``response`` on it, for responses that outlive one request."""
+    if eligible(response):
+        data = response.get_data()
+        response.precompressed = {encoding: compress(data, encoding) for encoding in available_encodings()}
+    return response
+
+def precompressed(view):
+    """Decorator under ``cache.cached``: the cached response is stored already compressed."""
+
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        return precompress(current_app.make_response(view(*args, **kwargs)))
+
+    return decorated
+
+def apply(response, accept_encodings):
+    """Compress ``response`` in place for the negotiated encoding."""
+    if not eligible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate(accept_encodings)
+    if encoding is None:
+        return response
+    cached = getattr(response, "precompressed", None) or {}
+    body = cached.get(encoding)
+    if body is None:
+        body = compress(response.get_data(), encoding)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
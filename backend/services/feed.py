@@ -0,0 +1,96 @@
+"""Prerendered ``/api/posts`` feed shared by every user.
+
+Only ``liked_by_me``/``viewed_by_me`` differ between users, so the rest of
+each post is encoded to JSON once per feed version and kept as bytes. A
+response copies the default fragments, patches the posts the requesting user
+has liked or viewed, and joins them.
+
+The feed version is the ``feed_version`` counter, which a trigger bumps on
+every insert or delete of a post and every update that changes more than
+``viewed_by``, and which is read by primary key. View counts in a snapshot can
+therefore trail; open pages get them from the live feed's ``counters`` events.
+Without the counter there is no version and every request renders afresh.
+"""
+from __future__ import annotations
+import threading
+from typing import Callable, Iterable
+
+_FLAGS = {
+    (liked, viewed): b',"liked_by_me":%s,"viewed_by_me":%s}' % (b"true" if liked else b"false", b"true" if viewed else b"false")
+    for liked in (False, True)
+    for viewed in (False, True)
+}
+
+def _by_user(sets: Iterable[Iterable[int]]) -> dict[int, list[int]]:
+    """``{user_id: [post positions]}`` from each post's ``liked_by`` or ``viewed_by`` set."""
+    positions: dict[int, list[int]] = {}
+    for position, user_ids in enumerate(sets):
+        for user_id in user_ids:
+            positions.setdefault(user_id, []).append(position)
+    return positions
+
+class FeedSnapshot:
+    """One rendered feed version: encoded posts without the per-user flags."""
+
+    __slots__ = ("version", "_prefixes", "_default", "_liked", "_viewed")
+
+    def __init__(self, version, prefixes: list[bytes], liked_by: list, viewed_by: list):
+        self.version = version
+        # Each prefix is a post object missing its closing brace.
+        self._prefixes = prefixes
+        self._default = [prefix + _FLAGS[False, False] for prefix in prefixes]
+        self._liked = _by_user(liked_by)
+        self._viewed = _by_user(viewed_by)
+
+    def __len__(self) -> int:
+        return len(self._prefixes)
+
+    def render(self, user_id: int | None) -> bytes:
+        """The ``{"posts": [...]}`` body with the flags for ``user_id``."""
+        parts = self._default
+        liked = self._liked.get(user_id, ())
+        viewed = self._viewed.get(user_id, ())
+        if liked or viewed:
+            parts = list(parts)
+            liked_positions, viewed_positions = set(liked), set(viewed)
+            for position in liked_positions | viewed_positions:
+                flags = (position in liked_positions, position in viewed_positions)
+                parts[position] = self._prefixes[position] + _FLAGS[flags]
+        return b'{"posts":[' + b",".join(parts) + b"]}\n"
+
+def build_snapshot(version, rows: list[dict], shared: Callable[[dict], tuple[dict, object, object]], dumps: Callable[[dict], bytes]) -> FeedSnapshot:
+    """Render ``rows`` once. ``shared(row)`` returns the flag-free post and its liked/viewed id sets."""
+    prefixes, liked_by, viewed_by = [], [], []
+    for row in rows:
+        post, liked, viewed = shared(row)
+        prefixes.append(dumps(post)[:-1])
+        liked_by.append(liked)
+        viewed_by.append(viewed)
+    return FeedSnapshot(version, prefixes, liked_by, viewed_by)
+
+class FeedCache:
+    """Holds the snapshot for the newest feed version this process has seen."""
+
+    def __init__(self):
+        self._snapshot: FeedSnapshot | None = None
+        self._lock = threading.Lock()
+
+    def get(self, version, build: Callable[[], FeedSnapshot]) -> FeedSnapshot:
+        """The snapshot for ``version``, building it at most once per version.
+
+        A ``None`` version is never cached.
+        """
+        if version is None:
+            return build()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = build()
+                self._snapshot = snapshot
+            return snapshot
+
+    def clear(self) -> None:
+        self._snapshot = None
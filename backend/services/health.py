@@ -0,0 +1,75 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from typing import Callable
+
+class HealthMonitor:
+    """Runs a dependency check on its own interval and serves the last result.
+
+    Probes read the cached snapshot, so probe latency and database load do not
+    depend on how often Kubernetes or the load balancer call in. The checker
+    thread is started lazily in each process (a gunicorn master's thread does
+    not survive fork). The first ``status()`` in a process runs the check inline
+    so a fresh worker never reports an unknown state.
+    """
+
+    def __init__(
+        self,
+        check: Callable[[], None],
+        interval_seconds: float = 10.0,
+        stale_after_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._check = check
+        self.interval_seconds = interval_seconds
+        self.stale_after_seconds = stale_after_seconds if stale_after_seconds is not None else interval_seconds * 3
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pid: int | None = None
+        self._snapshot: dict | None = None
+
+    def check_now(self) -> dict:
+        start = time.perf_counter()
+        try:
+            self._check()
+            snapshot = {"up": True, "error": None}
+        except Exception as exc:
+            snapshot = {"up": False, "error": type(exc).__name__}
+        snapshot["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        snapshot["checked_at"] = self._clock()
+        self._snapshot = snapshot
+        return snapshot
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.check_now()
+
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._stop = threading.Event()
+            self.check_now()
+            threading.Thread(target=self._run, name="health-monitor", daemon=True).start()
+            self._pid = pid
+
+    def status(self) -> dict:
+        """``{"up", "stale", "age_seconds", "latency_ms", "error"}`` for the last check."""
+        self._ensure_started()
+        snapshot = dict(self._snapshot or self.check_now())
+        age = max(self._clock() - snapshot.pop("checked_at"), 0.0)
+        snapshot["age_seconds"] = round(age, 2)
+        snapshot["stale"] = age > self.stale_after_seconds
+        if snapshot["stale"]:
+            snapshot["up"] = False
+        return snapshot
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._pid = None
+        self._snapshot = None
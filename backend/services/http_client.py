@@ -0,0 +1,26 @@
+from __future__ import annotations
+from services.instrumentation import track
+from services.tracing import outbound_headers
+
+def __getattr__(name):
+    # ``except http_client.RequestException`` only resolves this when an
+    # exception is being matched, so ``requests`` stays out of cold start.
+    if name == "RequestException":
+        import requests
+
+        return requests.RequestException
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def get(dependency: str, url: str, operation: str = "get", **kwargs):
+    """``requests.get`` tracked as a call to ``dependency``; 5xx responses count as errors.
+
+    Trace context is propagated to the upstream through ``traceparent`` and
+    ``X-Request-ID`` headers.
+    """
+    import requests
+
+    with track(dependency, operation) as call:
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), **outbound_headers()}
+        response = requests.get(url, **kwargs)
+        call.failed = response.status_code >= 500
+        return response
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context
+from prometheus_client import Counter, Histogram
+from services.tracing import outbound_headers, span
+
+DEPENDENCY_LATENCY = Histogram(
+    "dependency_request_duration_seconds",
+    "Latency of calls to external dependencies by dependency and operation",
+    ["dependency", "operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DEPENDENCY_ERRORS = Counter(
+    "dependency_errors_total",
+    "Failed calls to external dependencies by dependency and operation",
+    ["dependency", "operation"],
+)
+
+def _record(dependency: str, operation: str, elapsed: float, failed: bool) -> None:
+    DEPENDENCY_LATENCY.labels(dependency=dependency, operation=operation).observe(elapsed)
+    if failed:
+        DEPENDENCY_ERRORS.labels(dependency=dependency, operation=operation).inc()
+    if not has_app_context():
+        return
+    timings = g.setdefault("dependency_timings", {})
+    entry = timings.setdefault(dependency, {"calls": 0, "errors": 0, "duration_ms": 0.0})
+    entry["calls"] += 1
+    entry["errors"] += int(failed)
+    entry["duration_ms"] += elapsed * 1000
+
+class TrackedCall:
+    __slots__ = ("failed",)
+
+    def __init__(self):
+        self.failed = False
+
+@contextmanager
+def track(dependency: str, operation: str):
+    """Time one call to ``dependency``.
+
+    Exceptions are counted as errors and re-raised; callers can also set
+    ``failed`` on the yielded ``TrackedCall`` for errors that do not raise.
+    The call is also recorded as a ``<dependency>.<operation>`` trace span.
+    """
+    start = time.perf_counter()
+    call = TrackedCall()
+    with span(f"{dependency}.{operation}"):
+        try:
+            yield call
+        except Exception:
+            call.failed = True
+            raise
+        finally:
+            _record(dependency, operation, time.perf_counter() - start, call.failed)
+
+def request_breakdown() -> dict:
+    """Per-dependency calls/errors/duration for the current request, for the http_request event."""
+    timings = g.get("dependency_timings") or {}
+    return {
+        dependency: {**entry, "duration_ms": round(entry["duration_ms"], 2)}
+        for dependency, entry in timings.items()
+    }
+
+class InstrumentedQuery:
+    """Wraps a postgrest request builder so ``execute()`` is tracked as ``<table>.<action>``."""
+
+    _ACTIONS = {"select", "insert", "update", "upsert", "delete"}
+
+    def __init__(self, builder, table: str, dependency: str = "supabase"):
+        self._builder = builder
+        self._table = table
+        self._dependency = dependency
+        self._action = "select"
+
+    def __getattr__(self, name):
+        target = getattr(self._builder, name)
+        if not callable(target):
+            if hasattr(target, "execute"):
+                self._builder = target
+                return self
+            return target
+
+        def call(*args, **kwargs):
+            if name in self._ACTIONS:
+                self._action = name
+            self._builder = target(*args, **kwargs)
+            return self
+
+        return call
+
+    def execute(self):
+        with track(self._dependency, f"{self._table}.{self._action}"):
+            request_headers = getattr(getattr(self._builder, "request", None), "headers", None)
+            if request_headers is not None:
+                request_headers.update(outbound_headers())
+            return self._builder.execute()
+
+class InstrumentedSupabase:
+    def __init__(self, client, dependency: str = "supabase"):
+        self._client = client
+        self._dependency = dependency
+
+    def table(self, name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(name), name, self._dependency)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import json
+import os
+import re
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+# orjson reads integers past 64 bits as floats. Any run of 20 digits might be
+# one, so such documents are parsed by the stdlib instead.
+_LONG_NUMBER = re.compile(r"\d{20}")
+_LONG_NUMBER_BYTES = re.compile(rb"\d{20}")
+
+def resolve_backend(name: str | None = None) -> str:
+    """``JSON_BACKEND`` picks ``orjson`` or ``json``; orjson is used when installed."""
+    requested = (name if name is not None else os.getenv("JSON_BACKEND", "")).strip().lower()
+    if requested == "json" or orjson is None:
+        return "json"
+    return "orjson"
+
+def _orjson_options(indent: bool = False, sort_keys: bool = False, newline: bool = False) -> int:
+    # Datetimes go through ``default`` so Flask's HTTP-date format is kept.
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if indent:
+        options |= orjson.OPT_INDENT_2
+    if sort_keys:
+        options |= orjson.OPT_SORT_KEYS
+    if newline:
+        options |= orjson.OPT_APPEND_NEWLINE
+    return options
+
+def dumps(obj, default=str, backend: str | None = None) -> str:
+    """Compact JSON text for log events; unknown types are rendered with ``default``."""
+    if (backend or BACKEND) == "orjson":
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, default=default, separators=(",", ":"))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, falling back to the stdlib provider.
+
+    Values orjson rejects (integers over 64 bits, unsupported key types) are
+    retried with the stdlib encoder, so responses never fail only because of
+    the faster backend. Likewise, documents orjson cannot read exactly (``NaN``,
+    ``Infinity``, integers over 64 bits) are decoded by the stdlib.
+    """
+
+    backend = "orjson"
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.backend = resolve_backend()
+
+    def _encode(self, obj, indent: bool = False, sort_keys: bool | None = None, newline: bool = False) -> bytes | None:
+        if self.backend != "orjson":
+            return None
+        sort_keys = self.sort_keys if sort_keys is None else sort_keys
+        try:
+            return orjson.dumps(obj, default=self.default, option=_orjson_options(indent, sort_keys, newline))
+        except TypeError:
+            return None
+
+    def dumps(self, obj, **kwargs) -> str:
+        if set(kwargs) <= {"indent", "separators", "sort_keys", "ensure_ascii"}:
+            encoded = self._encode(obj, indent=bool(kwargs.get("indent")), sort_keys=kwargs.get("sort_keys"))
+            if encoded is not None:
+                return encoded.decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.backend == "orjson" and not kwargs:
+            long_number = _LONG_NUMBER_BYTES if isinstance(s, (bytes, bytearray)) else _LONG_NUMBER
+            if long_number.search(s) is None:
+                try:
+                    return orjson.loads(s)
+                except orjson.JSONDecodeError:
+                    # The stdlib accepts NaN and Infinity and raises its own
+                    # JSONDecodeError for anything else.
+                    pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        encoded = self._encode(obj, indent=indent, newline=True)
+        if encoded is None:
+            return super().response(obj)
+        return self._app.response_class(encoded, mimetype=self.mimetype)
+
+BACKEND = resolve_backend()
@@ -0,0 +1,237 @@
+"""Live post events for ``/api/posts/stream`` (Server-Sent Events).
+
+Mutation routes publish ``post-created``, ``post-updated`` and
+``post-deleted`` events, which go out at once. Like and view counts are
+coalesced: each ``FLUSH_SECONDS`` one ``counters`` event carries the latest
+``likes``/``views`` of every post that changed since the last flush.
+
+Each stream starts with an ``id`` line, so a reconnecting EventSource sends
+``Last-Event-ID``. Events are not replayed; a reconnected stream starts with
+``resync`` so the client refetches what it missed in between.
+
+Every stream has a buffer of at most ``BUFFER_SIZE`` events. A client that
+falls that far behind gets a single ``resync`` event in place of the backlog
+and should refetch ``/api/posts``.
+
+Events reach other workers through a bus. ``memory://`` keeps them in the
+process. ``sqlite:///path`` shares a table on the host that every worker
+polls once per flush.
+"""
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+BUFFER_SIZE = int(os.getenv("LIVE_FEED_BUFFER", "256"))
+FLUSH_SECONDS = float(os.getenv("LIVE_FEED_FLUSH_SECONDS", "1"))
+MAX_STREAMS = int(os.getenv("LIVE_FEED_MAX_STREAMS", "100"))
+KEEPALIVE_SECONDS = 15
+# Streams end after this long; EventSource reconnects on its own after ``retry``.
+STREAM_SECONDS = 300
+RETRY_MS = 3000
+RESYNC = ("resync", {})
+
+def format_event(event_type: str, data) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+class Subscription:
+    """One stream's bounded event buffer."""
+
+    def __init__(self, max_events: int = BUFFER_SIZE):
+        self._events: deque = deque()
+        self._max_events = max_events
+        self._ready = threading.Condition()
+        self.overflowed = False
+
+    def push(self, event: tuple[str, object]) -> None:
+        with self._ready:
+            if self.overflowed:
+                return
+            if len(self._events) >= self._max_events:
+                # The backlog is useless once events are missing; the client refetches instead.
+                self._events.clear()
+                self.overflowed = True
+            else:
+                self._events.append(event)
+            self._ready.notify()
+
+    def take(self, timeout: float) -> list[tuple[str, object]]:
+        """Buffered events, waiting up to ``timeout`` seconds for the first one."""
+        with self._ready:
+            if not self._events and not self.overflowed:
+                self._ready.wait(timeout)
+            if self.overflowed:
+                self.overflowed = False
+                return [RESYNC]
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+class MemoryBus:
+    def send(self, event_type: str, data) -> None:
+        pass
+
+    def receive(self) -> list[tuple[str, object]]:
+        return []
+
+class SQLiteBus:
+    """Events shared by the workers on one host through a SQLite table.
+
+    Each worker skips the rows it wrote itself and starts from the newest row
+    present when it first reads. Rows older than ``KEEP_SECONDS`` are deleted.
+    """
+
+    KEEP_SECONDS = 60
+
+    def __init__(self, path: str):
+        self.path = path
+        self.origin = os.getpid()
+        self._local = threading.local()
+        self._last_seq: int | None = None
+        self._sent = 0
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS live_events (seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " origin INTEGER NOT NULL, type TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def send(self, event_type: str, data) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT INTO live_events (origin, type, data, created_at) VALUES (?, ?, ?, ?)",
+            (self.origin, event_type, json.dumps(data, default=str), now),
+        )
+        self._sent += 1
+        if self._sent % 100 == 0:
+            self._conn.execute("DELETE FROM live_events WHERE created_at < ?", (now - self.KEEP_SECONDS,))
+
+    def receive(self) -> list[tuple[str, object]]:
+        if self._last_seq is None:
+            self._last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM live_events").fetchone()[0]
+            return []
+        rows = self._conn.execute(
+            "SELECT seq, origin, type, data FROM live_events WHERE seq > ? ORDER BY seq", (self._last_seq,)
+        ).fetchall()
+        if rows:
+            self._last_seq = rows[-1][0]
+        return [(event_type, json.loads(data)) for _, origin, event_type, data in rows if origin != self.origin]
+
+def open_bus(uri: str):
+    if uri == "memory://":
+        return MemoryBus()
+    if uri.startswith("sqlite:///"):
+        return SQLiteBus(uri[len("sqlite://"):])
+    raise ValueError(f"LIVE_FEED_BUS_URI must be memory:// or sqlite:///path, got {uri!r}")
+
+class LiveFeed:
+    """Fans events out to this process's streams and to the bus."""
+
+    def __init__(self, bus=None, flush_seconds: float = FLUSH_SECONDS, max_streams: int = MAX_STREAMS, buffer_size: int = BUFFER_SIZE):
+        self.bus = bus if bus is not None else MemoryBus()
+        self.flush_seconds = flush_seconds
+        self.max_streams = max_streams
+        self.buffer_size = buffer_size
+        self._subscriptions: set[Subscription] = set()
+        self._counters: dict = {}
+        self._lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+        self.errors = 0
+
+    @property
+    def streams(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription | None:
+        """A new stream's buffer, or None when ``max_streams`` are already open."""
+        with self._lock:
+            if len(self._subscriptions) >= self.max_streams:
+                return None
+            subscription = Subscription(self.buffer_size)
+            self._subscriptions.add(subscription)
+        self._start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _deliver(self, event_type: str, data) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.push((event_type, data))
+
+    def publish(self, event_type: str, data) -> None:
+        self._deliver(event_type, data)
+        try:
+            self.bus.send(event_type, data)
+        except sqlite3.Error:
+            # Other workers' streams miss this event; their next counters or refetch catches up.
+            self.errors += 1
+
+    def count(self, post_id, likes: int, views: int) -> None:
+        """Record a post's latest counts for the next ``counters`` event."""
+        with self._lock:
+            self._counters[post_id] = {"id": post_id, "likes": likes, "views": views}
+        self._start()
+
+    def flush(self) -> None:
+        """Publish pending counters and relay other workers' events."""
+        with self._lock:
+            counters, self._counters = self._counters, {}
+        if counters:
+            self.publish("counters", {"posts": list(counters.values())})
+        try:
+            received = self.bus.receive()
+        except sqlite3.Error:
+            self.errors += 1
+            received = []
+        for event_type, data in received:
+            self._deliver(event_type, data)
+
+    def _start(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name="live-feed-flush", daemon=True)
+                self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except Exception:
+                self.errors += 1
+
+    def stream(self, subscription: Subscription, keepalive: float = KEEPALIVE_SECONDS, duration: float = STREAM_SECONDS, reconnected: bool = False):
+        """SSE text chunks for ``subscription``; unsubscribes when the client goes away or time runs out."""
+        try:
+            yield f"retry: {RETRY_MS}\nid: {int(time.time() * 1000)}\n\n"
+            if reconnected:
+                yield format_event(*RESYNC)
+            deadline = time.monotonic() + duration
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                events = subscription.take(min(keepalive, remaining))
+                if events:
+                    yield "".join(format_event(event_type, data) for event_type, data in events)
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,582 @@
+"""Indexed in-memory tables behind the ``table().select().eq()...execute()`` API.
+
+A stand-in for Supabase when running the app offline and the data layer for
+route benchmarks. Every table has a primary hash index on ``id``, hash indexes
+on ``HASH_INDEXED`` columns and sorted indexes on ``SORTED_INDEXED`` columns.
+
+Rows are copy-on-write: a stored row is never modified in place. Writes build
+a new dict and swap it in, and reads hand out shallow copies, so nested lists
+are shared with the store and must be treated as read-only.
+
+With a path, every write is also committed to a SQLite file and other
+processes' commits are picked up before the next query. This is what lets
+several gunicorn workers share one dataset.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from itertools import islice
+from services import json_provider
+
+HASH_INDEXED = ("email", "author_id", "public_id")
+SORTED_INDEXED = ("id", "created_at")
+# Tables whose rows get ``updated_at`` bumped on every write, like the posts trigger in schema.sql.
+VERSIONED_TABLES = {"posts"}
+# Single-row counters bumped by every write that changes the keyed table, like the feed_version trigger in schema.sql.
+COUNTERS = {"posts": "feed_version"}
+# Columns whose changes alone leave the counter alone, like that trigger's WHEN clause.
+UNCOUNTED_COLUMNS = {"posts": frozenset({"viewed_by", "updated_at"})}
+_LOW, _HIGH = float("-inf"), float("inf")
+
+class LocalDatabaseError(RuntimeError):
+    pass
+
+class LocalResponse:
+    __slots__ = ("data", "count")
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+def _sort_key(value):
+    # NULLs sort last ascending and first descending, as in Postgres.
+    return (1, "") if value is None else (0, value)
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+def _next_version(previous: str | None) -> str:
+    """A fresh ``updated_at``, strictly later than ``previous`` so versions never repeat."""
+    now = _now()
+    if previous is None or now > previous:
+        return now
+    try:
+        return (datetime.fromisoformat(previous.rstrip("Z")) + timedelta(microseconds=1)).isoformat() + "Z"
+    except ValueError:
+        return now
+
+def _own(payload: dict) -> dict:
+    """Copy a caller's payload so later changes to its lists cannot reach the store."""
+    return {key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value for key, value in payload.items()}
+
+class _SortedIndex:
+    def __init__(self, column: str):
+        self.column = column
+        self.keys: list[tuple] = []
+
+    def build(self, rows) -> None:
+        self.keys = sorted((_sort_key(row.get(self.column)), row["id"]) for row in rows)
+
+    def add(self, row: dict) -> None:
+        insort(self.keys, (_sort_key(row.get(self.column)), row["id"]))
+
+    def remove(self, row: dict) -> None:
+        key = (_sort_key(row.get(self.column)), row["id"])
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+
+    def scan(self, bounds: list[tuple[str, object]], desc: bool):
+        start, end = 0, len(self.keys)
+        try:
+            for op, value in bounds:
+                if op == "gt":
+                    start = max(start, bisect_right(self.keys, ((0, value), _HIGH)))
+                elif op == "gte":
+                    start = max(start, bisect_left(self.keys, ((0, value), _LOW)))
+                elif op == "lt":
+                    end = min(end, bisect_left(self.keys, ((0, value), _LOW)))
+                elif op == "lte":
+                    end = min(end, bisect_right(self.keys, ((0, value), _HIGH)))
+        except TypeError:
+            start, end = 0, len(self.keys)
+        keys = self.keys[start:end] if start < end else []
+        return (row_id for _, row_id in (reversed(keys) if desc else keys))
+
+class _Table:
+    def __init__(self, rows=()):
+        self.rows: dict[int, dict] = {}
+        self.hashed: dict[str, dict[object, set[int]]] = {column: {} for column in HASH_INDEXED}
+        self.sorted = {column: _SortedIndex(column) for column in SORTED_INDEXED}
+        self.next_id = 1
+        for row in rows:
+            self.rows[row["id"]] = row
+            self._hash(row)
+            self.next_id = max(self.next_id, row["id"] + 1)
+        for index in self.sorted.values():
+            index.build(self.rows.values())
+
+    def _hash(self, row: dict) -> None:
+        for column, index in self.hashed.items():
+            value = row.get(column)
+            if value is not None:
+                index.setdefault(value, set()).add(row["id"])
+
+    def _unhash(self, row: dict) -> None:
+        for column, index in self.hashed.items():
+            ids = index.get(row.get(column))
+            if ids is not None:
+                ids.discard(row["id"])
+                if not ids:
+                    del index[row.get(column)]
+
+    def put(self, row: dict) -> None:
+        previous = self.rows.get(row["id"])
+        if previous is not None:
+            self.remove(previous["id"])
+        self.rows[row["id"]] = row
+        self._hash(row)
+        for index in self.sorted.values():
+            index.add(row)
+        if isinstance(row["id"], int):
+            self.next_id = max(self.next_id, row["id"] + 1)
+
+    def remove(self, row_id) -> None:
+        row = self.rows.pop(row_id, None)
+        if row is not None:
+            self._unhash(row)
+            for index in self.sorted.values():
+                index.remove(row)
+
+def like_regex(pattern: str) -> re.Pattern:
+    """Compile a PostgREST ``ilike`` value the way the server reads it.
+
+    A value in double quotes has its ``\\`` escapes undone first. Then ``%``
+    and ``*`` match any run, ``_`` any one character, and a backslash makes
+    the next character literal.
+    """
+    if len(pattern) >= 2 and pattern[0] == pattern[-1] == '"':
+        pattern = re.sub(r"\\(.)", r"\1", pattern[1:-1], flags=re.DOTALL)
+    parts = []
+    chars = iter(pattern)
+    for char in chars:
+        if char == "\\":
+            parts.append(re.escape(next(chars, "\\")))
+        elif char in "%*":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("^" + "".join(parts) + "$", re.IGNORECASE | re.DOTALL)
+
+def _compare(op):
+    def check(actual, expected):
+        if actual is None:
+            return False
+        try:
+            return op(actual, expected)
+        except TypeError:
+            return False
+
+    return check
+
+_OPS = {
+    "eq": lambda actual, expected: actual == expected,
+    "neq": lambda actual, expected: actual != expected,
+    "gt": _compare(lambda actual, expected: actual > expected),
+    "gte": _compare(lambda actual, expected: actual >= expected),
+    "lt": _compare(lambda actual, expected: actual < expected),
+    "lte": _compare(lambda actual, expected: actual <= expected),
+    "in": lambda actual, expected: actual in expected,
+    "contains": lambda actual, expected: all(value in (actual or ()) for value in expected),
+    "contained_by": lambda actual, expected: actual is not None and all(value in expected for value in actual),
+    "is": lambda actual, expected: actual is None if expected == "null" else actual is expected,
+    "ilike": lambda actual, expected: expected.match(str(actual if actual is not None else "")) is not None,
+}
+
+class LocalQuery:
+    """Builder mirroring the subset of postgrest-py the app uses."""
+
+    def __init__(self, db: "LocalDatabase", table: str):
+        self._db = db
+        self._table = table
+        self._action = "select"
+        self._columns: list[str] | None = None
+        self._count = None
+        self._head = False
+        self._filters: list[tuple[str, str, object]] = []
+        self._order: tuple[str, bool] | None = None
+        self._limit: int | None = None
+        self._offset = 0
+        self._payload = None
+
+    def select(self, columns: str = "*", *_args, count=None, head=False, **_kwargs):
+        self._action = "select"
+        names = [name.strip() for name in (columns or "*").split(",") if name.strip()]
+        self._columns = None if not names or "*" in names else names
+        self._count = count
+        self._head = head
+        return self
+
+    def _filter(self, column: str, op: str, value):
+        self._filters.append((column, op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", tuple(values))
+
+    def contains(self, column, values):
+        return self._filter(column, "contains", tuple(values))
+
+    def contained_by(self, column, values):
+        return self._filter(column, "contained_by", tuple(values))
+
+    def is_(self, column, value):
+        return self._filter(column, "is", value)
+
+    def ilike(self, column, pattern: str):
+        return self._filter(column, "ilike", like_regex(pattern))
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def insert(self, payload):
+        self._action, self._payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self._action, self._payload = "update", payload
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    def _matches(self, row: dict) -> bool:
+        return all(_OPS[op](row.get(column), value) for column, op, value in self._filters)
+
+    def _candidates(self, table: _Table):
+        """Row source for the filters: an id or hash index lookup, a sorted index scan, or every row.
+
+        Returns ``(rows, ordered)``; ``ordered`` is True when rows already come in ``order()`` order.
+        """
+        for column, op, value in self._filters:
+            if op not in ("eq", "in"):
+                continue
+            values = (value,) if op == "eq" else value
+            try:
+                if column == "id":
+                    return [table.rows[row_id] for row_id in dict.fromkeys(values) if row_id in table.rows], False
+                if column in table.hashed:
+                    index = table.hashed[column]
+                    ids = set().union(*(index.get(item, ()) for item in values))
+                    # Hash order is arbitrary; id order keeps unordered results stable.
+                    return [table.rows[row_id] for row_id in sorted(ids)], False
+            except TypeError:
+                continue
+        if self._order and self._order[0] in table.sorted:
+            column, desc = self._order
+            bounds = [(op, value) for name, op, value in self._filters if name == column and op in ("gt", "gte", "lt", "lte")]
+            return (table.rows[row_id] for row_id in table.sorted[column].scan(bounds, desc)), True
+        return table.rows.values(), False
+
+    def _select(self, table: _Table, want_total: bool) -> tuple[list[dict], int | None]:
+        rows, ordered = self._candidates(table)
+        matched = (row for row in rows if self._matches(row))
+        if not ordered and self._order:
+            column, desc = self._order
+            matched = iter(sorted(matched, key=lambda row: _sort_key(row.get(column)), reverse=desc))
+        if want_total and not self._filters:
+            stop = None if self._limit is None else self._offset + self._limit
+            return list(islice(matched, self._offset, stop)), len(table.rows)
+        if want_total:
+            matched = list(matched)
+            total = len(matched)
+            end = None if self._limit is None else self._offset + self._limit
+            return matched[self._offset:end], total
+        stop = None if self._limit is None else self._offset + self._limit
+        return list(islice(matched, self._offset, stop)), None
+
+    def _project(self, row: dict) -> dict:
+        if self._columns is None:
+            return dict(row)
+        return {column: row.get(column) for column in self._columns}
+
+    def execute(self) -> LocalResponse:
+        if self._action == "select":
+            return self._db._read(self)
+        return self._db._write(self)
+
+class _Rpc:
+    def __init__(self, db: "LocalDatabase", name: str, params: dict):
+        self._db, self._name, self._params = db, name, params
+
+    def execute(self) -> LocalResponse:
+        function = self._db.functions.get(self._name)
+        if function is None:
+            raise LocalDatabaseError(f"function {self._name} does not exist")
+        return LocalResponse(function(self._db, self._params or {}))
+
+class LocalDatabase:
+    """In-process tables with optional write-through SQLite persistence.
+
+    Each write is committed to ``local_rows`` (current state) and appended to
+    ``local_changes``; other processes replay the changes they have not seen,
+    or reload everything after a bulk ``load()`` or once the log has been
+    trimmed past them.
+
+    ``functions`` maps rpc names to ``function(db, params)``; unknown names
+    raise like a missing Postgres function, so callers keep their fallbacks.
+    """
+
+    KEEP_CHANGES = 10_000
+    TRIM_EVERY = 1000
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.tables: dict[str, _Table] = {}
+        self.functions: dict[str, object] = {}
+        self._lock = threading.RLock()
+        self._conn: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._version = None
+        self._generation = None
+        self._seq = 0
+        self._writes = 0
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def rpc(self, name: str, params: dict | None = None) -> _Rpc:
+        return _Rpc(self, name, params)
+
+    def load(self, name: str, rows: list[dict]) -> None:
+        """Replace a table's contents in bulk, building its indexes once."""
+        for row in rows:
+            if row.get("id") is None:
+                raise LocalDatabaseError(f"{name}: bulk-loaded rows need an id")
+        with self._lock:
+            if self.path:
+                def work(conn):
+                    self._sync()
+                    conn.execute("DELETE FROM local_rows WHERE tbl = ?", (name,))
+                    conn.executemany(
+                        "INSERT INTO local_rows (tbl, id, data) VALUES (?, ?, ?)",
+                        ((name, row["id"], json_provider.dumps(row)) for row in rows),
+                    )
+                    counted = self._count_write(name)
+                    if counted:
+                        self._persist(conn, COUNTERS[name], counted)
+                    # Readers reload in full rather than replaying a change per row.
+                    conn.execute("UPDATE local_meta SET generation = generation + 1")
+                    self._generation = conn.execute("SELECT generation FROM local_meta").fetchone()[0]
+                    return counted
+
+                counted = self._transaction(work)
+            else:
+                counted = self._count_write(name)
+            self.tables[name] = _Table(_own(row) for row in rows)
+            if counted:
+                self._apply(COUNTERS[name], counted)
+
+    def _connection(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        if self._conn is None or self._pid != pid:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS local_rows (
+                    tbl TEXT NOT NULL, id INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (tbl, id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS local_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, id INTEGER NOT NULL, data TEXT
+                );
+                CREATE TABLE IF NOT EXISTS local_meta (generation INTEGER NOT NULL);
+                INSERT INTO local_meta (generation) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM local_meta);
+                """
+            )
+            self._conn, self._pid, self._version, self._generation = conn, pid, None, None
+        return self._conn
+
+    def _transaction(self, work):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def _sync(self) -> None:
+        """Catch up with commits made by other connections since we last looked."""
+        if not self.path:
+            return
+        conn = self._connection()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._version:
+            return
+        generation = conn.execute("SELECT generation FROM local_meta").fetchone()[0]
+        oldest = conn.execute("SELECT MIN(seq) FROM local_changes").fetchone()[0]
+        if generation != self._generation or (oldest is not None and oldest > self._seq + 1):
+            grouped: dict[str, list[dict]] = {}
+            for name, data in conn.execute("SELECT tbl, data FROM local_rows ORDER BY tbl, id"):
+                grouped.setdefault(name, []).append(json.loads(data))
+            self.tables = {name: _Table(rows) for name, rows in grouped.items()}
+            self._seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM local_changes").fetchone()[0]
+            self._generation = generation
+        else:
+            for seq, name, row_id, data in conn.execute(
+                "SELECT seq, tbl, id, data FROM local_changes WHERE seq > ? ORDER BY seq", (self._seq,)
+            ):
+                if data is None:
+                    self._table(name).remove(row_id)
+                else:
+                    self._table(name).put(json.loads(data))
+                self._seq = seq
+        self._version = version
+
+    def _table(self, name: str) -> _Table:
+        table = self.tables.get(name)
+        if table is None:
+            table = self.tables[name] = _Table()
+        return table
+
+    def _read(self, query: LocalQuery) -> LocalResponse:
+        with self._lock:
+            self._sync()
+            rows, total = query._select(self._table(query._table), want_total=bool(query._count))
+        return LocalResponse([] if query._head else [query._project(row) for row in rows], total)
+
+    def _persist(self, conn, name: str, changes) -> None:
+        for row_id, row in changes:
+            if row is None or row["id"] != row_id:
+                conn.execute("DELETE FROM local_rows WHERE tbl = ? AND id = ?", (name, row_id))
+                conn.execute("INSERT INTO local_changes (tbl, id, data) VALUES (?, ?, NULL)", (name, row_id))
+            if row is not None:
+                data = json_provider.dumps(row)
+                conn.execute("INSERT OR REPLACE INTO local_rows (tbl, id, data) VALUES (?, ?, ?)", (name, row["id"], data))
+                conn.execute("INSERT INTO local_changes (tbl, id, data) VALUES (?, ?, ?)", (name, row["id"], data))
+        self._seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM local_changes").fetchone()[0]
+        self._writes += 1
+        if self._writes % self.TRIM_EVERY == 0:
+            conn.execute("DELETE FROM local_changes WHERE seq <= ?", (self._seq - self.KEEP_CHANGES,))
+
+    def _counts(self, query: LocalQuery, changes, table: _Table) -> bool:
+        """Whether ``changes`` bump the table's counter: any insert or delete, or an update of a counted column."""
+        if not changes:
+            return False
+        if query._action != "update":
+            return True
+        uncounted = UNCOUNTED_COLUMNS.get(query._table, frozenset())
+
+        def counted(row):
+            return {key: value for key, value in row.items() if key not in uncounted}
+
+        return any(counted(table.rows[row_id]) != counted(row) for row_id, row in changes)
+
+    def _count_write(self, name: str) -> list[tuple[object, dict]]:
+        """The counter row change for a write to ``name``, or nothing when no counter tracks it."""
+        counter = COUNTERS.get(name)
+        if counter is None:
+            return []
+        current = self._table(counter).rows.get(1) or {}
+        return [(1, {"id": 1, "version": int(current.get("version") or 0) + 1})]
+
+    def _apply(self, name: str, changes) -> list[dict]:
+        table = self._table(name)
+        result = []
+        for row_id, row in changes:
+            if row is None:
+                result.append(table.rows[row_id])
+                table.remove(row_id)
+                continue
+            if row["id"] != row_id:
+                table.remove(row_id)
+            table.put(row)
+            result.append(row)
+        return result
+
+    def _write(self, query: LocalQuery) -> LocalResponse:
+        with self._lock:
+            if self.path:
+                def work(conn):
+                    self._sync()
+                    planned = self._plan_write(query, self._table(query._table))
+                    counted = self._count_write(query._table) if self._counts(query, planned, self._table(query._table)) else []
+                    self._persist(conn, query._table, planned)
+                    if counted:
+                        self._persist(conn, COUNTERS[query._table], counted)
+                    return planned, counted
+
+                changes, counted = self._transaction(work)
+            else:
+                changes = self._plan_write(query, self._table(query._table))
+                counted = self._count_write(query._table) if self._counts(query, changes, self._table(query._table)) else []
+            result = self._apply(query._table, changes)
+            if counted:
+                self._apply(COUNTERS[query._table], counted)
+        return LocalResponse([dict(row) for row in result])
+
+    def _plan_write(self, query: LocalQuery, table: _Table) -> list[tuple[object, dict | None]]:
+        """``(id, new_row)`` pairs for the write, ``new_row`` None for deletes; the store is untouched."""
+        if query._action == "insert":
+            payloads = query._payload if isinstance(query._payload, list) else [query._payload]
+            changes, next_id = [], table.next_id
+            for payload in payloads:
+                row = _own(payload)
+                if row.get("id") is None:
+                    row["id"] = next_id
+                if row["id"] in table.rows or any(row["id"] == planned for planned, _ in changes):
+                    raise LocalDatabaseError(f'duplicate key value violates unique constraint "{query._table}_pkey"')
+                if isinstance(row["id"], int):
+                    next_id = max(next_id, row["id"] + 1)
+                row.setdefault("created_at", _now())
+                if query._table in VERSIONED_TABLES:
+                    row.setdefault("updated_at", row["created_at"])
+                changes.append((row["id"], row))
+            return changes
+        rows, _ = query._select(table, want_total=False)
+        if query._action == "update":
+            payload = _own(query._payload or {})
+            if query._table in VERSIONED_TABLES:
+                return [(row["id"], {**row, **payload, "updated_at": _next_version(row.get("updated_at"))}) for row in rows]
+            return [(row["id"], {**row, **payload}) for row in rows]
+        if query._action == "delete":
+            return [(row["id"], None) for row in rows]
+        raise LocalDatabaseError(f"unsupported action {query._action}")
+
+def open_database(uri: str) -> LocalDatabase:
+    """``memory://`` for a private in-process database, ``sqlite:///path/to.db`` to persist."""
+    scheme, _, path = uri.partition("://")
+    if scheme == "memory":
+        return LocalDatabase()
+    if scheme == "sqlite" and path:
+        return LocalDatabase(path)
+    raise ValueError(f"unsupported local database uri {uri!r}; use memory:// or sqlite:///path/to.db")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+def parse_sample_rates(raw: str | None) -> dict[str, float]:
+    """Parse ``"http_request=0.1,user_login=1"`` into ``{"http_request": 0.1, ...}``."""
+    rates: dict[str, float] = {}
+    for item in (raw or "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if not name:
+            continue
+        try:
+            rate = float(value)
+        except ValueError:
+            continue
+        rates[name] = min(max(rate, 0.0), 1.0)
+    return rates
+
+def parse_path_list(raw: str | None) -> frozenset[str]:
+    return frozenset(path.strip() for path in (raw or "").split(",") if path.strip())
+
+class EventSampler:
+    def __init__(self, rates: dict[str, float] | None = None, rng=random.random):
+        self.rates = dict(rates or {})
+        self._rng = rng
+
+    def should_log(self, event: str) -> bool:
+        rate = self.rates.get(event, 1.0)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        return self._rng() < rate
+
+class JsonEventFormatter(logging.Formatter):
+    """Renders dict messages as one JSON line; runs on the listener thread."""
+
+    def __init__(self, dumps=None):
+        super().__init__()
+        self._dumps = dumps or (lambda payload: json.dumps(payload, default=str))
+
+    def format(self, record):
+        if not isinstance(record.msg, dict):
+            return super().format(record)
+        timestamp = datetime.fromtimestamp(record.created, tz=timezone.utc).replace(tzinfo=None)
+        payload = {
+            "timestamp": timestamp.isoformat() + "Z",
+            "level": record.levelname,
+            **record.msg,
+        }
+        return self._dumps(payload)
+
+class AsyncQueueHandler(QueueHandler):
+    """Bounded queue handler that never blocks the request thread.
+
+    Records are handed to a ``QueueListener`` thread that owns the real handlers.
+    The listener is started lazily in each process, so a handler created before a
+    gunicorn fork still gets a live listener in every worker. When the queue is
+    full the record is dropped and ``on_drop`` is called.
+    """
+
+    def __init__(self, *handlers: logging.Handler, maxsize: int = 10000, on_drop=None):
+        super().__init__(queue.Queue(maxsize))
+        self._targets = handlers
+        self._on_drop = on_drop
+        self._listener: QueueListener | None = None
+        self._pid: int | None = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                self.queue = queue.Queue(self.queue.maxsize)
+            self._listener = QueueListener(self.queue, *self._targets, respect_handler_level=True)
+            self._listener.start()
+            self._pid = pid
+            atexit.register(self.stop)
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self._on_drop is not None:
+                self._on_drop()
+
+    def stop(self) -> None:
+        listener = self._listener
+        if listener is None or self._pid != os.getpid():
+            return
+        self._listener = None
+        self._pid = None
+        try:
+            listener.stop()
+        except queue.Full:
+            pass
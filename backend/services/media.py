@@ -0,0 +1,41 @@
+from __future__ import annotations
+import os
+from services.process_local import ProcessLocal
+
+def _configure():
+    # Deferred: the Cloudinary SDK (and urllib3 with it) is only imported by
+    # processes that actually touch media.
+    import cloudinary
+    import cloudinary.api
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+        api_key=os.getenv("CLOUDINARY_API_KEY"),
+        api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+    )
+    # Points the SDK at another API host, e.g. the load test's stub server.
+    if os.getenv("CLOUDINARY_UPLOAD_PREFIX"):
+        cloudinary.config(upload_prefix=os.getenv("CLOUDINARY_UPLOAD_PREFIX"))
+    return cloudinary
+
+_CLOUDINARY = ProcessLocal(_configure)
+
+def upload(file, **options) -> dict:
+    return _CLOUDINARY.get().uploader.upload(file, **options)
+
+def destroy(public_id: str, **options) -> dict:
+    return _CLOUDINARY.get().uploader.destroy(public_id, **options)
+
+def resources(**options) -> dict:
+    return _CLOUDINARY.get().api.resources(**options)
+
+def update(public_id: str, **options) -> dict:
+    return _CLOUDINARY.get().api.update(public_id, **options)
+
+def delete_resources(public_ids: list[str], **options) -> dict:
+    """Delete up to 100 assets in one Admin API call."""
+    return _CLOUDINARY.get().api.delete_resources(public_ids, **options)
+
+def delete_resources_by_prefix(prefix: str, **options) -> dict:
+    return _CLOUDINARY.get().api.delete_resources_by_prefix(prefix, **options)
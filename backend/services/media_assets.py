@@ -0,0 +1,114 @@
+from __future__ import annotations
+import hashlib
+
+MEDIA_ASSETS_TABLE = "media_assets"
+HASH_CHUNK_SIZE = 64 * 1024
+# Conditional ref_count writes retried this often before giving up.
+CAS_ATTEMPTS = 5
+
+def hash_stream(stream, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """SHA-256 of a file-like object, read in chunks and rewound afterwards."""
+    start = stream.tell()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(start)
+    return digest.hexdigest()
+
+def find_asset(client, owner: str, content_hash: str) -> dict | None:
+    result = (
+        client.table(MEDIA_ASSETS_TABLE)
+        .select("*")
+        .eq("owner", owner)
+        .eq("content_hash", content_hash)
+        .limit(1)
+        .execute()
+    )
+    rows = result.data or []
+    return rows[0] if rows else None
+
+def record_asset(client, owner: str, content_hash: str, upload_result: dict) -> None:
+    client.table(MEDIA_ASSETS_TABLE).insert(
+        {
+            "owner": owner,
+            "content_hash": content_hash,
+            "public_id": upload_result["public_id"],
+            "url": upload_result["secure_url"],
+            "resource_type": upload_result["resource_type"],
+            "ref_count": 0,
+        }
+    ).execute()
+
+def _asset_by_public_id(client, public_id: str) -> dict | None:
+    result = client.table(MEDIA_ASSETS_TABLE).select("*").eq("public_id", public_id).limit(1).execute()
+    rows = result.data or []
+    return rows[0] if rows else None
+
+def _set_ref_count(client, row: dict, ref_count: int) -> bool:
+    """Compare-and-set ``ref_count``: only applies when nobody changed it since ``row`` was read."""
+    result = (
+        client.table(MEDIA_ASSETS_TABLE)
+        .update({"ref_count": ref_count})
+        .eq("id", row["id"])
+        .eq("ref_count", row.get("ref_count") or 0)
+        .execute()
+    )
+    return bool(result.data)
+
+def _delete_unreferenced(client, row: dict) -> bool:
+    result = (
+        client.table(MEDIA_ASSETS_TABLE)
+        .delete()
+        .eq("id", row["id"])
+        .eq("ref_count", row.get("ref_count") or 0)
+        .execute()
+    )
+    return bool(result.data)
+
+def acquire_asset(client, public_id: str | None) -> None:
+    """Count one more post referencing ``public_id``. Unindexed assets are ignored."""
+    if not public_id:
+        return
+    for _ in range(CAS_ATTEMPTS):
+        row = _asset_by_public_id(client, public_id)
+        if row is None:
+            return
+        if _set_ref_count(client, row, int(row.get("ref_count") or 0) + 1):
+            return
+    raise RuntimeError(f"ref_count of {public_id} kept changing; reference not recorded")
+
+def release_asset(client, public_id: str | None) -> bool:
+    """Drop one reference to ``public_id`` and report whether the asset should be destroyed.
+
+    Assets that predate the index are not tracked, so they keep the old behaviour
+    of being destroyed together with their post. When the count keeps changing
+    under us the asset is kept: a leaked file is better than a broken post.
+    """
+    if not public_id:
+        return False
+    for _ in range(CAS_ATTEMPTS):
+        row = _asset_by_public_id(client, public_id)
+        if row is None:
+            return True
+        ref_count = int(row.get("ref_count") or 0)
+        if ref_count > 1:
+            if _set_ref_count(client, row, ref_count - 1):
+                return False
+        elif _delete_unreferenced(client, row):
+            return True
+    return False
+
+def discard_asset(client, public_id: str) -> bool:
+    """Remove the index row of an asset about to be destroyed directly.
+
+    Returns False, leaving the row, while posts still reference the asset.
+    """
+    for _ in range(CAS_ATTEMPTS):
+        row = _asset_by_public_id(client, public_id)
+        if row is None:
+            return True
+        if int(row.get("ref_count") or 0) > 0:
+            return False
+        if _delete_unreferenced(client, row):
+            return True
+    return False
@@ -0,0 +1,87 @@
+from __future__ import annotations
+import fcntl
+import glob
+import os
+import threading
+import time
+from contextlib import contextmanager
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest, multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+
+ARCHIVED_TYPES = ("counter", "histogram")
+LOCK_FILENAME = ".collect.lock"
+
+def multiprocess_dir() -> str | None:
+    return os.getenv("PROMETHEUS_MULTIPROC_DIR") or None
+
+@contextmanager
+def _dir_lock(path: str, exclusive: bool):
+    """Serialises archive compaction against scrapes that read the same files."""
+    with open(os.path.join(path, LOCK_FILENAME), "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+def prepare_multiprocess_dir(path: str) -> None:
+    """Create the shared metrics directory and drop files left by a previous run."""
+    os.makedirs(path, exist_ok=True)
+    for filename in glob.glob(os.path.join(path, "*.db")):
+        os.remove(filename)
+
+def compact_worker_files(pid: int, path: str | None = None) -> None:
+    """Fold a dead worker's counter and histogram files into one archive file per type.
+
+    ``mark_process_dead`` only removes live gauges, so without this every recycled
+    worker leaves files behind and each scrape has to merge more of them.
+    """
+    path = path or multiprocess_dir()
+    if not path:
+        return
+    multiprocess.mark_process_dead(pid, path)
+    with _dir_lock(path, exclusive=True):
+        for metric_type in ARCHIVED_TYPES:
+            dead_file = os.path.join(path, f"{metric_type}_{pid}.db")
+            if not os.path.exists(dead_file):
+                continue
+            archive = MmapedDict(os.path.join(path, f"{metric_type}_archive.db"))
+            try:
+                for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(dead_file):
+                    current, _ = archive.read_value(key)
+                    archive.write_value(key, current + value, timestamp)
+            finally:
+                archive.close()
+            os.remove(dead_file)
+
+class MetricsExporter:
+    """Renders ``/metrics``, aggregating worker files when multiprocess mode is on.
+
+    The rendered payload is reused for ``ttl_seconds`` so concurrent or frequent
+    scrapes do not each pay for a full merge.
+    """
+
+    def __init__(self, ttl_seconds: float = 1.0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._body: bytes | None = None
+        self._rendered_at = 0.0
+        self._registry: CollectorRegistry | None = None
+
+    def _generate(self) -> bytes:
+        path = multiprocess_dir()
+        if not path:
+            return generate_latest(REGISTRY)
+        if self._registry is None:
+            self._registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(self._registry, path=path)
+        with _dir_lock(path, exclusive=False):
+            return generate_latest(self._registry)
+
+    def render(self) -> bytes:
+        with self._lock:
+            if self._body is not None and time.monotonic() - self._rendered_at < self.ttl_seconds:
+                return self._body
+            self._body = self._generate()
+            self._rendered_at = time.monotonic()
+            return self._body
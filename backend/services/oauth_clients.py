@@ -0,0 +1,33 @@
+from __future__ import annotations
+import os
+
+def build_oauth(app):
+    """Register the Google and Spotify OAuth clients; Authlib is imported here, not at app import."""
+    from authlib.integrations.flask_client import OAuth
+
+    accounts_url = os.getenv("SPOTIFY_ACCOUNTS_BASE_URL", "https://accounts.spotify.com").rstrip("/")
+    oauth = OAuth(app)
+    oauth.register(
+        name="google",
+        client_id=os.getenv("GOOGLE_CLIENT_ID"),
+        client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
+        server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
+        client_kwargs={"scope": "openid email profile"},
+    )
+    oauth.register(
+        name="spotify",
+        client_id=os.getenv("SPOTIFY_CLIENT_ID"),
+        client_secret=os.getenv("SPOTIFY_CLIENT_SECRET"),
+        access_token_url=f"{accounts_url}/api/token",
+        authorize_url=f"{accounts_url}/authorize",
+        api_base_url=os.getenv("SPOTIFY_API_BASE_URL", "https://api.spotify.com/v1"),
+        client_kwargs={
+            "scope": "user-read-playback-state user-read-currently-playing streaming user-modify-playback-state"
+        },
+    )
+    return oauth
+
+def mismatching_state_error():
+    from authlib.integrations.base_client.errors import MismatchingStateError
+
+    return MismatchingStateError
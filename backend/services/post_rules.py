@@ -1,5 +1,12 @@
 from __future__ import annotations
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
 from dataclasses import dataclass
+from itertools import islice
+from operator import lt
+from typing import Iterable
 
 @dataclass(frozen=True)
 class PostValidationResult:
@@ -33,4 +40,153 @@ def normalize_id_list(values) -> list[int]:
             result.append(int(value))
         except (TypeError, ValueError):
             continue
-    return result
\ No newline at end of file
+    return result
+
+class InteractionSet:
+    """Sorted, de-duplicated user ids (``liked_by``/``viewed_by``) packed in an ``array('q')``.
+
+    Eight bytes per id instead of a list of int objects, with binary-search
+    membership. Instances are immutable; ``add``/``discard``/``toggle`` return
+    new sets.
+    """
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids: array | None = None):
+        self._ids = ids if ids is not None else array("q")
+
+    @classmethod
+    def from_values(cls, values: Iterable | None) -> "InteractionSet":
+        """Parse stored ids, skipping values that are not 64-bit integers."""
+        try:
+            ids = array("q", values or ())
+        except (TypeError, OverflowError):
+            pass
+        else:
+            # Arrays written by InteractionSet are already sorted and unique.
+            if all(map(lt, ids, islice(ids, 1, None))):
+                return cls(ids)
+            return cls(array("q", sorted(set(ids))))
+        parsed = set()
+        for value in values or ():
+            try:
+                number = int(value)
+            except (TypeError, ValueError):
+                continue
+            if -(2**63) <= number < 2**63:
+                parsed.add(number)
+        return cls(array("q", sorted(parsed)))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, user_id) -> bool:
+        if not isinstance(user_id, int):
+            return False
+        ids = self._ids
+        position = bisect_left(ids, user_id)
+        return position < len(ids) and ids[position] == user_id
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, InteractionSet) and self._ids == other._ids
+
+    def __repr__(self) -> str:
+        return f"InteractionSet({self.to_list()!r})"
+
+    def add(self, user_id: int) -> "InteractionSet":
+        position = bisect_left(self._ids, user_id)
+        if position < len(self._ids) and self._ids[position] == user_id:
+            return self
+        ids = array("q", self._ids)
+        ids.insert(position, user_id)
+        return InteractionSet(ids)
+
+    def discard(self, user_id: int) -> "InteractionSet":
+        position = bisect_left(self._ids, user_id)
+        if position == len(self._ids) or self._ids[position] != user_id:
+            return self
+        ids = array("q", self._ids)
+        del ids[position]
+        return InteractionSet(ids)
+
+    def toggle(self, user_id: int) -> tuple["InteractionSet", bool]:
+        """``(new_set, added)``: removes ``user_id`` if present, otherwise adds it."""
+        if user_id in self:
+            return self.discard(user_id), False
+        return self.add(user_id), True
+
+    def merge(self, other: "InteractionSet") -> "InteractionSet":
+        """Union of two sets in one linear pass over both sorted arrays."""
+        left, right, merged = self._ids, other._ids, array("q")
+        i = j = 0
+        while i < len(left) and j < len(right):
+            if left[i] < right[j]:
+                merged.append(left[i])
+                i += 1
+            elif right[j] < left[i]:
+                merged.append(right[j])
+                j += 1
+            else:
+                merged.append(left[i])
+                i += 1
+                j += 1
+        merged.extend(left[i:])
+        merged.extend(right[j:])
+        return InteractionSet(merged)
+
+    def to_list(self) -> list[int]:
+        """Plain ints for JSON and database writes."""
+        return self._ids.tolist()
+
+INTERACTION_CACHE_SIZE = 8192
+_parsed: OrderedDict[tuple, InteractionSet] = OrderedDict()
+_parsed_lock = threading.Lock()
+# None until a post write shows whether the updated_at trigger is installed.
+_versioned: bool | None = None
+
+def observe_post_write(before: dict, after: dict | None) -> None:
+    """Record whether an update moved the post's ``updated_at``.
+
+    The column alone proves nothing: without the trigger it keeps its insert
+    default, and a memo keyed on it would serve stale likes and views. The memo
+    turns on once a write is seen to bump the version, and off for good once one
+    is seen that did not.
+    """
+    global _versioned
+    version = before.get("updated_at")
+    if after is None or version is None or _versioned is False:
+        return
+    if after.get("updated_at") == version:
+        with _parsed_lock:
+            _versioned = False
+            _parsed.clear()
+    else:
+        _versioned = True
+
+def interactions(row: dict, column: str) -> InteractionSet:
+    """``row[column]`` as an ``InteractionSet``.
+
+    Parsing is memoized per ``(post id, column, updated_at)`` once
+    ``observe_post_write`` has seen the posts trigger bump ``updated_at``. That
+    key changes on every write, so a stale entry is never served. Otherwise
+    rows are parsed each time.
+    """
+    version = row.get("updated_at")
+    if not _versioned or version is None or row.get("id") is None:
+        return InteractionSet.from_values(row.get(column))
+    key = (row["id"], column, version)
+    with _parsed_lock:
+        cached = _parsed.get(key)
+        if cached is not None:
+            _parsed.move_to_end(key)
+            return cached
+    parsed = InteractionSet.from_values(row.get(column))
+    with _parsed_lock:
+        _parsed[key] = parsed
+        while len(_parsed) > INTERACTION_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    return parsed
+
@@ -0,0 +1,48 @@
+from __future__ import annotations
+import os
+import threading
+import weakref
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+_instances: "weakref.WeakSet[ProcessLocal]" = weakref.WeakSet()
+
+class ProcessLocal(Generic[T]):
+    """Value built on first use and rebuilt once in every forked process.
+
+    Clients created in a gunicorn master before fork would otherwise share
+    sockets and connection pools with every worker.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+        self._value: T | None = None
+        _instances.add(self)
+
+    def get(self) -> T:
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._value = self._factory()
+                    self._pid = pid
+        return self._value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pid = None
+            self._value = None
+
+    def _after_fork(self) -> None:
+        # A lock held by another thread at fork time would never be released here.
+        self._lock = threading.Lock()
+
+def _reinit_locks_after_fork() -> None:
+    for instance in list(_instances):
+        instance._after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_locks_after_fork)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+MAX_PROFILED_REQUESTS = 100
+MAX_PROFILE_SECONDS = 600
+
+def _finite(value) -> float:
+    """``value`` as a float; NaN and infinities would slip through min/max clamping."""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{value!r} is not a finite number")
+    return number
+
+@dataclass
+class ProfileWindow:
+    path: str
+    remaining: int | None
+    deadline: float | None
+    interval: float
+    started_at: float = field(default_factory=time.time)
+    profiled: int = 0
+
+    def expired(self, now: float) -> bool:
+        if self.deadline is not None and now >= self.deadline:
+            return True
+        return self.remaining is not None and self.remaining <= 0
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "remaining_requests": self.remaining,
+            "seconds_left": None if self.deadline is None else round(max(self.deadline - time.time(), 0), 2),
+            "interval_ms": round(self.interval * 1000, 2),
+            "profiled_requests": self.profiled,
+        }
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_")
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class RequestSampler:
+    """Samples one thread's stack on a background thread and writes folded stacks.
+
+    The output is Brendan Gregg's collapsed format (``a;b;c <count>``), which
+    flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, thread_id: int, interval: float, output_path: str):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.output_path = output_path
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> "RequestSampler":
+        self._thread.start()
+        return self
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        if labels:
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def stop(self) -> str | None:
+        self._stop.set()
+        self._thread.join()
+        if not self.stacks:
+            return None
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        with open(self.output_path, "w", encoding="utf-8") as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+        return self.output_path
+
+class ProfilerControl:
+    """Arms the sampler for the next N requests or a time window on one path.
+
+    When nothing is armed ``maybe_start`` is a single attribute check.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self._window: ProfileWindow | None = None
+        self._lock = threading.Lock()
+
+    def arm(self, path: str, requests: int | None = None, seconds: float | None = None, interval_ms: float = 5) -> dict:
+        if requests is None and seconds is None:
+            requests = 1
+        if requests is not None:
+            requests = min(max(int(_finite(requests)), 1), MAX_PROFILED_REQUESTS)
+        deadline = None
+        if seconds is not None:
+            deadline = time.time() + min(max(_finite(seconds), 0.1), MAX_PROFILE_SECONDS)
+        interval = min(max(_finite(interval_ms), 1.0), 1000.0) / 1000
+        with self._lock:
+            self._window = ProfileWindow(path=path, remaining=requests, deadline=deadline, interval=interval)
+            return self._window.to_dict()
+
+    def disarm(self) -> None:
+        with self._lock:
+            self._window = None
+
+    def status(self) -> dict | None:
+        window = self._window
+        if window is None or window.expired(time.time()):
+            return None
+        return window.to_dict()
+
+    def maybe_start(self, paths: tuple[str, ...], request_id: str) -> RequestSampler | None:
+        if self._window is None:
+            return None
+        with self._lock:
+            window = self._window
+            if window is None:
+                return None
+            if window.expired(time.time()):
+                self._window = None
+                return None
+            if window.path not in paths:
+                return None
+            if window.remaining is not None:
+                window.remaining -= 1
+            window.profiled += 1
+        safe_path = _safe_name(window.path) or "root"
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{safe_path}-{_safe_name(request_id)[:64]}.folded"
+        output_path = os.path.join(self.output_dir, filename)
+        return RequestSampler(threading.get_ident(), window.interval, output_path).start()
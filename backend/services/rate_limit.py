@@ -0,0 +1,165 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from math import floor
+from flask import session
+from flask_limiter.util import get_remote_address
+from limits.storage.base import SlidingWindowCounterSupport, Storage, TimestampedSlidingWindow
+
+def rate_limit_key() -> str:
+    """Limit signed-in users individually; fall back to the client IP otherwise.
+
+    A whole campus behind one NAT would otherwise share a single bucket.
+    """
+    user_id = session.get("user_id")
+    if user_id is not None:
+        return f"user:{user_id}"
+    email = session.get("user")
+    if email:
+        return f"user:{str(email).strip().lower()}"
+    return f"ip:{get_remote_address()}"
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Rate limit storage in a SQLite file shared by every worker on the host.
+
+    ``sqlite:///tmp/ratelimit.db`` or ``sqlite://`` for a
+    private in-memory database. Connections are opened per process and thread,
+    and each check-and-increment runs in one ``BEGIN IMMEDIATE`` transaction, so
+    concurrent workers cannot both take the last slot.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options):
+        path = (uri or "sqlite://").split("://", 1)[1] if "://" in (uri or "") else ""
+        self.path = path or ":memory:"
+        self._local = threading.local()
+        self._shared_memory_conn: sqlite3.Connection | None = None
+        self._memory_lock = threading.Lock()
+        self._calls = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        import sqlite3
+        return sqlite3.Error
+
+    def _connect(self) -> sqlite3.Connection:
+        # Deferred like the other backends: nothing opens a database before the first check.
+        import sqlite3
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        if self.path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self.path == ":memory:":
+            # One private database per process; threads share it under a lock.
+            if self._shared_memory_conn is None or getattr(self, "_memory_pid", None) != os.getpid():
+                self._shared_memory_conn = self._connect()
+                self._memory_pid = os.getpid()
+            return self._shared_memory_conn
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            self._local.conn = self._connect()
+            self._local.pid = pid
+        return self._local.conn
+
+    def _transaction(self, work, purge: bool = True):
+        lock = self._memory_lock if self.path == ":memory:" else _NullLock()
+        with lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(conn, time.time())
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        if purge:
+            self._calls += 1
+            if self._calls % self.PURGE_EVERY == 0:
+                self._transaction(lambda conn, now: conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,)), purge=False)
+        return result
+
+    @staticmethod
+    def _get(conn, key: str, now: float) -> int:
+        row = conn.execute("SELECT value FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        return int(row[0]) if row else 0
+
+    @staticmethod
+    def _incr(conn, key: str, expiry: float, amount: int, now: float) -> int:
+        conn.execute("DELETE FROM rate_limits WHERE key = ? AND expires_at <= ?", (key, now))
+        row = conn.execute(
+            "INSERT INTO rate_limits (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value RETURNING value",
+            (key, amount, now + expiry),
+        ).fetchone()
+        return int(row[0])
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return self._transaction(lambda conn, now: self._incr(conn, key, expiry, amount, now))
+
+    def get(self, key: str) -> int:
+        return self._get(self._conn, key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        row = self._conn.execute("SELECT expires_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        return float(row[0]) if row else time.time()
+
+    def check(self) -> bool:
+        import sqlite3
+        try:
+            self._conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        return self._transaction(lambda conn, now: conn.execute("DELETE FROM rate_limits").rowcount, purge=False)
+
+    def clear(self, key: str) -> None:
+        self._transaction(lambda conn, now: conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,)), purge=False)
+
+    def _window(self, conn, key: str, expiry: int, now: float) -> tuple[int, float, int, float, str]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._get(conn, previous_key, now)
+        current_count = self._get(conn, current_key, now)
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl, current_key
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+
+        def work(conn, now):
+            previous_count, previous_ttl, current_count, _, current_key = self._window(conn, key, expiry, now)
+            if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                return False
+            self._incr(conn, current_key, 2 * expiry, amount, now)
+            return True
+
+        return self._transaction(work)
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        return self._window(self._conn, key, expiry, time.time())[:4]
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
+
+class _NullLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
@@ -0,0 +1,132 @@
+"""Per-request repositories over the ``users`` and ``posts`` tables.
+
+Rows a request has already loaded are kept in an identity map, so the auth
+lookup, permission checks and the handler share one fetch. Writes refresh
+the map from the rows the database returns. Lookups of several keys go out
+as ``in`` queries, one per ``LOOKUP_CHUNK_SIZE`` keys.
+"""
+from __future__ import annotations
+
+LOOKUP_CHUNK_SIZE = 200
+# One row (id 1) whose ``version`` a trigger bumps on every posts write.
+FEED_VERSION_TABLE = "feed_version"
+
+class Repository:
+    table = ""
+    # Columns besides ``id`` that identify a row and are indexed in the map.
+    keys: tuple[str, ...] = ()
+
+    def __init__(self, client):
+        self.client = client
+        self._rows: dict = {}
+        self._ids_by_key: dict[str, dict] = {key: {} for key in self.keys}
+        self._missing: set[tuple[str, object]] = set()
+
+    def _remember(self, row: dict | None) -> dict | None:
+        if row is None or row.get("id") is None:
+            return row
+        self.forget(row["id"])
+        self._rows[row["id"]] = row
+        for key, ids in self._ids_by_key.items():
+            if row.get(key) is not None:
+                ids[row[key]] = row["id"]
+        return row
+
+    def forget(self, row_id) -> None:
+        row = self._rows.pop(row_id, None)
+        if row is None:
+            return
+        for key, ids in self._ids_by_key.items():
+            if ids.get(row.get(key)) == row_id:
+                del ids[row.get(key)]
+
+    def _cached(self, column: str, value):
+        if column == "id":
+            return self._rows.get(value)
+        row_id = self._ids_by_key[column].get(value)
+        return None if row_id is None else self._rows.get(row_id)
+
+    def get_by(self, column: str, value) -> dict | None:
+        row = self._cached(column, value)
+        if row is not None or (column, value) in self._missing:
+            return row
+        rows = self.client.table(self.table).select("*").eq(column, value).limit(1).execute().data or []
+        if not rows:
+            self._missing.add((column, value))
+            return None
+        return self._remember(rows[0])
+
+    def get(self, row_id) -> dict | None:
+        return self.get_by("id", row_id)
+
+    def get_many(self, values, column: str = "id") -> dict:
+        """``{value: row}`` for the values that exist, fetching only those not yet loaded."""
+        found, pending = {}, []
+        for value in dict.fromkeys(value for value in values if value is not None):
+            row = self._cached(column, value)
+            if row is not None:
+                found[value] = row
+            elif (column, value) not in self._missing:
+                pending.append(value)
+        for start in range(0, len(pending), LOOKUP_CHUNK_SIZE):
+            chunk = pending[start:start + LOOKUP_CHUNK_SIZE]
+            rows = self.client.table(self.table).select("*").in_(column, chunk).execute().data or []
+            for row in rows:
+                found[row.get(column)] = self._remember(row)
+            self._missing.update((column, value) for value in chunk if value not in found)
+        return found
+
+    def insert(self, payload: dict) -> dict | None:
+        rows = self.client.table(self.table).insert(payload).execute().data or []
+        self._missing.clear()
+        return self._remember(rows[0]) if rows else None
+
+    def update(self, row_id, payload: dict, **match) -> dict | None:
+        """Update one row, optionally only when the ``match`` columns also equal the given values.
+
+        Returns the updated row, or None when nothing matched.
+        """
+        query = self.client.table(self.table).update(payload).eq("id", row_id)
+        for column, value in match.items():
+            query = query.eq(column, value)
+        rows = query.execute().data or []
+        if not rows:
+            return None
+        return self._remember(rows[0])
+
+    def delete(self, row_id, **match) -> dict | None:
+        """Delete one row (subject to ``match``) and return it, or None when nothing matched."""
+        query = self.client.table(self.table).delete().eq("id", row_id)
+        for column, value in match.items():
+            query = query.eq(column, value)
+        rows = query.execute().data or []
+        self.forget(row_id)
+        return rows[0] if rows else None
+
+class UserRepository(Repository):
+    table = "users"
+    keys = ("email",)
+
+    def get_by_email(self, email: str) -> dict | None:
+        return self.get_by("email", email)
+
+class PostRepository(Repository):
+    table = "posts"
+
+    def newest_first(self) -> list[dict]:
+        return self.client.table(self.table).select("*").order("created_at", desc=True).execute().data or []
+
+    def feed_version(self) -> int | None:
+        """The trigger-maintained ``feed_version`` counter, or None when it is not installed."""
+        try:
+            rows = self.client.table(FEED_VERSION_TABLE).select("version").eq("id", 1).limit(1).execute().data or []
+        except Exception:
+            return None
+        return rows[0].get("version") if rows else None
+
+class Repositories:
+    """The repositories for one request, sharing a client."""
+
+    def __init__(self, client):
+        self.users = UserRepository(client)
+        self.posts = PostRepository(client)
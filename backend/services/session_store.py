@@ -0,0 +1,267 @@
+"""Server-side Flask sessions behind a small opaque cookie.
+
+The cookie carries only a random session id. The session itself (user, role,
+OAuth state, the Spotify token) lives in a store picked by ``SESSION_STORE``:
+
+- ``memory://`` keeps an LRU of ``SESSION_STORE_MAX_ENTRIES`` sessions per process,
+- ``sqlite:///path`` shares a file between the workers on one host,
+- ``redis://host:6379/0`` uses any Redis-compatible server (needs ``redis``).
+
+A session is written back only when its contents changed, so the per-request
+``user_id``/``user_role`` refresh in ``requireAuth`` costs no write. Its expiry
+slides: once less than half the TTL is left, a read renews it. Permanent
+sessions live for ``PERMANENT_SESSION_LIFETIME``, others for
+``SESSION_STORE_TRANSIENT_SECONDS``. The id is replaced whenever the signed-in
+user changes, so an id set before login cannot be reused after it.
+
+A store that cannot be reached yields an empty session for the request instead
+of an error, so health probes and anonymous routes keep answering.
+"""
+from __future__ import annotations
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+MAX_ENTRIES = int(os.getenv("SESSION_STORE_MAX_ENTRIES", "10000"))
+TRANSIENT_SECONDS = float(os.getenv("SESSION_STORE_TRANSIENT_SECONDS", "86400"))
+# The session key whose change means a different person is signed in.
+IDENTITY_KEY = "user"
+
+class MemoryStore:
+    name = "memory"
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid: str) -> str | None:
+        entry = self.load(sid)
+        return entry[0] if entry else None
+
+    def load(self, sid: str) -> tuple[str, float] | None:
+        """The stored data and its expiry time."""
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return entry[1], entry[0]
+
+    def set(self, sid: str, data: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[sid] = (time.time() + ttl, data)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, sid: str, ttl: float) -> None:
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is not None:
+                self._entries[sid] = (time.time() + ttl, entry[1])
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._entries.pop(sid, None)
+
+class SQLiteStore:
+    """Sessions in a SQLite file, with a connection per process and thread."""
+
+    name = "sqlite"
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, sid: str) -> str | None:
+        entry = self.load(sid)
+        return entry[0] if entry else None
+
+    def load(self, sid: str) -> tuple[str, float] | None:
+        row = self._conn.execute("SELECT data, expires_at FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, sid: str, data: str, ttl: float) -> None:
+        now = time.time()
+        self._conn.execute("INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)", (sid, data, now + ttl))
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def touch(self, sid: str, ttl: float) -> None:
+        self._conn.execute("UPDATE sessions SET expires_at = ? WHERE sid = ?", (time.time() + ttl, sid))
+
+    def delete(self, sid: str) -> None:
+        self._conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+class RedisStore:
+    name = "redis"
+    PREFIX = "session:"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - depends on the install
+            raise RuntimeError("SESSION_STORE=redis://... needs the redis package") from exc
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, sid: str) -> str | None:
+        entry = self.load(sid)
+        return entry[0] if entry else None
+
+    def load(self, sid: str) -> tuple[str, float] | None:
+        # One round trip for the data and its remaining lifetime.
+        data, ttl_ms = self._client.pipeline().get(self.PREFIX + sid).pttl(self.PREFIX + sid).execute()
+        if data is None:
+            return None
+        return (data.decode() if isinstance(data, bytes) else data), time.time() + max(ttl_ms, 0) / 1000
+
+    def set(self, sid: str, data: str, ttl: float) -> None:
+        self._client.set(self.PREFIX + sid, data, ex=max(1, int(ttl)))
+
+    def touch(self, sid: str, ttl: float) -> None:
+        self._client.expire(self.PREFIX + sid, max(1, int(ttl)))
+
+    def delete(self, sid: str) -> None:
+        self._client.delete(self.PREFIX + sid)
+
+def open_store(uri: str):
+    if uri == "memory://":
+        return MemoryStore()
+    if uri.startswith("sqlite:///"):
+        return SQLiteStore(uri[len("sqlite://"):])
+    if uri.startswith(("redis://", "rediss://")):
+        return RedisStore(uri)
+    raise ValueError(f"SESSION_STORE must be memory://, sqlite:///path or redis://host:port, got {uri!r}")
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid: str | None = None, encoded: str | None = None, expires_at: float | None = None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = sid is None
+        self.modified = False
+        # The stored form and signed-in user as loaded; saving compares against them.
+        self.encoded = encoded
+        self.identity = self.get(IDENTITY_KEY)
+        self.expires_at = expires_at
+
+class ServerSideSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+    session_class = ServerSession
+
+    def __init__(
+        self,
+        store,
+        observe: Callable[[float], None] | None = None,
+        on_error: Callable[[str, Exception], None] | None = None,
+        transient_seconds: float = TRANSIENT_SECONDS,
+    ):
+        self.store = store
+        self._observe = observe
+        self._on_error = on_error
+        self.transient_seconds = transient_seconds
+
+    def _failed(self, operation: str, exc: Exception) -> None:
+        if self._on_error is not None:
+            self._on_error(operation, exc)
+
+    def _ttl(self, app, session) -> float:
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        return lifetime if session.permanent else min(self.transient_seconds, lifetime)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid:
+            return self.session_class()
+        started = time.perf_counter()
+        try:
+            entry = self.store.load(sid)
+        except Exception as exc:
+            self._failed("load", exc)
+            return self.session_class()
+        if self._observe is not None:
+            self._observe(time.perf_counter() - started)
+        if entry is None:
+            return self.session_class()
+        data, expires_at = entry
+        try:
+            return self.session_class(self.serializer.loads(data), sid, data, expires_at)
+        except ValueError:
+            return self.session_class()
+
+    def save_session(self, app, session, response):
+        try:
+            self._save(app, session, response)
+        except Exception as exc:
+            # The response still goes out; the session keeps its last stored state.
+            self._failed("save", exc)
+
+    def _save(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.sid is not None:
+                response.delete_cookie(name, domain=domain, path=path)
+                self.store.delete(session.sid)
+            return
+        response.vary.add("Cookie")
+        ttl = self._ttl(app, session)
+        encoded = self.serializer.dumps(dict(session))
+        if encoded == session.encoded:
+            # Renewing only past the halfway mark keeps most reads write-free.
+            if session.expires_at is not None and session.expires_at - time.time() < ttl / 2:
+                self.store.touch(session.sid, ttl)
+                session.expires_at = time.time() + ttl
+                if session.permanent:
+                    self._set_cookie(app, session, response)
+            return
+        previous = session.sid
+        if previous is None or session.get(IDENTITY_KEY) != session.identity:
+            session.sid = secrets.token_urlsafe(32)
+        self.store.set(session.sid, encoded, ttl)
+        if previous is not None and previous != session.sid:
+            self.store.delete(previous)
+        session.encoded, session.identity, session.expires_at = encoded, session.get(IDENTITY_KEY), time.time() + ttl
+        if session.sid != previous:
+            self._set_cookie(app, session, response)
+
+    def _set_cookie(self, app, session, response):
+        response.set_cookie(
+            self.get_cookie_name(app),
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=self.get_cookie_domain(app),
+            path=self.get_cookie_path(app),
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+            partitioned=self.get_cookie_partitioned(app),
+        )
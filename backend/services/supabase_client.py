@@ -0,0 +1,14 @@
+from __future__ import annotations
+from services.instrumentation import InstrumentedSupabase
+
+def create(url: str, key: str) -> InstrumentedSupabase:
+    """Build an instrumented Supabase client; the SDK is imported on first use only."""
+    from supabase import create_client
+
+    return InstrumentedSupabase(create_client(url, key))
+
+def create_local(uri: str) -> InstrumentedSupabase:
+    """The in-process data backend (``memory://`` or ``sqlite:///path``) behind the same interface."""
+    from services.local_db import open_database
+
+    return InstrumentedSupabase(open_database(uri), dependency="local_db")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context
+
+MAX_SPANS_PER_TRACE = 500
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+class Span:
+    __slots__ = ("name", "span_id", "start", "end", "attributes", "children")
+
+    def __init__(self, name: str, attributes: dict | None = None):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.start = time.perf_counter()
+        self.end: float | None = None
+        self.attributes = attributes or {}
+        self.children: list[Span] = []
+
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return round((end - self.start) * 1000, 2)
+
+    def to_dict(self, origin: float) -> dict:
+        node = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": self.duration_ms(),
+        }
+        if self.attributes:
+            node["attributes"] = self.attributes
+        if self.children:
+            node["children"] = [child.to_dict(origin) for child in self.children]
+        return node
+
+class Trace:
+    """In-process span tree for one request, kept on ``flask.g``."""
+
+    def __init__(self, name: str, trace_id: str | None = None, parent_span_id: str | None = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.parent_span_id = parent_span_id
+        self.root = Span(name)
+        self.stack = [self.root]
+        self.span_count = 1
+        self.dropped_spans = 0
+
+    def finish(self) -> None:
+        self.root.end = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        tree = {"trace_id": self.trace_id, "root": self.root.to_dict(self.root.start)}
+        if self.parent_span_id:
+            tree["parent_span_id"] = self.parent_span_id
+        if self.dropped_spans:
+            tree["dropped_spans"] = self.dropped_spans
+        return tree
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    if not match or set(match.group(1)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+def start_trace(name: str, traceparent: str | None = None) -> Trace:
+    parent = parse_traceparent(traceparent)
+    trace = Trace(name, *(parent or (None, None)))
+    g.trace = trace
+    return trace
+
+def current_trace() -> Trace | None:
+    if not has_app_context():
+        return None
+    return g.get("trace")
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a child span of the current one; a no-op outside a traced request."""
+    trace = current_trace()
+    if trace is None:
+        yield None
+        return
+    if trace.span_count >= MAX_SPANS_PER_TRACE:
+        trace.dropped_spans += 1
+        yield None
+        return
+    child = Span(name, attributes)
+    trace.stack[-1].children.append(child)
+    trace.stack.append(child)
+    trace.span_count += 1
+    try:
+        yield child
+    finally:
+        child.end = time.perf_counter()
+        trace.stack.pop()
+
+def outbound_headers() -> dict[str, str]:
+    """W3C ``traceparent`` plus ``X-Request-ID`` for the innermost open span."""
+    trace = current_trace()
+    if trace is None:
+        return {}
+    headers = {"traceparent": f"00-{trace.trace_id}-{trace.stack[-1].span_id}-01"}
+    request_id = g.get("request_id")
+    if request_id:
+        headers["X-Request-ID"] = request_id
+    return headers
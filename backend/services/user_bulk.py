@@ -0,0 +1,140 @@
+from __future__ import annotations
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from services.user_listing import USER_ROLES
+
+MAX_BULK_ROWS = 5000
+LOOKUP_CHUNK_SIZE = 200
+WRITE_CHUNK_SIZE = 100
+
+class BulkPayloadError(ValueError):
+    pass
+
+@dataclass
+class BulkPlan:
+    """Rows that passed validation, keyed by email, plus per-row results so far."""
+
+    rows: dict[str, dict] = field(default_factory=dict)
+    results: list[dict] = field(default_factory=list)
+
+    def add_result(self, row_number: int, email: str | None, status: str, **extra) -> None:
+        self.results.append({"row": row_number, "email": email, "status": status, **extra})
+
+    def sorted_results(self) -> list[dict]:
+        return sorted(self.results, key=lambda result: result["row"])
+
+    def summary(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for result in self.results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return counts
+
+def parse_rows(body: bytes | str, content_type: str | None) -> list[dict]:
+    """Read a JSON array (or ``{"users": [...]}``) or a CSV file with a header row."""
+    text = body.decode("utf-8-sig") if isinstance(body, bytes) else body
+    if "csv" in (content_type or "").lower():
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            raise BulkPayloadError("CSV payload needs a header row")
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        rows = [dict(row) for row in reader]
+    else:
+        try:
+            payload = json.loads(text or "null")
+        except ValueError as exc:
+            raise BulkPayloadError("body must be a JSON array or CSV") from exc
+        rows = payload.get("users") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise BulkPayloadError("body must be a JSON array of objects")
+    if not rows:
+        raise BulkPayloadError("no rows supplied")
+    if len(rows) > MAX_BULK_ROWS:
+        raise BulkPayloadError(f"at most {MAX_BULK_ROWS} rows per request")
+    return rows
+
+def _clean(value) -> str:
+    return str(value or "").strip()
+
+def plan_rows(rows: list[dict], require_name: bool) -> BulkPlan:
+    """Validate rows and drop repeated emails; the first occurrence wins."""
+    plan = BulkPlan()
+    for row_number, row in enumerate(rows, start=1):
+        email = _clean(row.get("email")).lower()
+        name = _clean(row.get("name"))
+        role = _clean(row.get("role")).lower() or ("user" if require_name else "")
+        if not email or "@" not in email:
+            plan.add_result(row_number, email or None, "invalid", error="valid email required")
+        elif require_name and not name:
+            plan.add_result(row_number, email, "invalid", error="name required")
+        elif role not in USER_ROLES:
+            plan.add_result(row_number, email, "invalid", error=f"role must be one of {', '.join(sorted(USER_ROLES))}")
+        elif email in plan.rows:
+            plan.add_result(row_number, email, "duplicate", first_row=plan.rows[email]["row"])
+        else:
+            plan.rows[email] = {"row": row_number, "email": email, "name": name, "role": role}
+    return plan
+
+def chunked(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def fetch_existing(client, emails: list[str]) -> dict[str, dict]:
+    """``{email: {"id", "email", "role"}}`` using one ``in`` query per lookup chunk."""
+    existing: dict[str, dict] = {}
+    for chunk in chunked(emails, LOOKUP_CHUNK_SIZE):
+        result = client.table("users").select("id,email,role").in_("email", chunk).execute()
+        for row in result.data or []:
+            existing[str(row.get("email") or "").lower()] = row
+    return existing
+
+def import_users(client, plan: BulkPlan) -> BulkPlan:
+    existing = fetch_existing(client, list(plan.rows))
+    pending = []
+    for email, row in plan.rows.items():
+        if email in existing:
+            plan.add_result(row["row"], email, "exists", id=existing[email].get("id"))
+        else:
+            pending.append(row)
+
+    for chunk in chunked(pending, WRITE_CHUNK_SIZE):
+        payload = [{"name": row["name"], "email": row["email"], "role": row["role"]} for row in chunk]
+        try:
+            inserted = client.table("users").insert(payload).execute().data or []
+        except Exception as exc:
+            for row in chunk:
+                plan.add_result(row["row"], row["email"], "error", error=str(exc))
+            continue
+        ids = {str(item.get("email") or "").lower(): item.get("id") for item in inserted}
+        for row in chunk:
+            if row["email"] in ids:
+                plan.add_result(row["row"], row["email"], "created", id=ids[row["email"]])
+            else:
+                plan.add_result(row["row"], row["email"], "error", error="not returned by insert")
+    return plan
+
+def update_roles(client, plan: BulkPlan) -> BulkPlan:
+    existing = fetch_existing(client, list(plan.rows))
+    by_role: dict[str, list[dict]] = {}
+    for email, row in plan.rows.items():
+        current = existing.get(email)
+        if current is None:
+            plan.add_result(row["row"], email, "not_found")
+        elif (current.get("role") or "user") == row["role"]:
+            plan.add_result(row["row"], email, "unchanged", id=current.get("id"), role=row["role"])
+        else:
+            by_role.setdefault(row["role"], []).append({**row, "id": current.get("id")})
+
+    # One UPDATE ... WHERE id IN (...) per role and chunk.
+    for role, rows in by_role.items():
+        for chunk in chunked(rows, WRITE_CHUNK_SIZE):
+            try:
+                client.table("users").update({"role": role}).in_("id", [row["id"] for row in chunk]).execute()
+            except Exception as exc:
+                for row in chunk:
+                    plan.add_result(row["row"], row["email"], "error", error=str(exc))
+                continue
+            for row in chunk:
+                plan.add_result(row["row"], row["email"], "updated", id=row["id"], role=role)
+    return plan
@@ -0,0 +1,355 @@
+from __future__ import annotations
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable
+
+CHUNK_SIZE = 100
+# Cloudinary's Admin API deletes at most 100 public ids per call.
+MEDIA_DELETE_BATCH = 100
+MEDIA_RESOURCE_TYPES = ("image", "video")
+# Conditional interaction rewrites retried this often before the job fails.
+CAS_ATTEMPTS = 5
+JOBS_TABLE = "cleanup_jobs"
+# A queued or running job whose worker has not reported for this long is taken over.
+STALE_AFTER_SECONDS = float(os.getenv("CLEANUP_JOB_STALE_SECONDS", "300"))
+RESCAN_SECONDS = float(os.getenv("CLEANUP_JOB_RESCAN_SECONDS", "60"))
+
+@dataclass
+class CleanupJob:
+    user_id: int
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"
+    posts_deleted: int = 0
+    media_deleted: int = 0
+    # Media whose Cloudinary delete failed; the ids are listed in media_failures.
+    media_failed: int = 0
+    media_failures: list[str] = field(default_factory=list)
+    interaction_rows_updated: int = 0
+    batches: int = 0
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    heartbeat_at: float | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_row(cls, row: dict) -> "CleanupJob":
+        return cls(**{name: row[name] for name in cls.__dataclass_fields__ if name in row})
+
+def _strip(values, user_id: int) -> list[int]:
+    kept = []
+    for value in values or []:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            continue
+        if value != user_id:
+            kept.append(value)
+    return kept
+
+def delete_posts(client, media_api, job: CleanupJob, on_progress=None) -> None:
+    """Delete the user's posts a chunk at a time, batching their media deletes."""
+    previous_ids = None
+    while True:
+        rows = (
+            client.table("posts")
+            .select("id,media_public_id,media_type")
+            .eq("author_id", job.user_id)
+            .order("id", desc=False)
+            .limit(CHUNK_SIZE)
+            .execute()
+            .data
+            or []
+        )
+        if not rows:
+            return
+        ids = [row["id"] for row in rows]
+        if ids == previous_ids:
+            raise RuntimeError("posts delete made no progress")
+        previous_ids = ids
+        by_type: dict[str, list[str]] = {}
+        for row in rows:
+            if row.get("media_public_id"):
+                by_type.setdefault(row.get("media_type") or "image", []).append(row["media_public_id"])
+        for resource_type, public_ids in by_type.items():
+            for start in range(0, len(public_ids), MEDIA_DELETE_BATCH):
+                batch = public_ids[start:start + MEDIA_DELETE_BATCH]
+                try:
+                    media_api.delete_resources(batch, resource_type=resource_type, invalidate=True)
+                    job.media_deleted += len(batch)
+                except Exception:
+                    # The post rows still go; the ids stay on the job for a manual retry.
+                    job.media_failed += len(batch)
+                    job.media_failures.extend(batch)
+        client.table("posts").delete().in_("id", ids).execute()
+        job.posts_deleted += len(rows)
+        job.batches += 1
+        if on_progress:
+            on_progress(job)
+
+def _same_array(query, column: str, values):
+    """Match rows whose ``column`` still holds exactly the sorted, de-duplicated ``values``."""
+    if values is None:
+        return query.is_(column, "null")
+    return query.contains(column, values).contained_by(column, values)
+
+def _strip_row(client, row: dict, user_id: int) -> bool:
+    """Remove ``user_id`` from one post's arrays with a compare-and-set on both.
+
+    Returns False when the post was deleted meanwhile.
+    """
+    for _ in range(CAS_ATTEMPTS):
+        query = client.table("posts").update(
+            {"liked_by": _strip(row.get("liked_by"), user_id), "viewed_by": _strip(row.get("viewed_by"), user_id)}
+        ).eq("id", row["id"])
+        query = _same_array(_same_array(query, "liked_by", row.get("liked_by")), "viewed_by", row.get("viewed_by"))
+        if query.execute().data:
+            return True
+        rows = client.table("posts").select("id,liked_by,viewed_by").eq("id", row["id"]).limit(1).execute().data or []
+        if not rows:
+            return False
+        row = rows[0]
+    raise RuntimeError(f"post {row['id']} kept changing while removing interactions")
+
+def remove_interactions(client, job: CleanupJob, on_progress=None) -> None:
+    """Strip the user's id from every ``liked_by``/``viewed_by`` array.
+
+    Uses the ``remove_user_interactions`` database function (one UPDATE with
+    ``array_remove``) when it is installed. Otherwise it rewrites matching rows
+    in id order a chunk at a time, one conditional UPDATE per row. The UPDATE
+    only sets the two arrays, so likes and views that land meanwhile are kept.
+    """
+    try:
+        result = client.rpc("remove_user_interactions", {"target_user_id": job.user_id}).execute()
+        job.interaction_rows_updated += int(result.data or 0)
+        job.batches += 1
+        if on_progress:
+            on_progress(job)
+        return
+    except Exception:
+        pass
+
+    for column in ("liked_by", "viewed_by"):
+        last_id = 0
+        while True:
+            rows = (
+                client.table("posts")
+                .select("id,liked_by,viewed_by")
+                .contains(column, [job.user_id])
+                .gt("id", last_id)
+                .order("id", desc=False)
+                .limit(CHUNK_SIZE)
+                .execute()
+                .data
+                or []
+            )
+            if not rows:
+                break
+            job.interaction_rows_updated += sum(_strip_row(client, row, job.user_id) for row in rows)
+            job.batches += 1
+            last_id = rows[-1]["id"]
+            if on_progress:
+                on_progress(job)
+
+def delete_media_folder(client, media_api, job: CleanupJob, media_assets_table: str) -> None:
+    """Remove uploads never attached to a post and the user's dedup index rows."""
+    for resource_type in MEDIA_RESOURCE_TYPES:
+        try:
+            result = media_api.delete_resources_by_prefix(f"college_life/{job.user_id}/", resource_type=resource_type)
+            job.media_deleted += len((result or {}).get("deleted") or {})
+        except Exception:
+            pass
+    try:
+        client.table(media_assets_table).delete().eq("owner", str(job.user_id)).execute()
+    except Exception:
+        pass
+
+def cleanup_user(client, media_api, job: CleanupJob, media_assets_table: str, on_progress=None) -> CleanupJob:
+    # Posts go first so the interaction pass does not rewrite rows about to be deleted.
+    delete_posts(client, media_api, job, on_progress)
+    remove_interactions(client, job, on_progress)
+    delete_media_folder(client, media_api, job, media_assets_table)
+    return job
+
+class JobStore:
+    """Cleanup jobs as rows of ``cleanup_jobs``, so any worker can report or resume them.
+
+    Every save refreshes ``heartbeat_at``. Writes are best effort: a job keeps
+    running in its worker if the table is missing or a save fails.
+    """
+
+    def __init__(self, client: Callable[[], object], table: str = JOBS_TABLE, stale_after: float = STALE_AFTER_SECONDS):
+        self._client = client
+        self.table = table
+        self.stale_after = stale_after
+
+    def create(self, job: CleanupJob) -> None:
+        job.heartbeat_at = time.time()
+        try:
+            self._client().table(self.table).insert(job.to_dict()).execute()
+        except Exception:
+            pass
+
+    def save(self, job: CleanupJob) -> None:
+        job.heartbeat_at = time.time()
+        try:
+            self._client().table(self.table).update(job.to_dict()).eq("job_id", job.job_id).execute()
+        except Exception:
+            pass
+
+    def load(self, job_id: str) -> CleanupJob | None:
+        try:
+            rows = self._client().table(self.table).select("*").eq("job_id", job_id).limit(1).execute().data or []
+        except Exception:
+            return None
+        return CleanupJob.from_row(rows[0]) if rows else None
+
+    def claim_stale(self) -> list[CleanupJob]:
+        """Take over unfinished jobs whose worker stopped reporting.
+
+        The claim is a compare-and-set on ``heartbeat_at``, so one worker wins each job.
+        """
+        now = time.time()
+        try:
+            client = self._client()
+            rows = (
+                client.table(self.table)
+                .select("*")
+                .in_("status", ["queued", "running"])
+                .lt("heartbeat_at", now - self.stale_after)
+                .order("created_at", desc=False)
+                .limit(CHUNK_SIZE)
+                .execute()
+                .data
+                or []
+            )
+        except Exception:
+            return []
+        claimed = []
+        for row in rows:
+            try:
+                won = (
+                    client.table(self.table)
+                    .update({"status": "queued", "heartbeat_at": now})
+                    .eq("job_id", row["job_id"])
+                    .eq("heartbeat_at", row["heartbeat_at"])
+                    .execute()
+                    .data
+                )
+            except Exception:
+                continue
+            if won:
+                claimed.append(CleanupJob.from_row({**row, "status": "queued", "heartbeat_at": now}))
+        return claimed
+
+class CleanupRunner:
+    """Runs cleanup jobs one at a time on a background thread in each process.
+
+    The most recent ``max_jobs`` are kept in memory for progress lookups. With
+    a ``store`` every job is also saved as it starts, progresses and finishes;
+    lookups fall back to it, and ``resume()`` picks up jobs left behind by a
+    worker that was recycled or killed mid-job. Each step of a cleanup only
+    touches what is left, so running a job again is safe.
+    """
+
+    def __init__(self, max_jobs: int = 200, store: JobStore | None = None, rescan_seconds: float = RESCAN_SECONDS):
+        self.max_jobs = max_jobs
+        self.store = store
+        self.rescan_seconds = rescan_seconds
+        self._jobs: OrderedDict[str, tuple[CleanupJob, Future]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+        self._next_scan = 0.0
+        self._scan: Future | None = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-cleanup")
+            self._pid = os.getpid()
+            self._next_scan = 0.0
+        return self._executor
+
+    def _enqueue(self, job: CleanupJob, work: Callable[[CleanupJob], None], on_done: Callable[[CleanupJob], None] | None) -> CleanupJob:
+        def run():
+            job.status = "running"
+            self.checkpoint(job)
+            try:
+                work(job)
+                job.status = "completed"
+            except Exception as exc:
+                job.status = "failed"
+                job.error = str(exc)
+            finally:
+                job.finished_at = time.time()
+                self.checkpoint(job)
+                if on_done:
+                    on_done(job)
+
+        with self._lock:
+            future = self._get_executor().submit(run)
+            self._jobs[job.job_id] = (job, future)
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return job
+
+    def submit(self, user_id: int, work: Callable[[CleanupJob], None], on_done: Callable[[CleanupJob], None] | None = None) -> CleanupJob:
+        job = CleanupJob(user_id=user_id)
+        if self.store is not None:
+            self.store.create(job)
+        return self._enqueue(job, work, on_done)
+
+    def checkpoint(self, job: CleanupJob) -> None:
+        """Save the job's progress, which also tells other workers it is alive."""
+        if self.store is not None:
+            self.store.save(job)
+
+    def resume(self, work: Callable[[CleanupJob], None], on_done: Callable[[CleanupJob], None] | None = None) -> list[CleanupJob]:
+        """Claim stale jobs from the store and queue them here."""
+        if self.store is None:
+            return []
+        return [self._enqueue(job, work, on_done) for job in self.store.claim_stale()]
+
+    def resume_due(self) -> bool:
+        """True at most once per ``rescan_seconds`` in each process, starting with the first call."""
+        if self.store is None or (self._pid == os.getpid() and time.time() < self._next_scan):
+            return False
+        with self._lock:
+            self._get_executor()
+            now = time.time()
+            if now < self._next_scan:
+                return False
+            self._next_scan = now + self.rescan_seconds
+            return True
+
+    def schedule_resume(self, work: Callable[[CleanupJob], None], on_done: Callable[[CleanupJob], None] | None = None) -> None:
+        """Run ``resume()`` on the cleanup thread rather than the caller's."""
+        with self._lock:
+            self._scan = self._get_executor().submit(self.resume, work, on_done)
+
+    def get(self, job_id: str) -> CleanupJob | None:
+        entry = self._jobs.get(job_id)
+        if entry is not None:
+            return entry[0]
+        return self.store.load(job_id) if self.store is not None else None
+
+    def wait(self, job_id: str, timeout: float | None = None) -> CleanupJob | None:
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        entry[1].result(timeout)
+        return entry[0]
+
+    def drain(self, timeout: float | None = None) -> None:
+        """Block until every submitted job, and any jobs a pending rescan resumes, have finished."""
+        if self._scan is not None:
+            self._scan.result(timeout)
+        for _, future in list(self._jobs.values()):
+            future.result(timeout)
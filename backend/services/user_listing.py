@@ -0,0 +1,96 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+
+USER_FIELDS = ("id", "email", "name", "role", "created_at")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+USER_ROLES = frozenset({"user", "admin"})
+# LIKE wildcards and its escape character, matched literally in search terms.
+_LIKE_SPECIAL = re.compile(r"[\\%_]")
+
+@dataclass(frozen=True)
+class UserListQuery:
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: int | None = None
+    fields: tuple[str, ...] = USER_FIELDS
+    email: str | None = None
+    name: str | None = None
+    role: str | None = None
+    include_total: bool = False
+
+    def filter_key(self) -> str:
+        return f"email={self.email or ''}|name={self.name or ''}|role={self.role or ''}"
+
+@dataclass(frozen=True)
+class UserListParseResult:
+    ok: bool
+    query: UserListQuery | None = None
+    error: str | None = None
+
+def _search_term(value: str | None) -> str | None:
+    return (value or "").strip() or None
+
+def _ilike_value(term: str, pattern: str) -> str:
+    """``pattern`` with ``{}`` replaced by ``term`` matched literally, as a quoted PostgREST value.
+
+    PostgREST turns ``*`` into ``%`` even inside quotes, so a literal ``*`` is
+    matched as any single character. The double quotes keep ``,`` and ``()``
+    from being read as list syntax.
+    """
+    like = pattern.format(_LIKE_SPECIAL.sub(r"\\\g<0>", term).replace("*", "_"))
+    return '"' + like.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def parse_user_list_query(args) -> UserListParseResult:
+    """Validate ``limit``, ``cursor``, ``fields``, ``email``, ``name``, ``role`` and ``include_total``."""
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        cursor = int(args["cursor"]) if args.get("cursor") not in (None, "") else None
+    except (TypeError, ValueError):
+        return UserListParseResult(False, error="limit and cursor must be integers")
+    if limit < 1:
+        return UserListParseResult(False, error="limit must be positive")
+
+    fields = USER_FIELDS
+    raw_fields = args.get("fields")
+    if raw_fields:
+        requested = [field.strip() for field in raw_fields.split(",") if field.strip()]
+        unknown = sorted(set(requested) - set(USER_FIELDS))
+        if unknown:
+            return UserListParseResult(False, error=f"unknown fields: {', '.join(unknown)}")
+        # The id is the cursor, so it is always returned.
+        fields = tuple(field for field in USER_FIELDS if field == "id" or field in requested)
+
+    role = (args.get("role") or "").strip().lower() or None
+    if role is not None and role not in USER_ROLES:
+        return UserListParseResult(False, error=f"role must be one of {', '.join(sorted(USER_ROLES))}")
+
+    email = _search_term(args.get("email"))
+    return UserListParseResult(
+        True,
+        UserListQuery(
+            limit=min(limit, MAX_PAGE_SIZE),
+            cursor=cursor,
+            fields=fields,
+            email=email.lower() if email else None,
+            name=_search_term(args.get("name")),
+            role=role,
+            include_total=str(args.get("include_total", "")).lower() in {"1", "true", "yes"},
+        ),
+    )
+
+def apply_filters(builder, query: UserListQuery):
+    # Emails are stored lowercased, so a prefix match can use a text_pattern_ops index.
+    if query.email:
+        builder = builder.ilike("email", _ilike_value(query.email, "{}%"))
+    if query.name:
+        builder = builder.ilike("name", _ilike_value(query.name, "%{}%"))
+    if query.role:
+        builder = builder.eq("role", query.role)
+    return builder
+
+def project_user(row: dict, fields: tuple[str, ...]) -> dict:
+    user = {field: row.get(field) for field in fields}
+    if "role" in user and user["role"] is None:
+        user["role"] = "user"
+    return user
@@ -6,10 +6,12 @@ import sys
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 import pytest
 import main
+from services.local_db import like_regex
 
 class FakeResponse:
-    def __init__(self, data):
+    def __init__(self, data, count=None):
         self.data = data
+        self.count = count
 
 class FakeQuery:
     def __init__(self, store: dict, table: str):
@@ -21,15 +23,51 @@ class FakeQuery:
         self._order = None
         self._update_payload = None
         self._insert_payload = None
+        self._predicates = []
+        self._count = None
+        self._head = False
 
-    def select(self, *_args, **_kwargs):
+    def select(self, *_args, count=None, head=False, **_kwargs):
         self._action = "select"
+        self._count = count
+        self._head = head
         return self
 
     def eq(self, field, value):
         self._filters.append((field, value))
         return self
 
+    def in_(self, field, values):
+        allowed = list(values)
+        self._predicates.append(lambda row: row.get(field) in allowed)
+        return self
+
+    def contains(self, field, values):
+        self._predicates.append(lambda row: all(value in (row.get(field) or []) for value in values))
+        return self
+
+    def gt(self, field, value):
+        self._predicates.append(lambda row: row.get(field) is not None and row.get(field) > value)
+        return self
+
+    def contained_by(self, field, values):
+        allowed = list(values)
+        self._predicates.append(lambda row: row.get(field) is not None and all(value in allowed for value in row.get(field)))
+        return self
+
+    def is_(self, field, value):
+        self._predicates.append(lambda row: row.get(field) is None if value == "null" else row.get(field) is value)
+        return self
+
+    def lt(self, field, value):
+        self._predicates.append(lambda row: row.get(field) is not None and row.get(field) < value)
+        return self
+
+    def ilike(self, field, pattern):
+        regex = like_regex(pattern)
+        self._predicates.append(lambda row: regex.match(str(row.get(field) or "")) is not None)
+        return self
+
     def limit(self, n):
         self._limit = n
         return self
@@ -59,7 +97,7 @@ class FakeQuery:
         for field, value in self._filters:
             if row.get(field) != value:
                 return False
-        return True
+        return all(predicate(row) for predicate in self._predicates)
 
     def execute(self):
         rows = self._rows()
@@ -84,11 +122,12 @@ class FakeQuery:
             field, desc = self._order
             matched = sorted(matched, key=lambda r: r.get(field) or "", reverse=desc)
 
+        total = len(matched)
         if self._limit is not None:
             matched = matched[: self._limit]
 
         if self._action == "select":
-            return FakeResponse(deepcopy(matched))
+            return FakeResponse([] if self._head else deepcopy(matched), total if self._count else None)
 
         if self._action == "update":
             updated = []
@@ -123,6 +162,11 @@ class FakeSupabase:
     def table(self, name):
         return FakeQuery(self.store, name)
 
+@pytest.fixture(autouse=True)
+def _drain_cleanup_jobs():
+    yield
+    main.CLEANUP_RUNNER.get().drain(timeout=10)
+
 @pytest.fixture
 def app():
     main.app.config.update(TESTING=True)
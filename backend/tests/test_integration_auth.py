@@ -25,7 +25,7 @@ def test_happy_path_create_and_fetch_post(client, fake_supabase, auth_as):
         "/api/posts",
         json={
             "caption": "First",
-            "media_public_id": "pub1",
+            "media_public_id": "college_life/1/pub1",
             "media_url": "https://cdn/x.jpg",
             "media_type": "image",
         },
@@ -64,7 +64,7 @@ def test_authenticated_user_can_update_own_data(client, fake_supabase, auth_as):
         "/api/posts",
         json={
             "caption": "Original",
-            "media_public_id": "pub1",
+            "media_public_id": "college_life/1/pub1",
             "media_url": "https://cdn/x.jpg",
             "media_type": "image",
         },
@@ -83,7 +83,7 @@ def test_user_b_cannot_update_user_a_post(client, fake_supabase, auth_as):
         "/api/posts",
         json={
             "caption": "A owns this",
-            "media_public_id": "pub1",
+            "media_public_id": "college_life/1/pub1",
             "media_url": "https://cdn/x.jpg",
             "media_type": "image",
         },
@@ -99,14 +99,14 @@ def test_user_b_cannot_delete_user_a_post(client, fake_supabase, auth_as, monkey
     _seed_user(fake_supabase, 1, "a@school.edu")
     _seed_user(fake_supabase, 2, "b@school.edu")
 
-    monkeypatch.setattr(main.cloudinary.uploader, "destroy", lambda *args, **kwargs: None)
+    monkeypatch.setattr(main.media, "destroy", lambda *args, **kwargs: None)
 
     auth_as("a@school.edu", user_id=1)
     create = client.post(
         "/api/posts",
         json={
             "caption": "A owns this",
-            "media_public_id": "pub1",
+            "media_public_id": "college_life/1/pub1",
             "media_url": "https://cdn/x.jpg",
             "media_type": "image",
         },
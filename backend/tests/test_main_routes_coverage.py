@@ -1,6 +1,10 @@
 from __future__ import annotations
+import gzip
+import json
+import time
 from datetime import datetime
 import main
+from services import instrumentation, live_feed, session_store, user_bulk, user_cleanup
 
 def _seed_user(fake_supabase, user_id, email, role="user", name="User"):
     fake_supabase.table("users").insert(
@@ -116,7 +120,7 @@ def test_create_post_returns_500_when_insert_returns_empty(client, fake_supabase
 
     response = client.post(
         "/api/posts",
-        json={"caption": "c", "media_public_id": "p", "media_url": "https://cdn/x.jpg"},
+        json={"caption": "c", "media_public_id": "college_life/1/p", "media_url": "https://cdn/x.jpg"},
     )
 
     assert response.status_code == 500
@@ -134,7 +138,7 @@ def test_create_post_exception_path(client, fake_supabase, auth_as, monkeypatch)
 
     response = client.post(
         "/api/posts",
-        json={"caption": "c", "media_public_id": "p", "media_url": "https://cdn/x.jpg"},
+        json={"caption": "c", "media_public_id": "college_life/1/p", "media_url": "https://cdn/x.jpg"},
     )
 
     assert response.status_code == 500
@@ -351,11 +355,11 @@ def test_update_post_exception_and_cloudinary_destroy_exception(client, fake_sup
     def destroy_raises(*_a, **_k):
         raise RuntimeError("cloudinary error")
 
-    monkeypatch.setattr(main.cloudinary.uploader, "destroy", destroy_raises)
+    monkeypatch.setattr(main.media, "destroy", destroy_raises)
 
     ok = client.put(
         "/api/posts/1",
-        json={"media_public_id": "new-public", "media_url": "https://cdn/new.jpg", "media_type": "image"},
+        json={"media_public_id": "college_life/1/new-public", "media_url": "https://cdn/new.jpg", "media_type": "image"},
     )
     assert ok.status_code == 200
 
@@ -376,7 +380,7 @@ def test_delete_post_not_found_success_and_exception(client, fake_supabase, auth
     def destroy_raises(*_a, **_k):
         raise RuntimeError("cloudinary error")
 
-    monkeypatch.setattr(main.cloudinary.uploader, "destroy", destroy_raises)
+    monkeypatch.setattr(main.media, "destroy", destroy_raises)
     success = client.delete("/api/posts/1")
     assert success.status_code == 200
 
@@ -399,6 +403,7 @@ def test_users_list_admin_user_and_error(client, fake_supabase, auth_as, monkeyp
     assert user_listing.status_code == 200
     assert len(user_listing.get_json()) == 1
 
+    auth_as("admin@school.edu", role="admin", user_id=1)
     monkeypatch.setattr(main, "ensure_supabase", lambda: (_ for _ in ()).throw(RuntimeError("db")))
     error_listing = client.get("/users")
     assert error_listing.status_code == 500
@@ -560,4 +565,544 @@ def test_create_user_paths(client, fake_supabase, auth_as, monkeypatch):
 
     monkeypatch.setattr(main, "ensure_supabase", lambda: (_ for _ in ()).throw(RuntimeError("db")))
     error_case = client.post("/users", json={"name": "Err", "email": "err@school.edu"})
-    assert error_case.status_code == 500
\ No newline at end of file
+    assert error_case.status_code == 500
+
+def test_duplicate_upload_reuses_asset_and_delete_respects_references(client, fake_supabase, auth_as, monkeypatch):
+    import io
+
+    _seed_user(fake_supabase, 1, "owner@school.edu")
+    auth_as("owner@school.edu", user_id=1)
+
+    uploads = []
+    destroyed = []
+
+    def fake_upload(file, **kwargs):
+        uploads.append(file.read())
+        return {"public_id": "college_life/1/abc", "secure_url": "https://cdn/abc.jpg", "resource_type": "image"}
+
+    monkeypatch.setattr(main, "CLOUDINARY_CONFIGURED", True)
+    monkeypatch.setattr(main.media, "upload", fake_upload)
+    monkeypatch.setattr(main.media, "destroy", lambda public_id, **_k: destroyed.append(public_id))
+
+    first = client.post("/api/media/upload", data={"file": (io.BytesIO(b"same-bytes"), "a.jpg")})
+    second = client.post("/api/media/upload", data={"file": (io.BytesIO(b"same-bytes"), "b.jpg")})
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert uploads == [b"same-bytes"]
+    assert second.get_json()["public_id"] == first.get_json()["public_id"]
+    assert second.get_json()["deduplicated"] is True
+
+    post_ids = []
+    for caption in ("one", "two"):
+        created = client.post(
+            "/api/posts",
+            json={"caption": caption, "media_public_id": "college_life/1/abc", "media_url": "https://cdn/abc.jpg"},
+        )
+        post_ids.append(created.get_json()["id"])
+
+    assert client.delete(f"/api/posts/{post_ids[0]}").status_code == 200
+    assert destroyed == []
+    assert client.delete(f"/api/posts/{post_ids[1]}").status_code == 200
+    assert destroyed == ["college_life/1/abc"]
+    assert fake_supabase.store["media_assets"] == []
+
+    fake_supabase.table("media_assets").insert({"owner": "1", "content_hash": "h", "public_id": "pub-x", "ref_count": 1}).execute()
+    assert client.delete("/api/media/pub-x").status_code == 409
+    assert destroyed == ["college_life/1/abc"]
+    fake_supabase.store["media_assets"][0]["ref_count"] = 0
+    assert client.delete("/api/media/pub-x").status_code == 200
+    assert destroyed == ["college_life/1/abc", "pub-x"] and fake_supabase.store["media_assets"] == []
+
+def test_posts_only_take_own_media_and_release_it_safely(client, fake_supabase, auth_as, monkeypatch):
+    _seed_user(fake_supabase, 1, "owner@school.edu")
+    auth_as("owner@school.edu", user_id=1)
+    destroyed = []
+    monkeypatch.setattr(main.media, "destroy", lambda public_id, **_k: destroyed.append(public_id))
+    for public_id in ("college_life/1/a", "college_life/1/b", "college_life/2/c"):
+        fake_supabase.table("media_assets").insert({"owner": public_id.split("/")[1], "content_hash": public_id, "public_id": public_id, "ref_count": 0}).execute()
+
+    foreign = client.post("/api/posts", json={"caption": "x", "media_public_id": "college_life/2/c", "media_url": "u"})
+    assert foreign.status_code == 403
+    post_id = client.post("/api/posts", json={"caption": "x", "media_public_id": "college_life/1/a", "media_url": "u"}).get_json()["id"]
+    assert client.put(f"/api/posts/{post_id}", json={"media_public_id": "college_life/2/c", "media_url": "u"}).status_code == 403
+    counts = lambda: {row["public_id"]: row["ref_count"] for row in fake_supabase.store["media_assets"]}
+    assert counts() == {"college_life/1/a": 1, "college_life/1/b": 0, "college_life/2/c": 0}
+
+    update = main.repositories.PostRepository.update
+    monkeypatch.setattr(main.repositories.PostRepository, "update", lambda *_a, **_k: None)
+    assert client.put(f"/api/posts/{post_id}", json={"media_public_id": "college_life/1/b", "media_url": "u"}).status_code == 500
+    assert counts()["college_life/1/a"] == 1 and destroyed == []
+    monkeypatch.setattr(main.repositories.PostRepository, "update", update)
+    assert client.put(f"/api/posts/{post_id}", json={"media_public_id": "college_life/1/b", "media_url": "u"}).status_code == 200
+    assert counts() == {"college_life/1/b": 1, "college_life/2/c": 0} and destroyed == ["college_life/1/a"]
+
+    monkeypatch.setattr(main, "release_asset", lambda *_a: (_ for _ in ()).throw(RuntimeError("index down")))
+    assert client.delete(f"/api/posts/{post_id}").status_code == 200
+    assert destroyed == ["college_life/1/a"]
+
+def test_admin_profile_endpoint_requires_admin_and_arms_window(client, fake_supabase, auth_as, monkeypatch, tmp_path):
+    _seed_user(fake_supabase, 1, "admin@school.edu", role="admin")
+    _seed_user(fake_supabase, 2, "user@school.edu", role="user")
+    monkeypatch.setattr(main, "PROFILER", main.ProfilerControl(str(tmp_path)))
+
+    auth_as("user@school.edu", role="user", user_id=2)
+    assert client.post("/admin/profile", json={"path": "/api/posts"}).status_code == 403
+
+    auth_as("admin@school.edu", role="admin", user_id=1)
+    assert client.post("/admin/profile", json={}).status_code == 400
+    for value in ("NaN", "Infinity", "-Infinity", "1e400"):
+        body = '{"path": "/api/posts", "seconds": %s}' % value
+        assert client.post("/admin/profile", data=body, content_type="application/json").status_code == 400
+    assert client.get("/admin/profile").get_json()["armed"] is None
+    armed = client.post("/admin/profile", json={"path": "/api/posts", "requests": 2})
+    assert armed.status_code == 201
+    assert armed.get_json()["armed"]["remaining_requests"] == 2
+
+    assert client.get("/api/posts").status_code == 200
+    assert client.get("/admin/profile").get_json()["armed"]["remaining_requests"] == 1
+
+    assert client.delete("/admin/profile").get_json()["armed"] is None
+    assert client.get("/admin/profile").get_json()["armed"] is None
+
+def test_slow_request_logs_span_tree_and_honours_incoming_traceparent(client, fake_supabase, auth_as, monkeypatch):
+    _seed_user(fake_supabase, 1, "user@school.edu")
+    _seed_post(fake_supabase, 1, 1, "user@school.edu")
+    auth_as("user@school.edu", user_id=1)
+
+    events = []
+    monkeypatch.setattr(main, "TRACE_SLOW_REQUEST_MS", 0)
+    monkeypatch.setattr(main, "_event", lambda event, level="info", **data: events.append((event, data)))
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = client.get("/api/posts", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Trace-ID"] == trace_id
+    slow = [data for event, data in events if event == "slow_request"]
+    assert len(slow) == 1
+    children = [child["name"] for child in slow[0]["trace"]["root"]["children"]]
+    assert children == ["auth.lookup", "serialize"]
+    assert slow[0]["trace"]["parent_span_id"] == "00f067aa0ba902b7"
+
+def test_rate_limits_are_tracked_per_signed_in_user(client, fake_supabase, auth_as):
+    _seed_user(fake_supabase, 1, "first@school.edu")
+    _seed_user(fake_supabase, 2, "second@school.edu")
+    main.limiter.reset()
+
+    auth_as("first@school.edu", user_id=1)
+    statuses = [client.get("/api/yelp").status_code for _ in range(6)]
+    assert statuses[:5] == [400] * 5
+    assert statuses[5] == 429
+
+    auth_as("second@school.edu", user_id=2)
+    assert client.get("/api/yelp").status_code == 400
+
+    limited = main.RATE_LIMIT_DECISIONS.labels(path="/api/yelp", decision="limited")._value.get()
+    assert limited >= 1
+    assert client.get("/health/live").status_code == 200
+    main.limiter.reset()
+
+def test_readiness_probes_use_the_background_health_snapshot(client, monkeypatch):
+    calls = []
+    monitor = main.HealthMonitor(lambda: calls.append("check"), interval_seconds=3600)
+    monkeypatch.setattr(main, "DATABASE_CONFIGURED", True)
+    monkeypatch.setattr(main, "HEALTH_MONITOR", monitor)
+    try:
+        for _ in range(3):
+            response = client.get("/health/ready")
+            assert response.status_code == 200
+            assert response.get_json()["db_check"]["up"] is True
+        assert calls == ["check"]
+
+        monkeypatch.setattr(monitor, "_check", lambda: (_ for _ in ()).throw(RuntimeError("down")))
+        monitor.check_now()
+        assert client.get("/health/ready").status_code == 503
+        assert client.get("/health").get_json()["db"] == "DOWN"
+    finally:
+        monitor.stop()
+
+def test_users_list_paginates_projects_filters_and_counts(client, fake_supabase, auth_as):
+    _seed_user(fake_supabase, 1, "admin@school.edu", role="admin", name="Admin")
+    for user_id in range(2, 8):
+        _seed_user(fake_supabase, user_id, f"student{user_id}@school.edu", name=f"Student {user_id}")
+    auth_as("admin@school.edu", role="admin", user_id=1)
+    main.cache.clear()
+
+    first = client.get("/users?limit=3&fields=email")
+    assert [row["id"] for row in first.get_json()] == [1, 2, 3]
+    assert set(first.get_json()[0]) == {"id", "email"}
+    assert first.headers["X-Next-Cursor"] == "3"
+
+    last = client.get("/users?limit=3&cursor=6")
+    assert [row["id"] for row in last.get_json()] == [7]
+    assert "X-Next-Cursor" not in last.headers
+
+    students = client.get("/users?role=user&name=student&include_total=1&limit=2")
+    assert [row["id"] for row in students.get_json()] == [2, 3]
+    assert students.headers["X-Total-Count"] == "6"
+    assert [row["id"] for row in client.get("/users?email=STUDENT5").get_json()] == [5]
+
+    client.delete("/users/7")
+    assert client.get("/users?role=user&include_total=1").headers["X-Total-Count"] == "5"
+
+    assert client.get("/users?fields=password").status_code == 400
+    assert client.get("/users?limit=abc").status_code == 400
+    assert client.get("/users?role=owner").status_code == 400
+    auth_as("student2@school.edu", user_id=2)
+    assert client.get("/users?limit=abc").status_code == 200
+
+def test_users_search_matches_pattern_characters_literally(client, fake_supabase, auth_as):
+    _seed_user(fake_supabase, 1, "admin@school.edu", role="admin", name="Admin")
+    _seed_user(fake_supabase, 2, "john_doe@school.edu", name="Doe, John (TA)")
+    _seed_user(fake_supabase, 3, "johnxdoe@school.edu", name="100% John")
+    auth_as("admin@school.edu", role="admin", user_id=1)
+
+    assert [row["id"] for row in client.get("/users?email=john_doe").get_json()] == [2]
+    assert [row["id"] for row in client.get("/users?email=john_").get_json()] == [2]
+    assert [row["id"] for row in client.get("/users", query_string={"name": "Doe, John (TA"}).get_json()] == [2]
+    assert [row["id"] for row in client.get("/users", query_string={"name": "100%"}).get_json()] == [3]
+    assert client.get("/users?email=%25").get_json() == []
+
+def test_bulk_user_import_reports_per_row_results_and_batches_queries(client, fake_supabase, auth_as, monkeypatch):
+    _seed_user(fake_supabase, 1, "admin@school.edu", role="admin")
+    auth_as("admin@school.edu", role="admin", user_id=1)
+    monkeypatch.setattr(user_bulk, "WRITE_CHUNK_SIZE", 2)
+    writes = []
+    original_table = fake_supabase.table
+
+    def counting_table(name):
+        query = original_table(name)
+        original_insert = query.insert
+
+        def insert(payload):
+            writes.append(len(payload))
+            return original_insert(payload)
+
+        query.insert = insert
+        return query
+
+    monkeypatch.setattr(fake_supabase, "table", counting_table)
+    csv_body = "Name,Email,Role\nAda,ADA@school.edu,admin\nBob,bob@school.edu,\nAda again,ada@school.edu,user\n,noname@school.edu,user\nAdmin,admin@school.edu,admin\nCy,cy@school.edu,user\n"
+
+    response = client.post("/users/bulk", data=csv_body, content_type="text/csv")
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert [result["status"] for result in payload["results"]] == ["created", "created", "duplicate", "invalid", "exists", "created"]
+    assert payload["summary"] == {"created": 3, "duplicate": 1, "invalid": 1, "exists": 1}
+    assert writes == [2, 1]
+    emails = {row["email"]: row["role"] for row in fake_supabase.store["users"]}
+    assert emails["ada@school.edu"] == "admin" and emails["bob@school.edu"] == "user"
+
+    assert client.post("/users/bulk", json={"users": "nope"}).status_code == 400
+
+def test_user_writes_store_lowercased_emails_that_bulk_import_finds(client, fake_supabase, auth_as):
+    _seed_user(fake_supabase, 1, "admin@school.edu", role="admin")
+    auth_as("admin@school.edu", role="admin", user_id=1)
+
+    created = client.post("/users", json={"name": "Mixed", "email": " Mixed@School.EDU "})
+    assert created.get_json()["email"] == "mixed@school.edu"
+    assert client.post("/users", json={"name": "Again", "email": "MIXED@school.edu"}).status_code == 400
+    _seed_user(fake_supabase, 3, "old@school.edu")
+    renamed = client.put("/users/3", json={"email": "Renamed@School.edu"})
+    assert renamed.get_json()["email"] == "renamed@school.edu"
+
+    response = client.post("/users/bulk", json=[{"name": "M", "email": "mixed@school.edu"}, {"name": "R", "email": "RENAMED@school.edu"}])
+    assert [result["status"] for result in response.get_json()["results"]] == ["exists", "exists"]
+
+def test_bulk_role_update_groups_writes_by_role(client, fake_supabase, auth_as):
+    _seed_user(fake_supabase, 1, "admin@school.edu", role="admin")
+    _seed_user(fake_supabase, 2, "a@school.edu")
+    _seed_user(fake_supabase, 3, "b@school.edu")
+    auth_as("admin@school.edu", role="admin", user_id=1)
+
+    response = client.post(
+        "/users/bulk/roles",
+        json=[
+            {"email": "a@school.edu", "role": "admin"},
+            {"email": "B@school.edu", "role": "admin"},
+            {"email": "admin@school.edu", "role": "admin"},
+            {"email": "ghost@school.edu", "role": "user"},
+            {"email": "a@school.edu", "role": "owner"},
+        ],
+    )
+
+    assert response.status_code == 200
+    statuses = [(result["email"], result["status"]) for result in response.get_json()["results"]]
+    assert statuses == [
+        ("a@school.edu", "updated"),
+        ("b@school.edu", "updated"),
+        ("admin@school.edu", "unchanged"),
+        ("ghost@school.edu", "not_found"),
+        ("a@school.edu", "invalid"),
+    ]
+    assert {row["id"]: row["role"] for row in fake_supabase.store["users"]} == {1: "admin", 2: "admin", 3: "admin"}
+
+    _seed_user(fake_supabase, 4, "c@school.edu")
+    auth_as("c@school.edu", role="user", user_id=4)
+    assert client.post("/users/bulk/roles", json=[{"email": "c@school.edu", "role": "admin"}]).status_code == 403
+
+def test_delete_user_queues_batched_cleanup_of_posts_media_and_interactions(client, fake_supabase, auth_as, monkeypatch):
+    _seed_user(fake_supabase, 1, "admin@school.edu", role="admin")
+    _seed_user(fake_supabase, 2, "leaving@school.edu")
+    for post_id in range(1, 6):
+        _seed_post(fake_supabase, post_id, 2, "leaving@school.edu")
+    _seed_post(fake_supabase, 6, 1, "admin@school.edu")
+    fake_supabase.store["posts"][-1].update({"liked_by": [2, 1], "viewed_by": [2]})
+    fake_supabase.table("media_assets").insert({"owner": "2", "public_id": "pub-1", "ref_count": 1}).execute()
+    monkeypatch.setattr(user_cleanup, "CHUNK_SIZE", 2)
+    deleted_batches, prefixes = [], []
+    monkeypatch.setattr(main.media, "delete_resources", lambda ids, **_k: deleted_batches.append(list(ids)))
+    monkeypatch.setattr(main.media, "delete_resources_by_prefix", lambda prefix, **_k: prefixes.append(prefix) or {"deleted": {}})
+    auth_as("admin@school.edu", role="admin", user_id=1)
+
+    response = client.delete("/users/2")
+
+    assert response.status_code == 200
+    job_id = response.get_json()["cleanup_job"]["job_id"]
+    job = main.CLEANUP_RUNNER.get().wait(job_id, timeout=10)
+    assert job.status == "completed"
+    assert (job.posts_deleted, job.media_deleted, job.interaction_rows_updated) == (5, 5, 1)
+    assert deleted_batches == [["pub-1", "pub-2"], ["pub-3", "pub-4"], ["pub-5"]]
+    assert prefixes == ["college_life/2/", "college_life/2/"]
+    assert [post["id"] for post in fake_supabase.store["posts"]] == [6]
+    assert fake_supabase.store["posts"][0]["liked_by"] == [1]
+    assert fake_supabase.store["posts"][0]["viewed_by"] == []
+    assert fake_supabase.store["media_assets"] == []
+
+    progress = client.get(f"/admin/cleanup-jobs/{job_id}")
+    assert progress.get_json()["status"] == "completed"
+    assert client.get("/admin/cleanup-jobs/missing").status_code == 404
+    assert fake_supabase.store["cleanup_jobs"][0]["status"] == "completed"
+
+def test_cleanup_jobs_left_by_a_stopped_worker_resume_elsewhere(client, fake_supabase, auth_as, monkeypatch):
+    _seed_user(fake_supabase, 1, "admin@school.edu", role="admin")
+    for post_id in range(1, 4):
+        _seed_post(fake_supabase, post_id, 2, "gone@school.edu")
+    monkeypatch.setattr(main.media, "delete_resources", lambda ids, **_k: None)
+    monkeypatch.setattr(main.media, "delete_resources_by_prefix", lambda prefix, **_k: {"deleted": {}})
+    Job = user_cleanup.CleanupJob
+    fake_supabase.table("cleanup_jobs").insert(Job(user_id=2, job_id="left", status="running", posts_deleted=4, heartbeat_at=time.time() - 3600).to_dict()).execute()
+    fake_supabase.table("cleanup_jobs").insert(Job(user_id=3, job_id="alive", status="running", heartbeat_at=time.time()).to_dict()).execute()
+
+    resumed = main.CLEANUP_RUNNER.get().resume(*main._user_cleanup_callbacks(main.app))
+
+    assert [job.job_id for job in resumed] == ["left"]
+    job = main.CLEANUP_RUNNER.get().wait("left", timeout=10)
+    assert (job.status, job.posts_deleted) == ("completed", 7)
+    assert fake_supabase.store["posts"] == []
+    assert main.CLEANUP_RUNNER.get().resume(*main._user_cleanup_callbacks(main.app)) == []
+    main.CLEANUP_RUNNER.get()._jobs.pop("left")
+    auth_as("admin@school.edu", role="admin", user_id=1)
+    assert client.get("/admin/cleanup-jobs/left").get_json()["status"] == "completed"
+    assert client.get("/admin/cleanup-jobs/alive").get_json()["status"] == "running"
+
+def test_routes_run_on_the_local_data_backend(client, monkeypatch, auth_as):
+    db = main.supabase_client.create_local("memory://")
+    monkeypatch.setattr(main, "ensure_supabase", lambda: db)
+    db.table("users").insert({"email": "student@school.edu", "name": "Student", "role": "user"}).execute()
+    auth_as("student@school.edu", user_id=1)
+    main.cache.clear()
+
+    created = client.post("/api/posts", json={"caption": "hi", "media_public_id": "college_life/1/a", "media_url": "https://cdn/a.jpg"})
+    assert created.status_code == 201
+    post_id = created.get_json()["id"]
+    assert client.post(f"/api/posts/{post_id}/like").get_json()["likes"] == 1
+    assert client.post(f"/api/posts/{post_id}/view").status_code == 200
+    feed = client.get("/api/posts").get_json()["posts"]
+    assert feed[0]["id"] == post_id and feed[0]["liked_by_me"] is True
+    assert client.get("/users/me").get_json()["email"] == "student@school.edu"
+
+def test_requests_reuse_loaded_rows_and_export_round_trips(client, fake_supabase, auth_as, monkeypatch):
+    monkeypatch.setattr(main, "ensure_supabase", lambda: instrumentation.InstrumentedSupabase(fake_supabase))
+    _seed_user(fake_supabase, 1, "owner@school.edu")
+    _seed_user(fake_supabase, 2, "other@school.edu")
+    _seed_post(fake_supabase, 1, 1, "owner@school.edu", caption="old")
+
+    def round_trips(method, path, label, **kwargs):
+        metric = main.DB_ROUND_TRIPS.labels(path=label)
+        before = metric._sum.get()
+        response = client.open(path, method=method, **kwargs)
+        return response, metric._sum.get() - before
+
+    auth_as("owner@school.edu", user_id=1)
+    response, trips = round_trips("GET", "/users/1", "/users/<int:user_id>")
+    assert response.get_json()["email"] == "owner@school.edu" and trips == 1
+    response, trips = round_trips("PUT", "/api/posts/1", "/api/posts/<int:post_id>", json={"caption": "new"})
+    assert response.get_json()["caption"] == "new" and trips == 2
+
+    auth_as("other@school.edu", user_id=2)
+    response, trips = round_trips("PUT", "/api/posts/1", "/api/posts/<int:post_id>", json={"caption": "mine"})
+    assert response.status_code == 403 and trips == 3
+    assert client.delete("/api/posts/1").status_code == 403
+    assert client.put("/api/posts/99", json={"caption": "x"}).status_code == 404
+    assert client.delete("/api/posts/99").status_code == 404
+    assert fake_supabase.store["posts"][0]["caption"] == "new"
+
+def test_feed_is_rendered_once_per_version_with_per_user_flags(client, monkeypatch, auth_as):
+    db = main.supabase_client.create_local("memory://")
+    monkeypatch.setattr(main, "ensure_supabase", lambda: db)
+    main.FEED_CACHE.clear()
+    for email in ("a@school.edu", "b@school.edu"):
+        db.table("users").insert({"email": email, "name": email, "role": "user"}).execute()
+    for index in range(3):
+        db.table("posts").insert({"author_id": 1, "caption": f"p{index}", "media_public_id": f"m{index}", "media_url": "u", "liked_by": [2], "viewed_by": [1, 2]}).execute()
+    builds = []
+    build_snapshot = main.feed.build_snapshot
+    monkeypatch.setattr(main.feed, "build_snapshot", lambda *args: builds.append(args[0]) or build_snapshot(*args))
+
+    auth_as("a@school.edu", user_id=1)
+    first = client.get("/api/posts").get_json()["posts"]
+    auth_as("b@school.edu", user_id=2)
+    second = client.get("/api/posts").get_json()["posts"]
+    assert len(builds) == 1
+    assert [post["caption"] for post in first] == ["p2", "p1", "p0"]
+    assert [(post["liked_by_me"], post["viewed_by_me"]) for post in first] == [(False, True)] * 3
+    assert [(post["liked_by_me"], post["viewed_by_me"]) for post in second] == [(True, True)] * 3
+    rows = db.table("posts").select("*").order("created_at", desc=True).execute().data
+    assert second == [main.serialize_post(row, 2) for row in rows]
+
+    assert client.post(f"/api/posts/{first[0]['id']}/like").get_json()["likes"] == 0
+    refreshed = client.get("/api/posts").get_json()["posts"]
+    assert len(builds) == 2 and refreshed[0]["liked_by_me"] is False and refreshed[1]["liked_by_me"] is True
+    db.table("posts").delete().eq("id", first[2]["id"]).execute()
+    assert len(client.get("/api/posts").get_json()["posts"]) == 2 and len(builds) == 3
+
+def test_feed_and_profile_answer_conditional_gets_with_304(client, monkeypatch, auth_as):
+    db = main.supabase_client.create_local("memory://")
+    monkeypatch.setattr(main, "ensure_supabase", lambda: db)
+    main.FEED_CACHE.clear()
+    for email in ("a@school.edu", "b@school.edu"):
+        db.table("users").insert({"email": email, "name": email, "role": "user"}).execute()
+    post = db.table("posts").insert({"author_id": 1, "caption": "hi", "media_public_id": "m", "media_url": "u"}).execute().data[0]
+    trips = main.DB_ROUND_TRIPS.labels(path="/api/posts")
+
+    auth_as("a@school.edu", user_id=1)
+    first = client.get("/api/posts")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+    before = trips._sum.get()
+    cached = client.get("/api/posts", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.data == b"" and cached.headers["ETag"] == etag
+    assert trips._sum.get() - before == 2  # the session user and the feed version
+
+    auth_as("b@school.edu", user_id=2)
+    assert client.get("/api/posts", headers={"If-None-Match": etag}).status_code == 200
+    auth_as("a@school.edu", user_id=1)
+    client.post(f"/api/posts/{post['id']}/like")
+    changed = client.get("/api/posts", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.get_json()["posts"][0]["liked_by_me"] is True
+
+    me = client.get("/users/me")
+    assert client.get("/users/me", headers={"If-None-Match": me.headers["ETag"]}).status_code == 304
+    assert client.get("/users/1", headers={"If-None-Match": me.headers["ETag"]}).status_code == 304
+    assert client.put("/users/1", json={"name": "Renamed"}).status_code == 200
+    renamed = client.get("/users/me", headers={"If-None-Match": me.headers["ETag"]})
+    assert renamed.status_code == 200 and renamed.get_json()["name"] == "Renamed"
+
+def test_feed_is_gzipped_when_large_and_revalidates_with_the_encoded_etag(client, monkeypatch, auth_as):
+    db = main.supabase_client.create_local("memory://")
+    monkeypatch.setattr(main, "ensure_supabase", lambda: db)
+    main.FEED_CACHE.clear()
+    db.table("users").insert({"email": "a@school.edu", "name": "A", "role": "user"}).execute()
+    for index in range(30):
+        db.table("posts").insert({"author_id": 1, "caption": f"caption {index}", "media_public_id": f"m{index}", "media_url": "u"}).execute()
+    auth_as("a@school.edu", user_id=1)
+
+    plain = client.get("/api/posts")
+    assert "Content-Encoding" not in plain.headers
+    response = client.get("/api/posts", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip" and "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+    assert response.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    cached = client.get("/api/posts", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304 and cached.headers["ETag"] == response.headers["ETag"]
+
+def test_live_feed_stream_pushes_post_events_and_coalesced_counters(client, monkeypatch, auth_as):
+    db = main.supabase_client.create_local("memory://")
+    monkeypatch.setattr(main, "ensure_supabase", lambda: db)
+    hub = live_feed.LiveFeed(flush_seconds=3600, max_streams=1)
+    monkeypatch.setattr(main, "LIVE_FEED", main.ProcessLocal(lambda: hub))
+    db.table("users").insert({"email": "a@school.edu", "name": "A", "role": "user"}).execute()
+    auth_as("a@school.edu", user_id=1)
+
+    stream = client.get("/api/posts/stream", buffered=False)
+    assert stream.status_code == 200 and stream.mimetype == "text/event-stream"
+    assert client.get("/api/posts/stream").status_code == 503
+    chunks = iter(stream.response)
+    assert next(chunks).startswith(b"retry: 3000\nid: ")
+
+    post_id = client.post("/api/posts", json={"caption": "hi", "media_public_id": "college_life/1/m", "media_url": "u"}).get_json()["id"]
+    client.post(f"/api/posts/{post_id}/like")
+    client.post(f"/api/posts/{post_id}/like")
+    client.post(f"/api/posts/{post_id}/view")
+    client.put(f"/api/posts/{post_id}", json={"caption": "edited"})
+    hub.flush()
+    client.delete(f"/api/posts/{post_id}")
+
+    events = [block.split("\n") for block in next(chunks).decode().strip().split("\n\n")]
+    assert [lines[0] for lines in events] == ["event: post-created", "event: post-updated", "event: counters", "event: post-deleted"]
+    assert json.loads(events[0][1][len("data: "):])["caption"] == "hi"
+    assert json.loads(events[2][1][len("data: "):]) == {"posts": [{"id": post_id, "likes": 0, "views": 1}]}
+    stream.close()
+    assert hub.streams == 0
+
+    reconnected = client.get("/api/posts/stream", headers={"Last-Event-ID": "1"}, buffered=False)
+    chunks = iter(reconnected.response)
+    next(chunks)
+    assert next(chunks) == b"event: resync\ndata: {}\n\n"
+    reconnected.close()
+
+def test_server_side_sessions_keep_the_cookie_opaque_and_skip_unchanged_writes(client, fake_supabase, monkeypatch, auth_as):
+    store = session_store.MemoryStore()
+    writes = []
+    store_set = store.set
+    monkeypatch.setattr(store, "set", lambda sid, data, ttl: writes.append(sid) or store_set(sid, data, ttl))
+    lookups = main.SESSION_LOOKUP_LATENCY.labels(store="memory")
+    interface = session_store.ServerSideSessionInterface(store, lookups.observe)
+    monkeypatch.setattr(main.app, "session_interface", interface)
+    _seed_user(fake_supabase, 1, "owner@school.edu")
+
+    auth_as("owner@school.edu", user_id=1)
+    sid = client.get_cookie("college_session").value
+    assert len(sid) < 64 and "owner" not in sid and writes == [sid]
+    before = lookups._sum.get()
+    assert client.get("/users/me").get_json()["email"] == "owner@school.edu"
+    assert client.get("/users/me").status_code == 200
+    assert writes == [sid] and lookups._sum.get() > before
+
+    auth_as("other@school.edu", user_id=2)
+    rotated = client.get_cookie("college_session").value
+    assert rotated != sid and store.get(sid) is None and store.get(rotated) is not None
+    client.get("/auth/logout")
+    assert store.get(rotated) is None and client.get_cookie("college_session") is None
+    assert client.get("/users/me").status_code == 401
+
+def test_server_side_sessions_slide_their_expiry_and_survive_store_errors(client, fake_supabase, monkeypatch, auth_as):
+    store = session_store.MemoryStore()
+    failures = []
+    interface = session_store.ServerSideSessionInterface(store, on_error=lambda operation, exc: failures.append(operation), transient_seconds=100)
+    monkeypatch.setattr(main.app, "session_interface", interface)
+    _seed_user(fake_supabase, 1, "owner@school.edu")
+
+    auth_as("owner@school.edu", user_id=1)
+    sid = client.get_cookie("college_session").value
+    data, expires_at = store.load(sid)
+    assert expires_at - time.time() <= 100
+    store.set(sid, data, ttl=60)
+    assert client.get("/users/me").status_code == 200
+    assert store.load(sid)[1] - time.time() <= 60
+    store.set(sid, data, ttl=40)
+    assert client.get("/users/me").status_code == 200
+    assert store.load(sid)[1] - time.time() > 90
+
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("store down")
+
+    monkeypatch.setattr(store, "load", unreachable)
+    monkeypatch.setattr(store, "set", unreachable)
+    assert client.get("/health/live").status_code == 200
+    assert client.get("/users/me").status_code == 401
+    auth_as("owner@school.edu", user_id=1)
+    assert failures.count("load") >= 2 and "save" in failures
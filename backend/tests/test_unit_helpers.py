@@ -1,5 +1,15 @@
+import gzip
+import json
+import logging
+import os
+import pickle
+import runpy
+import time
 import main
-from services import post_rules
+import pytest
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+from services import compression, feed, health, instrumentation, json_provider, live_feed, local_db, log_pipeline, media_assets, metrics, post_rules, process_local, profiler, rate_limit, repositories, session_store, user_cleanup
 
 def test_normalize_origin_accepts_http_and_https():
     assert main._normalize_origin("http://localhost:5173/path") == "http://localhost:5173"
@@ -16,8 +26,8 @@ def test_is_allowed_frontend_origin_allows_localhost_hosts():
 def test_is_allowed_frontend_origin_rejects_unknown_remote_origin():
     assert main.is_allowed_frontend_origin("https://malicious.example.com") is False
 
-def test_ids_as_ints_filters_invalid_values():
-    assert main._ids_as_ints(["1", 2, "bad", None, 3]) == [1, 2, 3]
+def test_normalize_id_list_filters_invalid_values():
+    assert post_rules.normalize_id_list(["1", 2, "bad", None, 3]) == [1, 2, 3]
 
 def test_normalize_user_falls_back_to_user_id_field():
     normalized = main.normalize_user({"user_id": 99, "email": "a@a.edu", "role": "user"})
@@ -59,4 +69,552 @@ def test_post_rule_validate_create_payload_happy_and_error():
 def test_post_rule_can_user_modify_post_admin_and_owner_rules():
     assert post_rules.can_user_modify_post(current_user_id=1, row_author_id=2, role="admin") is True
     assert post_rules.can_user_modify_post(current_user_id=1, row_author_id=1, role="user") is True
-    assert post_rules.can_user_modify_post(current_user_id=1, row_author_id=2, role="user") is False
\ No newline at end of file
+    assert post_rules.can_user_modify_post(current_user_id=1, row_author_id=2, role="user") is False
+
+def test_log_pipeline_parses_sample_rates_and_samples():
+    rates = log_pipeline.parse_sample_rates("http_request=0.25, user_login=2,bad=x,=1")
+    assert rates == {"http_request": 0.25, "user_login": 1.0}
+
+    sampler = log_pipeline.EventSampler(rates, rng=lambda: 0.5)
+    assert sampler.should_log("http_request") is False
+    assert sampler.should_log("user_login") is True
+    assert sampler.should_log("unconfigured") is True
+
+def test_log_pipeline_drops_records_when_queue_is_full():
+    dropped = []
+    handler = log_pipeline.AsyncQueueHandler(logging.NullHandler(), maxsize=1, on_drop=lambda: dropped.append(1))
+    handler._pid = os.getpid()
+    record = logging.LogRecord("college_life", logging.INFO, __file__, 1, {"event": "x"}, None, None)
+
+    handler.enqueue(record)
+    handler.enqueue(record)
+
+    assert len(dropped) == 1
+    assert '"event": "x"' in log_pipeline.JsonEventFormatter().format(record)
+
+def test_instrumented_query_tracks_table_action_and_errors(app):
+    class Builder:
+        def __init__(self, fail=False):
+            self.fail = fail
+
+        def update(self, _payload):
+            return self
+
+        def eq(self, *_a):
+            return self
+
+        def execute(self):
+            if self.fail:
+                raise RuntimeError("boom")
+            return "ok"
+
+    class Client:
+        def __init__(self, fail=False):
+            self.fail = fail
+
+        def table(self, _name):
+            return Builder(self.fail)
+
+    errors = instrumentation.DEPENDENCY_ERRORS.labels(dependency="supabase", operation="posts.update")
+    before = errors._value.get()
+
+    with app.test_request_context("/"):
+        assert instrumentation.InstrumentedSupabase(Client()).table("posts").update({}).eq("id", 1).execute() == "ok"
+        try:
+            instrumentation.InstrumentedSupabase(Client(fail=True)).table("posts").update({}).execute()
+        except RuntimeError:
+            pass
+        breakdown = instrumentation.request_breakdown()
+
+    assert errors._value.get() == before + 1
+    assert breakdown["supabase"]["calls"] == 2
+    assert breakdown["supabase"]["errors"] == 1
+
+def test_metrics_compaction_folds_dead_worker_files_into_archive(tmp_path):
+    from prometheus_client import CollectorRegistry, generate_latest
+    from prometheus_client.mmap_dict import MmapedDict, mmap_key
+    from prometheus_client.multiprocess import MultiProcessCollector
+
+    key = mmap_key("jobs_total", "jobs_total", [], [], "Jobs")
+    for pid, value in ((101, 2.0), (102, 3.0), (103, 4.0)):
+        mmap = MmapedDict(str(tmp_path / f"counter_{pid}.db"))
+        mmap.write_value(key, value, 0.0)
+        mmap.close()
+
+    metrics.compact_worker_files(101, path=str(tmp_path))
+    metrics.compact_worker_files(102, path=str(tmp_path))
+
+    assert sorted(p.name for p in tmp_path.glob("*.db")) == ["counter_103.db", "counter_archive.db"]
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=str(tmp_path))
+    assert b"jobs_total 9.0" in generate_latest(registry)
+
+def test_profiler_profiles_only_armed_path_and_writes_folded_stacks(tmp_path):
+    import time
+
+    control = profiler.ProfilerControl(str(tmp_path))
+    assert control.maybe_start(("/api/posts",), "req") is None
+
+    control.arm("/api/posts", requests=1, interval_ms=1)
+    assert control.maybe_start(("/users",), "req") is None
+
+    sampler = control.maybe_start(("/api/posts",), "../req id")
+    time.sleep(0.05)
+    output_path = sampler.stop()
+
+    assert control.status() is None
+    assert os.path.dirname(output_path) == str(tmp_path)
+    with open(output_path, encoding="utf-8") as handle:
+        lines = handle.read().splitlines()
+    assert any("test_profiler_profiles_only_armed_path" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+def test_import_main_defers_integration_sdks():
+    import json
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    backend_dir = Path(main.__file__).resolve().parent
+    deferred = json.loads((backend_dir / "benchmarks" / "import_budget.json").read_text())["deferred_modules"]
+    probe = "import json, sys, main; print(json.dumps(sorted(sys.modules)))"
+    completed = subprocess.run([sys.executable, "-c", probe], cwd=backend_dir, capture_output=True, text=True, check=True)
+    loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert [name for name in deferred if name in loaded] == []
+
+def test_sqlite_rate_limit_storage_shares_sliding_window_between_workers(tmp_path):
+    from limits import parse
+    from limits.storage import storage_from_string
+    from limits.strategies import SlidingWindowCounterRateLimiter
+
+    uri = f"sqlite://{tmp_path / 'ratelimit.db'}"
+    worker_a = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    worker_b = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    limit = parse("3 per minute")
+
+    assert worker_a.hit(limit, "user:1")
+    assert worker_b.hit(limit, "user:1")
+    assert worker_a.hit(limit, "user:1")
+    assert not worker_b.hit(limit, "user:1")
+    assert worker_b.hit(limit, "user:2")
+    assert worker_a.get_window_stats(limit, "user:1").remaining == 0
+
+    worker_b.clear(limit, "user:1")
+    assert worker_a.hit(limit, "user:1")
+
+def test_rate_limit_key_prefers_session_user_over_client_ip():
+    with main.app.test_request_context("/", environ_base={"REMOTE_ADDR": "10.0.0.7"}):
+        assert rate_limit.rate_limit_key() == "ip:10.0.0.7"
+        main.session["user"] = "Student@Example.com"
+        assert rate_limit.rate_limit_key() == "user:student@example.com"
+        main.session["user_id"] = 42
+        assert rate_limit.rate_limit_key() == "user:42"
+
+def test_fast_json_provider_matches_stdlib_output_and_falls_back():
+    from datetime import datetime
+    from decimal import Decimal
+    from flask import Flask
+
+    app = Flask(__name__)
+    fast = json_provider.FastJSONProvider(app)
+    stdlib = json_provider.FastJSONProvider(app)
+    stdlib.backend = "json"
+    payload = {"b": [1, 2.5, None, True], "a": "caf\u00e9", "when": datetime(2026, 1, 2, 3, 4, 5), "price": Decimal("1.50")}
+
+    with app.app_context():
+        assert fast.loads(fast.response(payload).get_data()) == stdlib.loads(stdlib.response(payload).get_data())
+        assert fast.response(payload).get_data().endswith(b"\n")
+        assert list(fast.loads(fast.dumps(payload))) == ["a", "b", "price", "when"]
+        assert fast.loads(fast.response({"big": 2**70}).get_data()) == {"big": 2**70}
+        assert fast.loads(b'{"a": 123456789012345678901234567890}') == {"a": 123456789012345678901234567890}
+        assert fast.loads('[-123456789012345678901]') == [-123456789012345678901]
+        assert str(fast.loads("[NaN, Infinity]")) == "[nan, inf]"
+        with pytest.raises(json.JSONDecodeError):
+            fast.loads("{not json")
+
+    assert json_provider.resolve_backend("json") == "json"
+    assert json_provider.dumps({"at": Decimal("2")}, default=lambda value: "x") == '{"at":"x"}'
+    assert json_provider.dumps({"n": 2**70}) == '{"n":1180591620717411303424}'
+
+def test_health_monitor_serves_cached_state_and_marks_stale_results_down():
+    now = [1000.0]
+    calls = []
+
+    def check():
+        calls.append(now[0])
+        if len(calls) > 1:
+            raise ConnectionError("db down")
+
+    monitor = health.HealthMonitor(check, interval_seconds=3600, stale_after_seconds=30, clock=lambda: now[0])
+    try:
+        first = monitor.status()
+        assert first["up"] is True and first["age_seconds"] == 0 and first["stale"] is False
+        now[0] += 10
+        assert monitor.status()["age_seconds"] == 10
+        assert len(calls) == 1
+
+        assert monitor.check_now()["error"] == "ConnectionError"
+        assert monitor.status()["up"] is False
+
+        now[0] += 31
+        stale = monitor.status()
+        assert stale["stale"] is True and stale["up"] is False
+    finally:
+        monitor.stop()
+
+def test_route_benchmark_runs_on_a_tiny_dataset_and_flags_regressions():
+    from benchmarks import routes
+
+    report = routes.run(routes.Dataset(posts=20, users=10, likes_per_post=3), iterations=2, max_seconds=1, only={"feed", "users_me"})
+
+    assert set(report["results"]) == {"feed", "users_me"}
+    assert report["results"]["feed"]["statuses"] == [200]
+    assert routes.percentile([1, 2, 3, 4, 100], 99) == 100
+    slower = {"results": {"feed": {"p50_ms": report["results"]["feed"]["p50_ms"] * 3 + 1}}}
+    assert routes.compare(slower, report, max_regression=0.5) == ["feed"]
+    assert routes.compare(report, report, max_regression=0.5) == []
+
+def test_postgrest_stub_serves_the_queries_the_supabase_client_makes():
+    from benchmarks.load_stubs import Faults, PostgrestStub
+
+    assert Faults.parse("latency_ms=5,error_rate=0.5,error_status=500,bogus=1") == Faults(latency_ms=5.0, error_rate=0.5, error_status=500)
+    stub = PostgrestStub().start()
+    try:
+        stub.seed_table("users", [{"id": 1, "email": "a@school.edu", "role": "user"}, {"id": 2, "email": "b@school.edu", "role": "admin"}])
+        client = instrumentation.InstrumentedSupabase(__import__("supabase").create_client(stub.url, "stub-key"))
+
+        admins = client.table("users").select("id,email").eq("role", "admin").execute()
+        assert admins.data == [{"id": 2, "email": "b@school.edu"}]
+        inserted = client.table("users").insert({"email": "c@school.edu", "role": "user"}).execute()
+        assert inserted.data[0]["id"] == 3
+        client.table("users").update({"role": "admin"}).in_("id", [1, 3]).execute()
+        counted = client.table("users").select("id", count="exact").eq("role", "admin").gt("id", 1).execute()
+        assert counted.count == 2
+        assert [row["id"] for row in client.table("users").select("*").order("id", desc=True).limit(2).execute().data] == [3, 2]
+    finally:
+        stub.stop()
+
+def test_local_db_queries_use_indexes_and_never_leak_mutations():
+    from services.local_db import LocalDatabase, LocalDatabaseError
+
+    db = LocalDatabase()
+    db.load("posts", [{"id": n, "author_id": n % 3, "created_at": f"2026-01-{n:02d}", "liked_by": [n]} for n in range(1, 11)])
+
+    newest = db.table("posts").select("id").order("created_at", desc=True).limit(3).execute()
+    assert newest.data == [{"id": 10}, {"id": 9}, {"id": 8}]
+    page = db.table("posts").select("id", count="exact").gt("id", 4).order("id").limit(2).execute()
+    assert page.data == [{"id": 5}, {"id": 6}] and page.count == 6
+    assert [row["id"] for row in db.table("posts").select("*").eq("author_id", 1).execute().data] == [1, 4, 7, 10]
+    assert [row["id"] for row in db.table("posts").select("id").in_("id", [3, 99, 2]).execute().data] == [3, 2]
+    assert db.table("posts").select("id").contains("liked_by", [5]).execute().data == [{"id": 5}]
+
+    row = db.table("posts").select("*").eq("id", 1).execute().data[0]
+    row["caption"] = "changed"
+    liked_by = [1, 2]
+    db.table("posts").update({"liked_by": liked_by}).eq("id", 1).execute()
+    liked_by.append(3)
+    stored = db.table("posts").select("*").eq("id", 1).execute().data[0]
+    assert stored["liked_by"] == [1, 2] and "caption" not in stored
+
+    inserted = db.table("posts").insert({"author_id": 1}).execute().data[0]
+    assert inserted["id"] == 11 and inserted["created_at"]
+    with pytest.raises(LocalDatabaseError):
+        db.table("posts").insert({"id": 11}).execute()
+    assert len(db.table("posts").delete().eq("author_id", 1).execute().data) == 5
+    assert db.table("posts").select("id", count="exact", head=True).execute().count == 6
+    with pytest.raises(LocalDatabaseError):
+        db.rpc("remove_user_interactions", {"target_user_id": 1}).execute()
+
+def test_local_db_persists_to_sqlite_and_replays_other_connections(tmp_path):
+    from services.local_db import LocalDatabase, open_database
+
+    path = str(tmp_path / "local.db")
+    first = open_database(f"sqlite:///{path}")
+    first.load("users", [{"id": 1, "email": "a@school.edu"}])
+    second = LocalDatabase(path)
+    assert second.table("users").select("email").execute().data == [{"email": "a@school.edu"}]
+
+    first.table("users").insert({"email": "b@school.edu"}).execute()
+    first.table("users").update({"role": "admin"}).eq("id", 1).execute()
+    second.table("users").delete().eq("email", "b@school.edu").execute()
+    assert [row["role"] for row in second.table("users").select("*").execute().data] == ["admin"]
+    assert first.table("users").select("id").execute().data == [{"id": 1}]
+
+    first.load("users", [{"id": 5, "email": "c@school.edu"}])
+    assert second.table("users").select("id").eq("email", "c@school.edu").execute().data == [{"id": 5}]
+    assert LocalDatabase(path).table("users").select("id").execute().data == [{"id": 5}]
+    with pytest.raises(ValueError):
+        open_database("postgres://nope")
+
+def test_repositories_keep_an_identity_map_and_batch_lookups():
+    from services.local_db import LocalDatabase
+
+    db = LocalDatabase()
+    db.load("users", [{"id": n, "email": f"u{n}@school.edu"} for n in range(1, 6)])
+    queries = []
+
+    class CountingClient:
+        def table(self, name):
+            queries.append(name)
+            return db.table(name)
+
+    users = repositories.Repositories(CountingClient()).users
+    assert users.get_by_email("u1@school.edu")["id"] == 1
+    assert users.get(1)["email"] == "u1@school.edu"
+    assert users.get(42) is None and users.get(42) is None
+    assert len(queries) == 2
+
+    found = users.get_many([1, 2, 3, 2, 42, None])
+    assert sorted(found) == [1, 2, 3] and len(queries) == 3
+    assert users.get_many([3, 2]) == {3: found[3], 2: found[2]} and len(queries) == 3
+
+    assert users.update(2, {"email": "new@school.edu"})["email"] == "new@school.edu"
+    assert users.get_by_email("new@school.edu")["id"] == 2 and len(queries) == 4
+    assert users.update(2, {"role": "admin"}, email="wrong@school.edu") is None
+    assert users.delete(3)["id"] == 3
+    assert users.get(3) is None and len(queries) == 7
+
+def test_interaction_set_parses_compactly_and_memoizes_per_version(monkeypatch):
+    ids = post_rules.InteractionSet.from_values(["3", 1, "bad", None, 3, 2**70, 2])
+    assert ids.to_list() == [1, 2, 3] and len(ids) == 3
+    assert 2 in ids and 4 not in ids and None not in ids
+    assert post_rules.InteractionSet.from_values([5, 1, 5]).to_list() == [1, 5]
+
+    added, was_added = ids.toggle(4)
+    assert was_added and added.to_list() == [1, 2, 3, 4] and ids.to_list() == [1, 2, 3]
+    removed, was_added = added.toggle(2)
+    assert not was_added and removed.to_list() == [1, 3, 4]
+    assert ids.add(2) is ids and ids.discard(9) is ids
+    assert ids.merge(post_rules.InteractionSet.from_values([0, 3, 7])).to_list() == [0, 1, 2, 3, 7]
+
+    monkeypatch.setattr(post_rules, "_versioned", None)
+    row = {"id": 1, "updated_at": "v1", "liked_by": [1, 2]}
+    first = post_rules.interactions(row, "liked_by")
+    assert post_rules.interactions({**row, "liked_by": [9]}, "liked_by").to_list() == [9]
+    post_rules.observe_post_write({"updated_at": "v0"}, row)
+    first = post_rules.interactions(row, "liked_by")
+    assert post_rules.interactions({**row, "liked_by": [9]}, "liked_by") is first
+    assert post_rules.interactions({**row, "updated_at": "v2", "liked_by": [9]}, "liked_by").to_list() == [9]
+    assert post_rules.interactions({"id": 1, "liked_by": [4]}, "liked_by").to_list() == [4]
+
+    # Without the trigger a write leaves updated_at alone, and the memo stays off from then on.
+    post_rules.observe_post_write(row, {**row, "liked_by": [9]})
+    assert post_rules.interactions({**row, "liked_by": [9]}, "liked_by").to_list() == [9]
+    post_rules.observe_post_write({"updated_at": "v0"}, row)
+    assert post_rules.interactions({**row, "liked_by": [7]}, "liked_by").to_list() == [7]
+
+def test_local_db_bumps_post_versions_on_every_write():
+    from services.local_db import LocalDatabase
+
+    db = LocalDatabase()
+    inserted = db.table("posts").insert({"liked_by": []}).execute().data[0]
+    assert inserted["updated_at"] == inserted["created_at"]
+    versions = {inserted["updated_at"]}
+    for n in range(5):
+        versions.add(db.table("posts").update({"liked_by": [n]}).eq("id", inserted["id"]).execute().data[0]["updated_at"])
+    assert len(versions) == 6
+    assert "updated_at" not in db.table("users").insert({"email": "a@school.edu"}).execute().data[0]
+
+def test_local_db_feed_version_counts_post_writes_across_processes(tmp_path):
+    path = str(tmp_path / "local.db")
+    writer, reader = local_db.LocalDatabase(path), local_db.LocalDatabase(path)
+    posts = repositories.PostRepository(reader)
+    assert posts.feed_version() is None
+    writer.load("posts", [{"id": 1, "liked_by": []}])
+    assert posts.feed_version() == 1
+    writer.table("posts").update({"liked_by": [1]}).eq("id", 1).execute()
+    writer.table("posts").update({"liked_by": [2]}).eq("id", 99).execute()
+    writer.table("posts").update({"viewed_by": [1]}).eq("id", 1).execute()
+    writer.table("posts").update({"liked_by": [1]}).eq("id", 1).execute()
+    writer.table("users").insert({"email": "a@school.edu"}).execute()
+    assert posts.feed_version() == 2
+    writer.table("posts").delete().eq("id", 1).execute()
+    assert posts.feed_version() == 3
+
+def test_cleanup_runner_rescans_once_per_interval():
+    runner = user_cleanup.CleanupRunner(store=user_cleanup.JobStore(lambda: local_db.LocalDatabase()), rescan_seconds=60)
+    assert runner.resume_due() is True
+    assert runner.resume_due() is False
+    assert user_cleanup.CleanupRunner().resume_due() is False
+
+def test_feed_snapshot_overlays_flags_and_cache_builds_once_per_version():
+    rows = [({"id": 1}, [5], []), ({"id": 2}, [], [5, 6])]
+    snapshot = feed.build_snapshot("v1", rows, lambda row: row, lambda post: json.dumps(post, separators=(",", ":")).encode())
+    assert json.loads(snapshot.render(None))["posts"] == [
+        {"id": 1, "liked_by_me": False, "viewed_by_me": False},
+        {"id": 2, "liked_by_me": False, "viewed_by_me": False},
+    ]
+    mine = json.loads(snapshot.render(5))["posts"]
+    assert [(post["liked_by_me"], post["viewed_by_me"]) for post in mine] == [(True, False), (False, True)]
+    assert len(snapshot) == 2
+
+    cache, builds = feed.FeedCache(), []
+
+    def build(version):
+        return lambda: builds.append(version) or feed.FeedSnapshot(version, [], [], [])
+
+    assert cache.get("v1", build("v1")) is cache.get("v1", build("v1"))
+    cache.get("v2", build("v2"))
+    cache.get(None, build(None))
+    cache.get(None, build(None))
+    assert builds == ["v1", "v2", None, None]
+
+def test_compression_negotiates_encodings_above_the_size_threshold(monkeypatch):
+    def accept(header):
+        return parse_accept_header(header, Accept)
+
+    assert compression.negotiate(accept("gzip, br")) == "br"
+    assert compression.negotiate(accept("gzip;q=1, br;q=0.5")) == "gzip"
+    assert compression.negotiate(accept("identity")) is None
+    assert compression.etag_variants("abc") == ["abc", "abc-br", "abc-gzip"]
+
+    payload = {"items": ["x" * 40] * 100}
+    with main.app.test_request_context():
+        small = compression.apply(main.jsonify({"ok": True}), accept("gzip"))
+        assert "Content-Encoding" not in small.headers
+
+        cached = pickle.loads(pickle.dumps(compression.precompressed(lambda: main.jsonify(payload))()))
+        assert set(cached.precompressed) == {"br", "gzip"}
+        monkeypatch.setattr(compression, "compress", lambda *_: pytest.fail("cached responses are compressed once"))
+        cached.set_etag("v1")
+        compressed = compression.apply(cached, accept("gzip"))
+        assert compressed.headers["Content-Encoding"] == "gzip" and compressed.get_etag() == ("v1-gzip", False)
+        assert json.loads(gzip.decompress(compressed.get_data())) == payload
+        assert "Accept-Encoding" in compressed.vary
+
+def test_live_feed_buffers_are_bounded_and_the_sqlite_bus_crosses_workers(tmp_path):
+    subscription = live_feed.Subscription(max_events=2)
+    for index in range(3):
+        subscription.push(("post-deleted", {"id": index}))
+    assert subscription.take(0) == [live_feed.RESYNC]
+    subscription.push(("post-deleted", {"id": 9}))
+    assert subscription.take(0) == [("post-deleted", {"id": 9})]
+    assert subscription.take(0) == []
+
+    path = str(tmp_path / "live.db")
+    sender, receiver = live_feed.open_bus(f"sqlite:///{path}"), live_feed.open_bus(f"sqlite:///{path}")
+    receiver.origin = sender.origin + 1
+    hub = live_feed.LiveFeed(receiver, flush_seconds=3600)
+    stream = hub.subscribe()
+    assert sender.receive() == [] and receiver.receive() == []  # both start from the newest row
+    sender.send("post-created", {"id": 1})
+    hub.count(2, likes=1, views=3)
+    hub.count(2, likes=2, views=3)
+    hub.flush()
+    assert stream.take(0) == [("counters", {"posts": [{"id": 2, "likes": 2, "views": 3}]}), ("post-created", {"id": 1})]
+    assert sender.receive() == [("counters", {"posts": [{"id": 2, "likes": 2, "views": 3}]})]
+    with pytest.raises(ValueError):
+        live_feed.open_bus("redis://localhost")
+
+    chunks = hub.stream(stream, keepalive=0.01, duration=0.05)
+    assert next(chunks).startswith("retry: 3000\nid: ")
+    assert next(chunks) == ": keepalive\n\n"
+    assert list(chunks)[-1] == ": keepalive\n\n" and hub.streams == 0
+
+def test_gunicorn_keeps_threads_free_from_live_feed_streams(monkeypatch, tmp_path):
+    for name in ("PROMETHEUS_MULTIPROC_DIR", "RATELIMIT_STORAGE_URI", "LIVE_FEED_BUS_URI", "LIVE_FEED_MAX_STREAMS"):
+        monkeypatch.setenv(name, os.environ.get(name, str(tmp_path / name.lower())))
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "gthread")
+    monkeypatch.setenv("GUNICORN_THREADS", "4")
+    monkeypatch.setenv("LIVE_FEED_MAX_STREAMS", "100")
+    config = runpy.run_path(os.path.join(os.path.dirname(main.__file__), "gunicorn.conf.py"))
+    assert os.environ["LIVE_FEED_MAX_STREAMS"] == "2"
+
+    streams = config["_live_feed_streams"]
+    assert streams("gthread", 8, None) == 4 and streams("gthread", 1, None) == 0
+    assert streams("sync", 1, 50) == 0
+    assert streams("gevent", 1, None) == 100 and streams("gevent", 1, 500) == 500
+
+def test_session_stores_expire_and_evict_entries(tmp_path):
+    memory = session_store.MemoryStore(max_entries=2)
+    for sid in ("a", "b", "c"):
+        memory.set(sid, sid.upper(), ttl=60)
+    assert memory.get("a") is None and memory.get("c") == "C"
+    memory.set("d", "D", ttl=-1)
+    assert memory.get("d") is None
+
+    sqlite_store = session_store.open_store(f"sqlite:///{tmp_path / 'sessions.db'}")
+    sqlite_store.set("s1", '{"user":"a@school.edu"}', ttl=60)
+    sqlite_store.set("s2", "{}", ttl=-1)
+    assert sqlite_store.get("s1") == '{"user":"a@school.edu"}' and sqlite_store.get("s2") is None
+    sqlite_store.touch("s1", ttl=600)
+    assert sqlite_store.load("s1")[1] - time.time() > 500
+    sqlite_store.delete("s1")
+    assert sqlite_store.get("s1") is None
+    assert isinstance(session_store.open_store("memory://"), session_store.MemoryStore)
+    with pytest.raises(ValueError):
+        session_store.open_store("memcached://localhost")
+
+def test_asset_ref_counts_are_compare_and_set(monkeypatch):
+    db = local_db.LocalDatabase()
+    db.table("media_assets").insert({"owner": "1", "content_hash": "h", "public_id": "pub", "ref_count": 1}).execute()
+    read = media_assets._asset_by_public_id
+    stale = []
+
+    def racing_read(client, public_id):
+        # Another request bumps the count between our read and our write, once.
+        row = read(client, public_id)
+        if not stale:
+            stale.append(row)
+            db.table("media_assets").update({"ref_count": row["ref_count"] + 1}).eq("id", row["id"]).execute()
+        return row
+
+    monkeypatch.setattr(media_assets, "_asset_by_public_id", racing_read)
+    media_assets.acquire_asset(db, "pub")
+    assert read(db, "pub")["ref_count"] == 3
+
+    assert media_assets.release_asset(db, "pub") is False
+    assert media_assets.release_asset(db, "pub") is False
+    assert media_assets.discard_asset(db, "pub") is False
+    assert media_assets.release_asset(db, "pub") is True
+    assert read(db, "pub") is None and media_assets.release_asset(db, "untracked") is True
+
+    monkeypatch.setattr(media_assets, "_set_ref_count", lambda *_: False)
+    db.table("media_assets").insert({"owner": "1", "content_hash": "h2", "public_id": "busy", "ref_count": 2}).execute()
+    with pytest.raises(RuntimeError):
+        media_assets.acquire_asset(db, "busy")
+    assert media_assets.release_asset(db, "busy") is False
+
+def test_cleanup_strips_interactions_with_compare_and_set_and_counts_media_failures():
+    db = local_db.LocalDatabase()
+    db.table("posts").insert([
+        {"id": 1, "author_id": 1, "caption": "a", "liked_by": [2, 5], "viewed_by": [2]},
+        {"id": 2, "author_id": 1, "caption": "b", "liked_by": [2], "viewed_by": None},
+        {"id": 3, "author_id": 2, "caption": "mine", "media_public_id": "pub-3", "liked_by": [], "viewed_by": []},
+    ]).execute()
+    stale = {row["id"]: row for row in db.table("posts").select("id,liked_by,viewed_by").execute().data}
+    # A like and a caption edit land on post 1 and post 2 is deleted after the rows were read.
+    db.table("posts").update({"liked_by": [2, 5, 7], "caption": "edited"}).eq("id", 1).execute()
+    db.table("posts").delete().eq("id", 2).execute()
+
+    assert user_cleanup._strip_row(db, stale[1], 2) is True
+    assert user_cleanup._strip_row(db, stale[2], 2) is False
+    post = db.table("posts").select("caption,liked_by,viewed_by").eq("id", 1).execute().data[0]
+    assert post == {"caption": "edited", "liked_by": [5, 7], "viewed_by": []}
+    assert [row["id"] for row in db.table("posts").select("id").order("id").execute().data] == [1, 3]
+
+    class FailingMedia:
+        def delete_resources(self, ids, **_kwargs):
+            raise RuntimeError("cloudinary down")
+
+    job = user_cleanup.CleanupJob(user_id=2)
+    user_cleanup.delete_posts(db, FailingMedia(), job)
+    assert (job.posts_deleted, job.media_deleted, job.media_failed, job.media_failures) == (1, 0, 1, ["pub-3"])
+
+def test_process_local_rebuilds_once_per_process(monkeypatch):
+    built = []
+    value = process_local.ProcessLocal(lambda: built.append(len(built)) or object())
+    first = value.get()
+    assert value.get() is first and len(built) == 1
+    monkeypatch.setattr(process_local.os, "getpid", lambda: -1)
+    forked = value.get()
+    assert forked is not first and value.get() is forked and len(built) == 2
+    value.reset()
+    assert value.get() is not forked and len(built) == 3
+
+def test_create_app_builds_independent_apps():
+    app = main.create_app({"TESTING": True, "SESSION_COOKIE_NAME": "other"})
+    assert app is not main.app
+    assert app.config["SESSION_COOKIE_NAME"] == "other" and main.app.config["SESSION_COOKIE_NAME"] == "college_session"
+    assert app.test_client().get("/health/live").status_code == 200
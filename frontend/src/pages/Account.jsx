@@ -13,6 +13,8 @@ function Account() {
     const [message, setMessage] = useState("Checking session...");
     const [adminError, setAdminError] = useState("");
     const [deletingUserId, setDeletingUserId] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         const params = new URLSearchParams(location.search);
@@ -49,6 +51,7 @@ function Account() {
                             throw new Error(usersData.details || usersData.error || "Failed to load accounts");
                         }
                         setAllUsers(Array.isArray(usersData) ? usersData : []);
+                        setNextCursor(usersResponse.headers?.get?.("X-Next-Cursor") || null);
                         setAdminError("");
                     } catch (error) {
                         setAllUsers([]);
@@ -69,6 +72,26 @@ function Account() {
         fetchSessionUser();
     }, [location.search]);
 
+    const handleLoadMore = async () => {
+        if (!nextCursor) return;
+        try {
+            setLoadingMore(true);
+            const response = await fetch(`${API_BASE}/users?cursor=${encodeURIComponent(nextCursor)}`, {
+                credentials: "include"
+            });
+            const data = await response.json();
+            if (!response.ok) {
+                throw new Error(data.details || data.error || "Failed to load accounts");
+            }
+            setAllUsers((prev) => [...prev, ...(Array.isArray(data) ? data : [])]);
+            setNextCursor(response.headers?.get?.("X-Next-Cursor") || null);
+        } catch (error) {
+            setAdminError(error.message || "Failed to load accounts");
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleDeleteUser = async (userId) => {
         const shouldDelete = window.confirm("Delete this account? This action cannot be undone.");
         if (!shouldDelete) return;
@@ -143,6 +166,11 @@ function Account() {
                             </div>
                         ))}
                     </div>
+                    {nextCursor ? (
+                        <button type="button" className="feature-btn" onClick={handleLoadMore} disabled={loadingMore}>
+                            {loadingMore ? "Loading..." : "Load more"}
+                        </button>
+                    ) : null}
                 </article>
             ) : null}
         </div>
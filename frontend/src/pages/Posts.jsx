@@ -2,6 +2,10 @@ import { useEffect, useMemo, useState } from "react";
 import "./Pages.css";
 
 const API_BASE = `${window.location.protocol}//${window.location.hostname}:8000`;
+// While the live stream is unavailable (503 when a worker is full), the feed is
+// refetched this often and the stream retried after STREAM_RETRY_MS.
+const POLL_INTERVAL_MS = 30000;
+const STREAM_RETRY_MS = 60000;
 
 function Posts() {
     const [posts, setPosts] = useState([]);
@@ -58,6 +62,71 @@ function Posts() {
         fetchCurrentUser();
     }, []);
 
+    useEffect(() => {
+        let source = null;
+        let pollTimer = null;
+        let retryTimer = null;
+        let opened = false;
+
+        const startPolling = () => {
+            if (!pollTimer) pollTimer = setInterval(fetchPosts, POLL_INTERVAL_MS);
+        };
+        const stopPolling = () => {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        };
+
+        const connect = () => {
+            if (typeof EventSource === "undefined") {
+                startPolling();
+                return;
+            }
+            source = new EventSource(`${API_BASE}/api/posts/stream`, { withCredentials: true });
+            const on = (type, handler) => source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+
+            source.onopen = () => {
+                stopPolling();
+                // A fresh EventSource does not send Last-Event-ID, so catch up here.
+                if (opened) fetchPosts();
+                opened = true;
+            };
+            source.onerror = () => {
+                // EventSource retries dropped streams itself, but gives up on an error status.
+                if (source.readyState !== EventSource.CLOSED) return;
+                source.close();
+                startPolling();
+                retryTimer = setTimeout(connect, STREAM_RETRY_MS);
+            };
+
+            on("post-created", (post) => {
+                setPosts((prev) => (prev.some((item) => item.id === post.id)
+                    ? prev
+                    : [{ ...post, liked_by_me: false, viewed_by_me: false }, ...prev]));
+            });
+            on("post-updated", (post) => {
+                setPosts((prev) => prev.map((item) => (item.id === post.id ? { ...item, ...post } : item)));
+            });
+            on("post-deleted", ({ id }) => {
+                setPosts((prev) => prev.filter((item) => item.id !== id));
+            });
+            on("counters", ({ posts: changed }) => {
+                const counts = new Map(changed.map((item) => [item.id, item]));
+                setPosts((prev) => prev.map((item) => {
+                    const count = counts.get(item.id);
+                    return count ? { ...item, likes: count.likes, views: count.views } : item;
+                }));
+            });
+            on("resync", () => fetchPosts());
+        };
+
+        connect();
+        return () => {
+            if (source) source.close();
+            stopPolling();
+            clearTimeout(retryTimer);
+        };
+    }, []);
+
     const handleCreatePost = async (event) => {
         event.preventDefault();
         if (!file) {
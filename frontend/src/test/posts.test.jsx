@@ -275,4 +275,63 @@ describe("Posts page", () => {
       expect(screen.queryByText(/new caption/i)).not.toBeInTheDocument();
     });
   });
+
+  it("refetches the feed while the live stream is refused and after it reconnects", async () => {
+    const sources = [];
+    class FakeEventSource {
+      static CLOSED = 2;
+
+      constructor() {
+        this.readyState = 0;
+        sources.push(this);
+      }
+
+      addEventListener() {}
+
+      close() {
+        this.readyState = FakeEventSource.CLOSED;
+      }
+    }
+    vi.stubGlobal("EventSource", FakeEventSource);
+    vi.useFakeTimers({ shouldAdvanceTime: true });
+    let feedRequests = 0;
+
+    mockFetchWithRoutes({
+      "GET http://localhost:8000/api/posts": async () => {
+        feedRequests += 1;
+        return { ok: true, json: async () => ({ posts: [makePost()] }) };
+      },
+      "GET http://localhost:8000/users/me": async () => ({
+        ok: true,
+        json: async () => ({ id: 1, email: "a@school.edu", name: "A", role: "user" }),
+      }),
+    });
+
+    try {
+      render(
+        <MemoryRouter>
+          <Posts />
+        </MemoryRouter>
+      );
+      await screen.findByText(/hello world/i);
+      expect(feedRequests).toBe(1);
+
+      sources[0].onopen();
+      sources[0].readyState = FakeEventSource.CLOSED;
+      sources[0].onerror();
+      await vi.advanceTimersByTimeAsync(30000);
+      expect(feedRequests).toBe(2);
+
+      await vi.advanceTimersByTimeAsync(30000);
+      expect(feedRequests).toBe(3);
+      expect(sources).toHaveLength(2);
+      sources[1].onopen();
+      expect(feedRequests).toBe(4);
+      await vi.advanceTimersByTimeAsync(30000);
+      expect(feedRequests).toBe(4);
+    } finally {
+      vi.useRealTimers();
+      vi.unstubAllGlobals();
+    }
+  });
 });